@@ -4,6 +4,13 @@ extends Node2D
 ## PRD: "Grass field as continuous background layer (NOT grid-tied squares/circles)"
 ## Each level has unique terrain + scattered decorative details
 ## Now supports dynamic map sizes
+## Terrain and decorations are baked per level and map size by
+## scripts/bake_terrain.py; levels without a bake are generated at load
+## NOTE: baked *.json files must be included in export presets (filter "assets/data/terrain/*.json")
+
+const TERRAIN_DIR = "res://assets/data/terrain/"
+const TERRAIN_VERSION: int = 1
+const SCALE_DIV: int = 4  # terrain is built at 1/4 resolution and stretched when drawn
 
 var terrain_texture: Texture2D
 var decorations: Array = []  # [{pos, type, size, color, ...}]
@@ -11,21 +18,55 @@ var _map_width: int = 2560
 var _map_height: int = 1440
 
 func _ready():
-	pass  # setup() called by main scene
+	# Low-res terrain is stretched over the map; linear filtering does the upscale on the GPU
+	texture_filter = CanvasItem.TEXTURE_FILTER_LINEAR
 
 func setup(map_w: int, map_h: int):
 	_map_width = map_w
 	_map_height = map_h
-	var theme = LevelData.get_terrain_theme(GameManager.current_level)
-	_generate_terrain(theme)
-	_generate_decorations(GameManager.current_level, theme)
+	var level = GameManager.current_level
+	if not _load_baked(level):
+		var theme = LevelData.get_terrain_theme(level)
+		_generate_terrain(theme)
+		_generate_decorations(level, theme)
 	queue_redraw()
 
+# Load the baked texture and decoration list for this level and map size
+# Returns false (leaving nothing half-loaded) if either is missing or outdated
+func _load_baked(level: int) -> bool:
+	var stem = TERRAIN_DIR + "level_%d_%dx%d" % [level, _map_width, _map_height]
+	if not ResourceLoader.exists(stem + ".png") or not FileAccess.file_exists(stem + ".json"):
+		return false
+	var data = JSON.parse_string(FileAccess.get_file_as_string(stem + ".json"))
+	if not data is Dictionary or int(data.get("version", 0)) != TERRAIN_VERSION:
+		push_warning("Background: bad or outdated " + stem + ".json")
+		return false
+	var texture = load(stem + ".png") as Texture2D
+	if texture == null:
+		return false
+	terrain_texture = texture
+	decorations.clear()
+	for d in data.get("decorations", []):
+		decorations.append(_decoration_from_json(d))
+	return true
+
+# JSON arrays back to the types _draw_decoration expects
+func _decoration_from_json(d: Dictionary) -> Dictionary:
+	var out: Dictionary = {}
+	for key in d:
+		var v = d[key]
+		if key == "pos":
+			out[key] = Vector2(v[0], v[1])
+		elif key.ends_with("color"):
+			out[key] = Color(v[0], v[1], v[2], v[3])
+		else:
+			out[key] = v
+	return out
+
 func _generate_terrain(theme: Dictionary):
-	# Generate at 1/4 resolution then upscale (saves memory on large maps)
-	var scale_div = 4
-	var w = _map_width / scale_div
-	var h = _map_height / scale_div
+	# Generate at 1/4 resolution; _draw stretches it over the map
+	var w = _map_width / SCALE_DIV
+	var h = _map_height / SCALE_DIV
 	var img = Image.create(w, h, false, Image.FORMAT_RGB8)
 	
 	var noise = FastNoiseLite.new()
@@ -49,7 +90,6 @@ func _generate_terrain(theme: Dictionary):
 			var color = base_color.lerp(var_color, blend)
 			img.set_pixel(x, y, color)
 	
-	img.resize(_map_width, _map_height, Image.INTERPOLATE_BILINEAR)
 	terrain_texture = ImageTexture.create_from_image(img)
 
 func _generate_decorations(level: int, theme: Dictionary):
@@ -178,7 +218,7 @@ func _closest_point_on_segment(p: Vector2, a: Vector2, b: Vector2) -> Vector2:
 func _draw():
 	# Layer 1: Terrain
 	if terrain_texture:
-		draw_texture(terrain_texture, Vector2.ZERO)
+		draw_texture_rect(terrain_texture, Rect2(0, 0, _map_width, _map_height), false)
 	else:
 		draw_rect(Rect2(0, 0, _map_width, _map_height), Color(0.28, 0.55, 0.22))
 	
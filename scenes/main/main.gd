@@ -3,6 +3,8 @@ extends Node2D
 ## Main scene controller — data-driven level gameplay
 ## Uses GameHUD for all UI, handles tower placement and wave spawning
 ## Now supports scrollable maps larger than the viewport
+## Enemies (with their PathFollow2D), projectiles and death effects are pooled
+## via NodePool, warmed at level start from the level's wave peaks
 
 @export var tower_scene: PackedScene
 
@@ -15,12 +17,20 @@ extends Node2D
 @onready var minimap = $GameHUD/MinimapMargin/Minimap
 
 var enemy_scene: PackedScene = preload("res://scenes/enemies/enemy.tscn")
+var projectile_scene: PackedScene = preload("res://scenes/projectiles/projectile.tscn")
 var selected_tower: String = ""
 var is_placing: bool = false
-var _spawning_complete: bool = false
+var _spawning_complete: bool = true
 var _enemies_spawned: int = 0
+var _spawn_timeline: Dictionary = {}  # SpawnTimeline wave being drained
+var _spawn_cursor: int = 0
+var _wave_clock: float = 0.0
 var _enemies_finished: int = 0
 var selected_placed_tower: Node2D = null
+var replay := ReplayRecorder.new()
+
+const ENEMY_POOL = "enemy"
+const PROJECTILE_WARM: int = 24
 
 # Map dimensions (from Settings)
 var map_width: int
@@ -69,6 +79,8 @@ func _ready():
 	hud.wave_start_requested.connect(_on_start_wave_pressed)
 	
 	_setup_level()
+	_warm_pools()
+	replay.begin(GameManager.current_level)
 	
 	ghost_preview.visible = false
 	ghost_preview.size = Vector2(64, 64)
@@ -77,7 +89,7 @@ func _ready():
 	# Setup minimap
 	var path_points = LevelData.get_path_points(GameManager.current_level)
 	minimap.setup(Vector2(map_width, map_height), path_points)
-	minimap.set_containers(enemy_path, $TowersContainer)
+	minimap.set_towers_container($TowersContainer)
 	
 	# Play battle music (random between two tracks for variety)
 	AudioManager.play_music(["battle_loop", "battle_loop_alt"][randi() % 2])
@@ -94,20 +106,51 @@ func _setup_level():
 	grid_manager.mark_path_cells(enemy_path.curve)
 	enemy_path.queue_redraw()
 
+# Pre-build the pooled nodes a level needs so the first dense wave does not allocate
+# Enemies: the most on the path at once; deaths overlap for well under the
+# time enemies spend walking, so a quarter of that covers death effects
+func _warm_pools():
+	NodePool.register(ENEMY_POOL, _new_enemy_follower)
+	var peak = SpawnTimeline.get_peak(GameManager.current_level)
+	NodePool.warm(ENEMY_POOL, peak)
+	GameParticles.warm_death_effects(maxi(4, peak / 4))
+	NodePool.warm(NodePool.register_scene(projectile_scene), PROJECTILE_WARM)
+
+# Pool counters are on the debugger's Monitors tab (pools/)
+func _exit_tree():
+	NodePool.clear()
+
 func _get_world_mouse_pos() -> Vector2:
 	## Convert screen mouse position to world coordinates accounting for camera
 	return get_global_mouse_position()
 
-func _process(_delta: float):
+func _process(delta: float):
+	replay.advance(delta)
+	if not _spawning_complete:
+		_drain_spawns(delta)
 	if is_placing:
 		var world_mouse = _get_world_mouse_pos()
 		var snap_pos = grid_manager.get_tower_snap_position(world_mouse)
 		ghost_preview.visible = true
 		ghost_preview.global_position = snap_pos - Vector2(32, 32)
-		ghost_preview.color = Color(0, 1, 0, 0.3) if grid_manager.can_place_tower(world_mouse) else Color(1, 0, 0, 0.3)
+		if grid_manager.can_place_tower(world_mouse):
+			ghost_preview.color = _ghost_coverage_color(grid_manager.get_tower_anchor(world_mouse))
+		else:
+			ghost_preview.color = Color(1, 0, 0, 0.3)
 	else:
 		ghost_preview.visible = false
 
+func _ghost_coverage_color(anchor: Vector2i) -> Color:
+	## Valid placement tint from the precomputed coverage map:
+	## brighter green the more path is in range, amber if none is
+	var attack_range = GameManager.tower_data.get(selected_tower, {}).get("range", 0.0)
+	var fraction = CoverageMap.get_fraction(GameManager.current_level, anchor, attack_range)
+	if fraction < 0.0:
+		return Color(0, 1, 0, 0.3)  # no data (or no range) — plain valid tint
+	if fraction == 0.0:
+		return Color(1, 0.7, 0, 0.3)
+	return Color(0, 1, 0, lerpf(0.2, 0.55, minf(fraction * 4.0, 1.0)))
+
 func _on_hud_tower_selected(type: String):
 	_deselect_all()
 	if GameManager.can_afford(type):
@@ -119,6 +162,7 @@ func _on_hud_tower_selected(type: String):
 func _on_hud_upgrade_requested(path: String):
 	if selected_placed_tower and selected_placed_tower.has_method("apply_upgrade"):
 		if selected_placed_tower.apply_upgrade(path):
+			replay.tower_upgraded(selected_placed_tower, path, selected_placed_tower.upgrade_levels[path])
 			AudioManager.play_sfx("tower_upgrade")
 		hud.update_hud()
 
@@ -127,6 +171,7 @@ func _on_hud_demolish_requested():
 		return
 	var refund = selected_placed_tower.get_total_value() / 2
 	GameManager.money += refund
+	replay.tower_sold(selected_placed_tower)
 	AudioManager.play_sfx("tower_sell")
 	grid_manager.remove_tower(selected_placed_tower.global_position)
 	GameParticles.spawn_death_poof(get_tree(), selected_placed_tower.global_position)
@@ -180,6 +225,7 @@ func _place_tower(world_pos: Vector2):
 	tower.setup(selected_tower)
 	$TowersContainer.add_child(tower)
 	grid_manager.place_tower(world_pos)
+	replay.tower_placed(selected_tower, grid_manager.get_tower_anchor(world_pos))
 	GameParticles.spawn_build_poof(get_tree(), snap_pos)
 	AudioManager.play_sfx("tower_place")
 	
@@ -202,6 +248,7 @@ func _on_start_wave_pressed():
 	if GameManager.is_wave_active or GameManager.current_wave >= GameManager.total_waves:
 		return
 	GameManager.start_wave()
+	replay.wave_started(GameManager.current_wave)
 	AudioManager.play_sfx("wave_start")
 	_spawn_wave()
 
@@ -209,43 +256,51 @@ func _spawn_wave():
 	_spawning_complete = false
 	_enemies_spawned = 0
 	_enemies_finished = 0
-	
-	var waves = LevelData.get_waves(GameManager.current_level)
-	var wave_index = min(GameManager.current_wave - 1, waves.size() - 1)
-	var wave_data = waves[wave_index]
-	
-	for group in wave_data:
-		for i in range(group["count"]):
-			if not GameManager.game_active:
-				return
-			_spawn_enemy(group["type"])
-			_enemies_spawned += 1
-			await get_tree().create_timer(group["delay"]).timeout
-	
-	_spawning_complete = true
-	_check_wave_done()
+	_spawn_timeline = SpawnTimeline.get_wave(GameManager.current_level, GameManager.current_wave - 1)
+	_spawn_cursor = 0
+	_wave_clock = 0.0
+	_drain_spawns(0.0)
+
+# Spawn everything due by the wave clock; spawning ends one delay after the last enemy
+func _drain_spawns(delta: float):
+	if not GameManager.game_active:
+		return
+	_wave_clock += delta
+	var times: PackedFloat32Array = _spawn_timeline["t"]
+	var types: PackedStringArray = _spawn_timeline["type"]
+	while _spawn_cursor < times.size() and times[_spawn_cursor] <= _wave_clock:
+		_spawn_enemy(types[_spawn_cursor])
+		_enemies_spawned += 1
+		_spawn_cursor += 1
+	if _spawn_cursor >= times.size() and _wave_clock >= _spawn_timeline["end"]:
+		_spawning_complete = true
+		_check_wave_done()
 
 func _spawn_enemy(type: String):
+	var follow: PathFollow2D = NodePool.acquire(ENEMY_POOL)
+	follow.get_child(0).setup(type)
+	enemy_path.add_child(follow)
+	follow.progress = 0.0
+
+# Pooled unit: a PathFollow2D with its enemy, signals connected once
+func _new_enemy_follower() -> PathFollow2D:
 	var follow = PathFollow2D.new()
 	follow.rotates = false
 	follow.loop = false
-	enemy_path.add_child(follow)
 	var enemy = enemy_scene.instantiate()
-	enemy.setup(type)
 	follow.add_child(enemy)
 	enemy.died.connect(_on_enemy_died.bind(follow))
 	enemy.reached_end.connect(_on_enemy_reached_end.bind(follow))
+	return follow
 
 func _on_enemy_died(follow: PathFollow2D):
 	_enemies_finished += 1
-	if is_instance_valid(follow):
-		follow.queue_free()
+	NodePool.release(follow)
 	_check_wave_done()
 
 func _on_enemy_reached_end(follow: PathFollow2D):
 	_enemies_finished += 1
-	if is_instance_valid(follow):
-		follow.queue_free()
+	NodePool.release(follow)
 	_check_wave_done()
 
 func _check_wave_done():
@@ -259,9 +314,11 @@ func _on_wave_completed(_wave):
 	hud.update_hud()
 
 func _on_game_over():
+	SaveManager.save_replay(GameManager.current_level, replay.finish(false, GameManager.get_score()))
 	await get_tree().create_timer(1.0).timeout
 	get_tree().change_scene_to_file("res://scenes/ui/lose_screen.tscn")
 
-func _on_level_complete(_level: int):
+func _on_level_complete(level: int):
+	SaveManager.save_replay(level, replay.finish(true, GameManager.get_score()))
 	await get_tree().create_timer(1.5).timeout
 	get_tree().change_scene_to_file("res://scenes/ui/win_screen.tscn")
@@ -416,7 +416,15 @@ func update_hud():
 		buttons[i].disabled = not can
 	
 	start_wave_btn.disabled = GameManager.is_wave_active
-	
+	# Next wave preview from the compiled wave stats (scripts/compile_waves.py)
+	var next = SpawnTimeline.get_stats(GameManager.current_level, GameManager.current_wave)
+	if next.is_empty() or GameManager.current_wave >= GameManager.total_waves:
+		start_wave_btn.tooltip_text = ""
+	else:
+		start_wave_btn.tooltip_text = "Next wave: %d enemies, %d HP\n%dg from kills + %dg bonus" % [
+			next.count, next.hp, next.gold, next.bonus
+		]
+
 	if _selected_placed_tower and is_instance_valid(_selected_placed_tower):
 		_update_tower_info(_selected_placed_tower)
 
@@ -0,0 +1,464 @@
+#!/usr/bin/env python3
+"""Incremental build of the enemy sprite assets.
+
+The build is a graph of targets, one chain per demon in ROSTER plus the
+shared atlas:
+
+    <name>:static   backend call (style ref) → 64px <name>_enemy.png
+    <name>:walk     backend call (static)    → raw walk frames
+    <name>:sheet    normalize_sheets         → <name>_walk_sheet.png
+    <name>:palette  export_palettes          → index map + palette strips (palettes/)
+    atlas           build_atlas (all sheets, towers, effects, projectiles)
+
+A target is up to date when the hash of its recipe (descriptions, call
+parameters), its source files and its dependencies' outputs matches the
+last successful build, and its outputs are still there unchanged. So
+editing one demon's description rebuilds only that demon's chain and the
+atlas. Walks that end in the bounce fallback are never recorded, so the next
+build retries them without a dedicated retry script.
+
+The state lives in .asset_build/, which is not committed, so a fresh
+checkout has none and every target looks stale. --adopt records the
+outputs already there (the committed sprites, sheets and atlas) as up to
+date instead of regenerating them; raw walk frames are not committed, so
+a demon's walk is adopted with whatever raw frames are left, and
+rebuilding its sheet alone then needs --force <name>:walk first.
+Targets whose outputs are missing stay stale.
+
+Backend calls go through sprite_scheduler (rate limiting, retries, the
+generation cache and a worker pool). Local stages run in a process pool.
+mcporter reads its config from the working directory; set MCPORTER_CWD to
+run calls from elsewhere.
+
+Usage: asset_build.py [TARGET...] [--force] [--dry-run] [--adopt] [--list] [--jobs N] [--retry-queue]
+       TARGET is a target name (bone_golem:walk), a demon (bone_golem),
+       atlas, or all (default). Stale dependencies are built first.
+       --retry-queue also forces the walks queued by validate_walks.py and
+       rebuilds their demons; walks that succeed leave the queue.
+"""
+
+import argparse
+import hashlib
+import io
+import json
+import os
+import threading
+from multiprocessing import Pool
+from pathlib import Path
+
+from PIL import Image
+
+import build_atlas
+import export_palettes
+from gen_cache import CACHE_DIR, GenCache
+from gen_worker import WorkerPool
+from normalize_sheets import normalize_sheet
+from sprite_scheduler import GenerationError, Scheduler, mcp_frames
+
+ROOT = Path(__file__).resolve().parent.parent
+ENEMIES_DIR = ROOT / "assets" / "sprites" / "enemies"
+BUILD_DIR = ROOT / ".asset_build"
+RAW_DIR = BUILD_DIR / "raw"
+STATE_PATH = BUILD_DIR / "state.json"
+STYLE_REF = BUILD_DIR / "style_ref_128.png"
+QUEUE_PATH = BUILD_DIR / "retry_queue.json"  # written by validate_walks.py
+WORK_DIR = os.environ.get("MCPORTER_CWD")
+
+# name (as used by enemy.gd) → (description, negative description)
+ROSTER = {
+    "imp": (
+        "small red and orange imp demon, hunched posture, tiny curved horns, pointed barbed tail, sharp claws, menacing grin, glowing yellow eyes",
+        "large, tall, wings, armor, weapon, cute, friendly"),
+    "hell_hound": (
+        "demonic hellhound wolf beast on four legs, dark black fur with glowing orange-red fire accents, burning red eyes, sharp fangs bared, muscular canine body, flames from paws",
+        "humanoid, standing upright, cute, collar, friendly dog"),
+    "brute_demon": (
+        "massive muscular red brute demon, huge curved ram horns, bronze armored chest plates, bulging arms, heavy fists, intimidating stance, dark red skin",
+        "small, thin, wings, weapon, cute, friendly"),
+    "wraith": (
+        "ghostly floating wraith demon, translucent purple and blue ethereal body, tattered dark robes flowing, no legs visible, glowing white eyes, spectral wispy trail below",
+        "legs, feet, solid body, armor, weapon, colorful, happy"),
+    "fire_elemental": (
+        "living fire elemental creature, humanoid shape made entirely of flames and lava, orange-yellow body with red-hot core, molten cracks, flickering flame hair and arms",
+        "armor, clothing, solid skin, weapon, cold colors, blue, green"),
+    "shadow_stalker": (
+        "dark shadow stalker demon, sleek thin black shadowy body, two piercing bright green glowing eyes, stealthy crouched pose, wisps of dark smoke trailing, sharp clawed hands",
+        "bulky, bright colors, armor, weapon, friendly, cute, red"),
+    "bone_golem": (
+        "massive bone golem construct, assembled from many large bones, large skull head with glowing green eye sockets, ribcage torso, bone arm clubs, towering skeletal construct",
+        "flesh, skin, small, thin, cute, friendly, human"),
+    "succubus": (
+        "winged succubus demon, dark purple and crimson skin, bat-like wings spread, elegant demonic female figure, horns curving back, long tail, glowing purple eyes",
+        "cute, friendly, modest, armor, bulky, male"),
+    "hell_knight": (
+        "armored hell knight demon warrior, heavy dark plate armor with red glowing runes, red and black color scheme, horned helmet, carrying dark sword, imposing stance",
+        "small, thin, unarmored, cute, friendly, light colors"),
+    "demon_lord": (
+        "massive demon lord boss, huge imposing figure, enormous curved horns, dark crimson skin, large bat-like wings spread wide, glowing red eyes, royal demonic presence, crown of fire",
+        "small, thin, cute, friendly, unimposing, no horns"),
+}
+
+
+def static_call(desc, neg, style_ref, raw):
+    neg_part = f', negative_description: "{neg}"' if neg else ""
+    return (
+        f'pixellab.generate_image_bitforge('
+        f'description: "pixel art {desc}, side view facing right, dark fantasy tower defense game sprite", '
+        f'style_image_path: "{style_ref}", '
+        f'width: 128, height: 128, style_strength: 45, '
+        f'no_background: true, '
+        f'outline: "single color black outline", '
+        f'shading: "highly detailed shading", '
+        f'detail: "highly detailed"{neg_part}, '
+        f'text_guidance_scale: 12, '
+        f'save_to_file: "{raw}", show_image: false)'
+    )
+
+
+def walk_call(desc, static_path, base):
+    return (
+        f'pixellab.animate_with_text('
+        f'description: "pixel art {desc}, walking cycle, side view, dark fantasy tower defense", '
+        f'action: "walking", '
+        f'reference_image_path: "{static_path}", '
+        f'width: 64, height: 64, '
+        f'view: "side", direction: "east", n_frames: 4, '
+        f'save_to_file: "{base}.png", show_image: false)'
+    )
+
+
+def file_digest(paths):
+    h = hashlib.sha256()
+    for path in paths:
+        h.update(str(path).encode() + b"\0")
+        try:
+            with open(path, "rb") as f:
+                h.update(hashlib.sha256(f.read()).digest())
+        except OSError:
+            h.update(b"missing")
+    return h.hexdigest()
+
+
+def raw_walk_frames(paths):
+    """The per-frame images among a walk call's raw files, or all of them if it sent no frames."""
+    paths = [str(p) for p in paths]
+    return [p for p in paths if "_frame" in p] or paths
+
+
+# ─── Local stages (run in the process pool, so module-level) ───
+
+def build_sheet(raw_paths, sheet_path, bounce):
+    """Normalize raw walk frames, or bounce the static sprite when the walk fell back."""
+    if bounce:
+        img = Image.open(raw_paths[0]).convert("RGBA")
+        sheet = Image.new("RGBA", (256, 64), (0, 0, 0, 0))
+        for i, dy in enumerate([0, -2, 0, 2]):
+            sheet.paste(img, (i * 64, dy))
+        sheet.save(sheet_path)
+    else:
+        normalize_sheet(raw_paths, sheet_path)
+    return [str(sheet_path)]
+
+
+def build_palette(sheet_path, colors, variants):
+    out_dir = export_palettes.OUT_DIR
+    out_dir.mkdir(parents=True, exist_ok=True)
+    return [str(p) for p in export_palettes.export(sheet_path, out_dir, colors, variants)]
+
+
+def build_atlases():
+    return build_atlas.build()
+
+
+class Target:
+    """One node of the graph. build(*dep_results) returns its output paths."""
+
+    def __init__(self, name, build, deps=(), recipe=None, sources=list, local=False, fallback=None, outputs=list):
+        self.name = name
+        self.build = build
+        self.deps = list(deps)
+        self.recipe = recipe or {}
+        self.sources = sources  # callable → extra input files
+        self.local = local
+        self.fallback = fallback
+        self.outputs = outputs  # callable → the files a build would leave, for --adopt
+
+
+class AssetBuild:
+    def __init__(self, args):
+        self.args = args
+        self.state = self._load_state()
+        self.targets = {}
+        self.cache = None if args.no_cache else GenCache(CACHE_DIR)
+        self.pool = None
+        self.local = None
+        self._lock = threading.Lock()
+        self._define()
+
+    # ─── Graph ───
+
+    def _define(self):
+        args = self.args
+        for name, (desc, neg) in ROSTER.items():
+            static = ENEMIES_DIR / f"{name}_enemy.png"
+            sheet = ENEMIES_DIR / f"{name}_walk_sheet.png"
+            self._add(Target(
+                f"{name}:static", lambda n=name, d=desc, ng=neg, out=static: self._static(n, d, ng, out),
+                recipe={"call": static_call(desc, neg, "", "")},
+                sources=lambda: [args.style_ref], outputs=lambda out=static: [out]))
+            self._add(Target(
+                f"{name}:walk", lambda st, n=name, d=desc: self._walk(n, d, st),
+                deps=[f"{name}:static"],
+                recipe={"call": walk_call(desc, "", "")},
+                fallback=lambda st: {"outputs": st["outputs"], "digest": st["digest"], "fallback": True},
+                outputs=lambda n=name: raw_walk_frames(sorted(RAW_DIR.glob(f"{n}_walk*")))))
+            self._add(Target(
+                f"{name}:sheet", lambda walk, n=name, out=sheet: self._sheet(n, walk, out),
+                deps=[f"{name}:walk"], local=True, outputs=lambda out=sheet: [out]))
+            self._add(Target(
+                f"{name}:palette", lambda sh: (build_palette, (sh["outputs"][0], args.colors, args.variants)),
+                deps=[f"{name}:sheet"],
+                recipe={"colors": args.colors, "variants": args.variants}, local=True,
+                outputs=lambda out=sheet: export_palettes.outputs(out, export_palettes.OUT_DIR, args.variants)))
+        self._add(Target(
+            "atlas", lambda *sheets: (build_atlases, ()),
+            deps=[f"{name}:sheet" for name in ROSTER],
+            sources=build_atlas.sources, local=True, outputs=build_atlas.outputs))
+
+    def _add(self, target):
+        self.targets[target.name] = target
+
+    def select(self, patterns):
+        """Requested targets plus everything they depend on, in dependency order."""
+        wanted = []
+        for pattern in patterns or ["all"]:
+            if pattern == "all":
+                wanted += list(self.targets)
+            elif pattern in self.targets:
+                wanted.append(pattern)
+            elif pattern in ROSTER:
+                wanted += [t for t in self.targets if t.startswith(pattern + ":")]
+            else:
+                raise KeyError(pattern)
+        order, seen = [], set()
+
+        def visit(name):
+            if name in seen:
+                return
+            seen.add(name)
+            for dep in self.targets[name].deps:
+                visit(dep)
+            order.append(name)
+
+        for name in wanted:
+            visit(name)
+        return order, set(wanted)
+
+    # ─── Staleness ───
+
+    def _load_state(self):
+        try:
+            with open(STATE_PATH) as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return {}
+
+    def _save_state(self):
+        STATE_PATH.parent.mkdir(parents=True, exist_ok=True)
+        tmp = str(STATE_PATH) + ".tmp"
+        with open(tmp, "w") as f:
+            json.dump(self.state, f, indent=1, sort_keys=True)
+        os.replace(tmp, STATE_PATH)
+
+    def key(self, target, dep_digests):
+        h = hashlib.sha256()
+        h.update(json.dumps(target.recipe, sort_keys=True).encode())
+        h.update(file_digest(target.sources()).encode())
+        for digest in dep_digests:
+            h.update(digest.encode())
+        return h.hexdigest()
+
+    def fresh(self, target, key):
+        prev = self.state.get(target.name)
+        return bool(prev) and prev["key"] == key and file_digest(prev["outputs"]) == prev["digest"]
+
+    def adopt(self, order):
+        """Record the outputs already on disk as up to date, without building anything.
+        Targets with a state entry keep it; ones with missing outputs (or a dependency
+        that could not be adopted) stay stale."""
+        digests = {name: entry["digest"] for name, entry in self.state.items()}
+        adopted = 0
+        for name in order:
+            target = self.targets[name]
+            if name in self.state:
+                print(f"  ◆ {name} already recorded", flush=True)
+                continue
+            outputs = [str(p) for p in target.outputs()]
+            missing = [p for p in outputs if not os.path.exists(p)] + [d for d in target.deps if d not in digests]
+            if missing:
+                print(f"  → {name} stays stale (missing {', '.join(os.path.basename(m) for m in missing)})", flush=True)
+                continue
+            digest = file_digest(outputs)
+            self.state[name] = {"key": self.key(target, [digests[d] for d in target.deps]),
+                                "outputs": outputs, "digest": digest}
+            digests[name] = digest
+            adopted += 1
+            print(f"  ✓ {name} adopted ({len(outputs)} files)", flush=True)
+        self._save_state()
+        return adopted
+
+    # ─── Running ───
+
+    def _run(self, target, forced, *deps):
+        key = self.key(target, [d["digest"] for d in deps])
+        if not forced and self.fresh(target, key):
+            prev = self.state[target.name]
+            print(f"  ◆ {target.name} up to date", flush=True)
+            return {"outputs": prev["outputs"], "digest": prev["digest"]}
+        if target.local:
+            fn, fn_args = target.build(*deps)
+            outputs = self.local.apply(fn, fn_args)
+        else:
+            outputs = target.build(*deps)
+        result = {"outputs": outputs, "digest": file_digest(outputs)}
+        if any(d.get("fallback") for d in deps):
+            # Built from a fallback: leave it stale so the next build retries
+            return result
+        with self._lock:
+            self.state[target.name] = {"key": key, **result}
+            self._save_state()
+        return result
+
+    def _mcp(self, call, on_frame=None):
+        with self._lock:
+            if self.pool is None and not self.args.cli:
+                self.pool = WorkerPool(self.args.workers, cwd=WORK_DIR)
+        return mcp_frames(call, cwd=WORK_DIR, cache=self.cache, pool=self.pool, on_frame=on_frame)
+
+    def _static(self, name, desc, neg, out):
+        if not os.path.exists(self.args.style_ref):
+            raise GenerationError(f"style reference {self.args.style_ref} is missing", retryable=False)
+        blobs = self._mcp(static_call(desc, neg, self.args.style_ref, RAW_DIR / f"{name}_raw128.png"))
+        if not blobs:
+            raise GenerationError("backend reported OK but sent no image")
+        Image.open(io.BytesIO(blobs[0][1])).convert("RGBA").resize((64, 64), Image.NEAREST).save(out)
+        return [str(out)]
+
+    def _sheet(self, name, walk, out):
+        if not walk["outputs"]:  # adopted walk whose raw frames were never on this machine
+            raise GenerationError(f"no raw walk frames for {name}; rebuild with --force {name}:walk",
+                                  retryable=False)
+        return build_sheet, (walk["outputs"], str(out), walk.get("fallback", False))
+
+    def _walk(self, name, desc, static):
+        # Raw images are kept for the sheet stage; each is written once as it arrives
+        written = []
+
+        def keep(file_name, data):
+            path = RAW_DIR / file_name
+            path.write_bytes(data)
+            written.append(str(path))
+
+        self._mcp(walk_call(desc, static["outputs"][0], RAW_DIR / f"{name}_walk"), on_frame=keep)
+        frames = raw_walk_frames(written)
+        if not frames:
+            raise GenerationError(f"no walk output for {name}", retryable=False)
+        return frames
+
+    def dry_run(self, order, forced):
+        """Print what would build, assuming unchanged dependencies keep their recorded outputs."""
+        for name in order:
+            target = self.targets[name]
+            deps = [self.state.get(d, {}).get("digest", "") for d in target.deps]
+            stale = name in forced or not self.fresh(target, self.key(target, deps))
+            print(f"  {'→ build' if stale else '◆ fresh'}  {name}", flush=True)
+
+    def run(self, order, forced):
+        RAW_DIR.mkdir(parents=True, exist_ok=True)
+        sched = Scheduler(workers=self.args.workers + self.args.jobs, rate=self.args.rate, retries=self.args.retries)
+        for name in order:
+            target = self.targets[name]
+            fallback = target.fallback
+            sched.add(name, lambda *deps, t=target, f=name in forced: self._run(t, f, *deps),
+                      deps=target.deps, fallback=fallback)
+        self.local = Pool(self.args.jobs)
+        try:
+            sched.run()
+        finally:
+            self.local.close()
+            self.local.join()
+            if self.pool:
+                self.pool.close()
+        return sched
+
+
+def load_queue():
+    try:
+        with open(QUEUE_PATH) as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return []
+
+
+def save_queue(queue):
+    QUEUE_PATH.parent.mkdir(parents=True, exist_ok=True)
+    with open(QUEUE_PATH, "w") as f:
+        json.dump(queue, f, indent=1)
+
+
+def main():
+    ap = argparse.ArgumentParser(description="Incremental build of the enemy sprite assets")
+    ap.add_argument("targets", nargs="*", help="targets, demon names, atlas or all")
+    ap.add_argument("--force", action="store_true", help="rebuild the named targets even if up to date")
+    ap.add_argument("--dry-run", action="store_true", help="show what is stale without building")
+    ap.add_argument("--adopt", action="store_true",
+                    help="record the outputs already on disk as up to date (checkout with no build state)")
+    ap.add_argument("--list", action="store_true", help="list every target")
+    ap.add_argument("--retry-queue", action="store_true", help="also rebuild walks queued by validate_walks.py")
+    ap.add_argument("--jobs", type=int, default=os.cpu_count() or 1, help="processes for local stages")
+    ap.add_argument("--workers", type=int, default=4, help="concurrent backend calls")
+    ap.add_argument("--rate", type=float, default=1.0, help="max calls per second")
+    ap.add_argument("--retries", type=int, default=3, help="retries per call on timeout/Error")
+    ap.add_argument("--style-ref", default=str(STYLE_REF), help="style reference for static sprites")
+    ap.add_argument("--colors", type=int, default=48, help="palette size for the palette targets")
+    ap.add_argument("--variants", default=",".join(export_palettes.VARIANTS), help="palette variants")
+    ap.add_argument("--no-cache", action="store_true", help="always call the backend")
+    ap.add_argument("--cli", action="store_true", help="spawn npx mcporter per call instead of a worker pool")
+    args = ap.parse_args()
+    args.variants = [v for v in args.variants.split(",") if v]
+
+    build = AssetBuild(args)
+    if args.list:
+        for name, target in build.targets.items():
+            kind = "local" if target.local else "backend"
+            print(f"  {name:24s} {kind:7s} ← {', '.join(target.deps) or '-'}", flush=True)
+        return 0
+    queue = [t for t in load_queue() if t in build.targets] if args.retry_queue else []
+    patterns = args.targets + [t.split(":")[0] for t in queue]
+    try:
+        order, named = build.select(patterns)
+    except KeyError as e:
+        ap.error(f"unknown target {e.args[0]!r} (see --list)")
+    forced = (named if args.force else set()) | set(queue)
+
+    print(f"ASSET BUILD: {len(order)} targets, {args.jobs} local jobs, {args.workers} backend workers", flush=True)
+    if args.adopt:
+        print(f"  ✓ {build.adopt(order)} targets adopted", flush=True)
+        return 0
+    if not build.state:
+        print(f"  ⚠ no build state ({STATE_PATH.relative_to(ROOT)}): every target is stale; "
+              f"--adopt keeps the sprites already here", flush=True)
+    if args.dry_run:
+        build.dry_run(order, forced)
+        return 0
+    sched = build.run(order, forced)
+    ok = sched.summary()
+    if queue:
+        left = [t for t in queue if sched.jobs[t].status != "ok"]
+        save_queue(left)
+        print(f"  retry queue: {len(queue) - len(left)} done, {len(left)} left", flush=True)
+    return 0 if ok else 1
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
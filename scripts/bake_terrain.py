@@ -0,0 +1,288 @@
+#!/usr/bin/env python3
+"""Bake each level's terrain texture and decoration list offline.
+
+scenes/main/background.gd used to build both on every level load: a
+per-pixel GDScript noise loop, a CPU bilinear resize to the full map, and
+decoration placement that tested every candidate against every path
+segment. This renders the same layers with NumPy so a level load is one
+texture load plus one JSON read.
+
+For every level and every map size preset (settings_manager.gd MAP_SIZES):
+
+    level_N_WxH.png   terrain at 1/4 resolution, RGB8. background.gd draws it
+                      stretched to the map with linear filtering, which is
+                      the bilinear upscale the runtime path did on the CPU
+    level_N_WxH.json  {"version", "hash", "level", "map": [w, h],
+                       "decorations": [{"type", "pos": [x, y], ...}]}
+                      colors are [r, g, b, a]; other keys match
+                      background.gd _make_decoration
+
+Noise is 2D simplex with 5-octave fBm, FastNoiseLite's defaults, seeded
+level * 42 and level * 137 like the runtime generator. It has the same
+frequencies, blend and look, but the pattern is not pixel-identical to
+FastNoiseLite. Decorations use a NumPy RNG seeded with level * 7919, so
+bakes are reproducible, though they differ from the runtime fallback's.
+
+The bakes, and the PNGs' .import sidecars, are committed with the game:
+re-run after editing a level's theme or path. Outputs whose hash (theme,
+path, map size, version) matches are left alone.
+
+Usage: bake_terrain.py [--level N] [--size INDEX] [--out DIR] [--force]
+"""
+
+import argparse
+import hashlib
+import json
+import struct
+from pathlib import Path
+
+import numpy as np
+from PIL import Image
+
+import gd_data
+from build_atlas import write_import
+
+ROOT = Path(__file__).resolve().parent.parent
+OUT_DIR = ROOT / "assets" / "data" / "terrain"
+VERSION = 1
+SCALE_DIV = 4  # terrain is rendered at 1/4 of the map resolution
+PATH_CLEARANCE = 55.0
+MARGIN = 30
+
+F2 = 0.5 * (np.sqrt(3.0) - 1.0)
+G2 = (3.0 - np.sqrt(3.0)) / 6.0
+GRADIENTS = np.stack([np.cos(np.arange(8) * np.pi / 4), np.sin(np.arange(8) * np.pi / 4)], axis=1)
+
+
+def _perm(seed):
+    p = np.random.default_rng(seed).permutation(256)
+    return np.concatenate([p, p])
+
+
+def simplex2(x, y, seed):
+    """2D simplex noise in about [-1, 1] for coordinate arrays of any shape."""
+    perm = _perm(seed)
+    s = (x + y) * F2
+    i = np.floor(x + s).astype(np.int64)
+    j = np.floor(y + s).astype(np.int64)
+    t = (i + j) * G2
+    x0 = x - (i - t)
+    y0 = y - (j - t)
+    i1 = (x0 > y0).astype(np.int64)
+    j1 = 1 - i1
+    ii, jj = i & 255, j & 255
+    corners = [
+        (x0, y0, perm[ii + perm[jj]]),
+        (x0 - i1 + G2, y0 - j1 + G2, perm[ii + i1 + perm[jj + j1]]),
+        (x0 - 1.0 + 2.0 * G2, y0 - 1.0 + 2.0 * G2, perm[ii + 1 + perm[jj + 1]]),
+    ]
+    total = np.zeros_like(x, dtype=float)
+    for cx, cy, h in corners:
+        g = GRADIENTS[h & 7]
+        falloff = np.maximum(0.5 - cx * cx - cy * cy, 0.0)
+        total += falloff ** 4 * (g[..., 0] * cx + g[..., 1] * cy)
+    return np.clip(total * 70.0, -1.0, 1.0)
+
+
+def fbm(x, y, seed, frequency, octaves=5, lacunarity=2.0, gain=0.5):
+    """Fractal sum normalised to about [-1, 1]; one seed per octave like FastNoiseLite."""
+    total = np.zeros_like(x, dtype=float)
+    amp, bound = 1.0, 0.0
+    for octave in range(octaves):
+        total += simplex2(x * frequency, y * frequency, seed + octave) * amp
+        bound += amp
+        amp *= gain
+        frequency *= lacunarity
+    return total / bound
+
+
+def render_terrain(level, theme, map_w, map_h):
+    """(h, w, 3) uint8 terrain at 1/SCALE_DIV of the map size."""
+    w, h = map_w // SCALE_DIV, map_h // SCALE_DIV
+    y, x = np.mgrid[0:h, 0:w].astype(float)
+    n1 = (fbm(x, y, level * 42, 0.025) + 1.0) * 0.5
+    n2 = (fbm(x, y, level * 137, 0.06) + 1.0) * 0.5
+    blend = np.clip(n1 * 0.7 + n2 * 0.3, 0.0, 1.0)[..., None]
+    base = np.asarray(theme["grass"][:3], dtype=float)
+    var = np.asarray(theme["grass_var"][:3], dtype=float)
+    rgb = base + (var - base) * blend
+    return np.round(np.clip(rgb, 0.0, 1.0) * 255).astype(np.uint8)
+
+
+def path_distance(pos, points):
+    """Distance from each of (N, 2) positions to the nearest segment of the path."""
+    p = np.asarray(points, dtype=float)
+    a, ab = p[:-1], np.diff(p, axis=0)
+    len_sq = np.maximum((ab * ab).sum(axis=1), 1e-9)
+    rel = pos[:, None, :] - a[None]                                  # (N, S, 2)
+    t = np.clip((rel * ab[None]).sum(axis=2) / len_sq, 0.0, 1.0)
+    closest = a[None] + ab[None] * t[..., None]
+    return np.hypot(*(pos[:, None, :] - closest).transpose(2, 0, 1)).min(axis=1)
+
+
+# Color.darkened / Color.lightened, alpha kept
+def darkened(c, amount):
+    r, g, b, *a = c
+    return [r * (1.0 - amount), g * (1.0 - amount), b * (1.0 - amount), a[0] if a else 1.0]
+
+
+def lightened(c, amount):
+    r, g, b, *a = c
+    return [r + (1.0 - r) * amount, g + (1.0 - g) * amount, b + (1.0 - b) * amount, a[0] if a else 1.0]
+
+
+def rgba(r, g, b, a=1.0):
+    return [r, g, b, a]
+
+
+# Per-level (roll threshold, builder) tables; mirrors background.gd _make_decoration
+def _valley(rng, theme):
+    return [
+        (0.45, lambda: {"type": "grass_tuft", "height": rng.uniform(6, 14),
+                        "color": darkened(theme["grass_var"], rng.uniform(0.0, 0.2))}),
+        (0.75, lambda: {"type": "flower", "stem_h": rng.uniform(5, 10),
+                        "color": [rgba(0.9, 0.3, 0.3), rgba(0.9, 0.85, 0.2), rgba(0.6, 0.3, 0.8),
+                                  rgba(0.95, 0.95, 0.95)][rng.integers(4)]}),
+        (1.0, lambda: {"type": "rock", "size": rng.uniform(3, 7),
+                       "color": darkened(rgba(0.5, 0.48, 0.44), rng.uniform(0.0, 0.2))}),
+    ]
+
+
+def _crossing(rng, theme):
+    return [
+        (0.4, lambda: {"type": "grass_tuft", "height": rng.uniform(6, 12),
+                       "color": darkened(rgba(0.55, 0.45, 0.15), rng.uniform(0.0, 0.15))}),
+        (0.7, lambda: {"type": "leaf", "rot": rng.uniform(0, 2 * np.pi),
+                       "color": [rgba(0.8, 0.35, 0.1), rgba(0.85, 0.55, 0.1), rgba(0.7, 0.25, 0.08)][rng.integers(3)]}),
+        (0.85, lambda: {"type": "rock", "size": rng.uniform(3, 6),
+                        "color": darkened(rgba(0.55, 0.48, 0.35), rng.uniform(0.0, 0.15))}),
+        (1.0, lambda: {"type": "hay_bale", "size": rng.uniform(8, 14), "color": rgba(0.7, 0.6, 0.25)}),
+    ]
+
+
+def _spiral(rng, theme):
+    return [
+        (0.35, lambda: {"type": "mushroom", "size": rng.uniform(4, 8),
+                        "cap_color": [rgba(0.7, 0.15, 0.1), rgba(0.6, 0.5, 0.2), rgba(0.4, 0.25, 0.5)][rng.integers(3)]}),
+        (0.6, lambda: {"type": "moss", "size": rng.uniform(8, 18), "color": rgba(0.12, 0.28, 0.15, 0.5)}),
+        (0.85, lambda: {"type": "fern", "size": rng.uniform(6, 12), "color": rgba(0.1, 0.3, 0.12)}),
+        (1.0, lambda: {"type": "rock", "size": rng.uniform(3, 8),
+                       "color": darkened(rgba(0.3, 0.3, 0.28), rng.uniform(0.0, 0.15))}),
+    ]
+
+
+def _serpent(rng, theme):
+    return [
+        (0.3, lambda: {"type": "cactus", "height": rng.uniform(10, 22), "color": rgba(0.3, 0.5, 0.2)}),
+        (0.5, lambda: {"type": "rock", "size": rng.uniform(4, 10),
+                       "color": darkened(rgba(0.65, 0.55, 0.38), rng.uniform(0.0, 0.15))}),
+        (0.7, lambda: {"type": "bones", "size": rng.uniform(5, 10), "color": rgba(0.85, 0.82, 0.72)}),
+        (1.0, lambda: {"type": "sand_ripple", "width": rng.uniform(15, 35),
+                       "color": lightened(theme["grass_var"], 0.08)}),
+    ]
+
+
+def _gauntlet(rng, theme):
+    return [
+        (0.3, lambda: {"type": "lava_pool", "size": rng.uniform(8, 20), "color": rgba(0.9, 0.35, 0.05)}),
+        (0.5, lambda: {"type": "crack", "length": rng.uniform(12, 30), "rot": rng.uniform(0, 2 * np.pi),
+                       "color": rgba(0.85, 0.3, 0.05, 0.6)}),
+        (0.7, lambda: {"type": "ember", "size": rng.uniform(2, 5), "color": rgba(1.0, 0.6, 0.1, 0.7)}),
+        (0.85, lambda: {"type": "skull_rock", "size": rng.uniform(5, 10), "color": rgba(0.35, 0.28, 0.25)}),
+        (1.0, lambda: {"type": "rock", "size": rng.uniform(4, 9), "color": rgba(0.25, 0.2, 0.2)}),
+    ]
+
+
+DECORATIONS = {1: _valley, 2: _crossing, 3: _spiral, 4: _serpent, 5: _gauntlet}
+
+
+def _rounded(value):
+    if isinstance(value, (float, np.floating)):
+        return round(float(value), 4)
+    if isinstance(value, list):
+        return [_rounded(v) for v in value]
+    return value
+
+
+def place_decorations(level, theme, points, map_w, map_h):
+    """Decoration dicts for one level, candidates near the path dropped in one pass."""
+    if level not in DECORATIONS:
+        return []
+    rng = np.random.default_rng(level * 7919)
+    count = int(80 * (map_w * map_h) / (1280.0 * 720.0))
+    pos = np.stack([rng.uniform(MARGIN, map_w - MARGIN, count),
+                    rng.uniform(MARGIN, map_h - MARGIN, count)], axis=1)
+    keep = path_distance(pos, points) >= PATH_CLEARANCE
+    table = DECORATIONS[level](rng, theme)
+    out = []
+    for x, y in pos[keep]:
+        roll = rng.random()
+        make = next(build for threshold, build in table if roll < threshold)
+        deco = {k: _rounded(v) for k, v in make().items()}
+        deco["pos"] = [round(float(x), 1), round(float(y), 1)]
+        out.append(deco)
+    return out
+
+
+def source_hash(theme, points, map_w, map_h):
+    h = hashlib.blake2b(digest_size=16)
+    h.update(struct.pack("<3H", VERSION, map_w, map_h))
+    h.update(json.dumps(theme, sort_keys=True).encode())
+    h.update(np.asarray(points, dtype="<f8").tobytes())
+    return h.hexdigest()
+
+
+def cached_hash(json_path, png_path):
+    if not png_path.exists():
+        return None
+    try:
+        with open(json_path) as f:
+            data = json.load(f)
+    except (OSError, ValueError):
+        return None
+    return data.get("hash") if data.get("version") == VERSION else None
+
+
+def main():
+    ap = argparse.ArgumentParser(description="Bake terrain textures and decoration lists for every level")
+    ap.add_argument("--level", type=int, help="only this level")
+    ap.add_argument("--size", type=int, help="only this MAP_SIZES index")
+    ap.add_argument("--out", type=Path, default=OUT_DIR)
+    ap.add_argument("--force", action="store_true", help="rebake even if the hash matches")
+    args = ap.parse_args()
+
+    levels = gd_data.load_levels()
+    themes = gd_data.load_terrain_themes()
+    sizes = gd_data.load_map_sizes()
+    todo = [args.level] if args.level else sorted(levels)
+    presets = [sizes[args.size]] if args.size is not None else sizes
+    args.out.mkdir(parents=True, exist_ok=True)
+    print(f"TERRAIN: {len(todo)} levels x {len(presets)} map sizes → {args.out}", flush=True)
+
+    for level in todo:
+        if level not in levels:
+            print(f"  ✗ level {level} not in level_data.gd", flush=True)
+            return 1
+        theme = themes.get(level, themes[1])
+        points = levels[level]["path"]
+        for preset in presets:
+            map_w, map_h = preset["width"], preset["height"]
+            stem = f"level_{level}_{map_w}x{map_h}"
+            png_path, json_path = args.out / f"{stem}.png", args.out / f"{stem}.json"
+            digest = source_hash(theme, points, map_w, map_h)
+            if not args.force and cached_hash(json_path, png_path) == digest:
+                print(f"  → {stem} unchanged, cached", flush=True)
+                continue
+            Image.fromarray(render_terrain(level, theme, map_w, map_h), "RGB").save(png_path)
+            write_import(png_path)
+            decorations = place_decorations(level, theme, points, map_w, map_h)
+            json_path.write_text(json.dumps({
+                "version": VERSION, "hash": digest, "level": level, "map": [map_w, map_h],
+                "decorations": decorations}, separators=(",", ":")))
+            print(f"  ✓ {stem} ({levels[level]['name']}) {png_path.stat().st_size // 1024}KB, "
+                  f"{len(decorations)} decorations", flush=True)
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
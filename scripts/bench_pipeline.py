@@ -0,0 +1,260 @@
+#!/usr/bin/env python3
+"""Stage-level benchmark for the sprite pipeline against the fake backend.
+
+Runs each stage of a generation repeatedly against fake_pixellab.py with a
+fixed latency and no errors, so the numbers only move when the pipeline
+code does:
+
+    spawn       one `MCPORTER call` with zero latency (process launch cost)
+    cli_call    one `MCPORTER call` with the configured latency
+    pool_call   one call through a warm gen_worker.WorkerPool (files on disk)
+    inline_walk one inline 4-frame walk call through the pool (in memory)
+    decode      open + convert a 128px raw output
+    resize      128 → 64 nearest resize
+    encode      PNG save of the 64px sprite
+    gen_static  generate_demons_v2.gen_static end to end (pool, inline)
+    gen_walk    generate_demons_v2.gen_walk end to end (pool, inline)
+    assemble    normalize_sheet on raw walk frame files
+
+Each stage records median/p90 wall time, median CPU time (this process plus
+reaped children; long-lived pool workers are not included) and this
+process's peak RSS during the stage. The kernel's high-water mark is reset
+before each stage (/proc/self/clear_refs), so a stage is not charged for
+what an earlier one allocated; rss_growth_mb is that peak minus the RSS the
+stage started from. Where the reset isn't available both are left null.
+
+Passing runs are appended to a JSON history; a stage whose median is slower
+than the median of the last --baseline matching runs by more than
+--tolerance fails the run (exit 1) and the run is not recorded, so a
+regression never becomes part of its own baseline.
+
+Usage: bench_pipeline.py [--iterations 10] [--latency 0.05] [--stages a,b]
+                         [--history FILE] [--tolerance 0.25] [--no-record]
+"""
+
+import argparse
+import contextlib
+import json
+import os
+import re
+import resource
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+import numpy as np
+from PIL import Image
+
+SCRIPTS = Path(__file__).resolve().parent
+FAKE = f"{sys.executable} {SCRIPTS / 'fake_pixellab.py'}"
+HISTORY = os.environ.get("BENCH_HISTORY", os.path.expanduser("~/.cache/hell-marches/bench_pipeline.json"))
+MIN_SLACK_MS = 2.0  # regressions smaller than this are timer noise
+
+# The pipeline modules read MCPORTER / GEN_WORKER at import time
+os.environ["MCPORTER"] = FAKE
+os.environ["GEN_WORKER"] = f"{FAKE} --worker"
+os.environ["FAKE_ERROR_RATE"] = "0"
+
+import generate_demons_v2 as gen  # noqa: E402
+from gen_worker import WorkerPool  # noqa: E402
+from normalize_sheets import normalize_sheet  # noqa: E402
+from sprite_scheduler import _cli_call, mcp  # noqa: E402
+
+STAGES = ["spawn", "cli_call", "pool_call", "inline_walk", "decode", "resize", "encode",
+          "gen_static", "gen_walk", "assemble"]
+DEMON = ("imp", "small red imp demon", "")
+
+
+def _cpu():
+    own = resource.getrusage(resource.RUSAGE_SELF)
+    kids = resource.getrusage(resource.RUSAGE_CHILDREN)
+    return own.ru_utime + own.ru_stime + kids.ru_utime + kids.ru_stime
+
+
+def _status_kib(field):
+    """A VmXXX field of /proc/self/status in KiB, or None off Linux."""
+    try:
+        with open("/proc/self/status") as f:
+            m = re.search(rf"^{field}:\s+(\d+) kB", f.read(), re.M)
+    except OSError:
+        return None
+    return int(m.group(1)) if m else None
+
+
+def _reset_peak_rss():
+    """Reset this process's RSS high-water mark; False if the kernel won't."""
+    try:
+        with open("/proc/self/clear_refs", "w") as f:
+            f.write("5")
+    except OSError:
+        return False
+    return True
+
+
+def measure(fn, iterations):
+    """Run fn() `iterations` times; returns the stage's stats dict."""
+    tracked = _reset_peak_rss()
+    start_kib = _status_kib("VmRSS")
+    fn()  # warm-up, not recorded (its allocations still count towards the peak)
+    walls, cpus = [], []
+    for _ in range(iterations):
+        c0, t0 = _cpu(), time.perf_counter()
+        fn()
+        walls.append((time.perf_counter() - t0) * 1000)
+        cpus.append((_cpu() - c0) * 1000)
+    peak_kib = _status_kib("VmHWM") if tracked else None
+    return {
+        "wall_ms": float(np.median(walls)),
+        "wall_p90_ms": float(np.percentile(walls, 90)),
+        "cpu_ms": float(np.median(cpus)),
+        "peak_rss_mb": round(peak_kib / 1024, 1) if peak_kib else None,
+        "rss_growth_mb": round((peak_kib - start_kib) / 1024, 1) if peak_kib and start_kib else None,
+    }
+
+
+class Bench:
+    """Stage callables sharing one temp tree and one warm worker pool."""
+
+    def __init__(self, tmp, latency):
+        self.tmp = tmp
+        self.latency = latency
+        gen.TEMP_DIR = os.path.join(tmp, "raw")
+        gen.ENEMIES_DIR = os.path.join(tmp, "enemies")
+        gen.STYLE_REF = os.path.join(tmp, "style_ref_128.png")
+        gen.CACHE = None
+        os.makedirs(gen.TEMP_DIR)
+        os.makedirs(gen.ENEMIES_DIR)
+        Image.new("RGBA", (128, 128), (120, 20, 20, 255)).save(gen.STYLE_REF)
+        os.environ["FAKE_LATENCY"] = str(latency)
+        gen.POOL = WorkerPool(1, cwd=tmp)
+        self.call = f'pixellab.generate_image_bitforge(description: "bench", width: 128, height: 128, ' \
+                    f'save_to_file: "{os.path.join(tmp, "bench_raw.png")}", show_image: false)'
+        self.static = gen.gen_static(*DEMON)
+        self.frames = mcp(self._walk_call(), pool=gen.POOL)
+        self.raw_path = mcp(self.call, pool=gen.POOL)[0]
+        self.raw = Image.open(self.raw_path).convert("RGBA")
+        self.img = self.raw.resize((64, 64), Image.NEAREST)
+
+    def _walk_call(self):
+        return (f'pixellab.animate_with_text(description: "bench walk", reference_image_path: "{self.static}", '
+                f'width: 64, height: 64, n_frames: 4, '
+                f'save_to_file: "{os.path.join(self.tmp, "bench_walk.png")}", show_image: false)')
+
+    def close(self):
+        gen.POOL.close()
+
+    def spawn(self):
+        os.environ["FAKE_LATENCY"] = "0"
+        try:
+            _cli_call(self.call, 60, None)
+        finally:
+            os.environ["FAKE_LATENCY"] = str(self.latency)
+
+    def cli_call(self):
+        _cli_call(self.call, 60, None)
+
+    def pool_call(self):
+        gen.POOL.call(self.call, 60)
+
+    def inline_walk(self):
+        gen.POOL.call(self._walk_call(), 60, on_frame=lambda i, name, data: None)
+
+    def decode(self):
+        Image.open(self.raw_path).convert("RGBA")
+
+    def resize(self):
+        self.raw.resize((64, 64), Image.NEAREST)
+
+    def encode(self):
+        self.img.save(os.path.join(self.tmp, "bench_encode.png"))
+
+    def gen_static(self):
+        gen.gen_static(*DEMON)
+
+    def gen_walk(self):
+        gen.gen_walk(DEMON[0], DEMON[1], self.static)
+
+    def assemble(self):
+        normalize_sheet(self.frames, os.path.join(self.tmp, "bench_sheet.png"))
+
+
+def load_history(path):
+    try:
+        with open(path) as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return []
+
+
+def baseline(history, config, stage, runs):
+    """Median wall time of `stage` over the last `runs` runs with the same config."""
+    past = [h["stages"][stage]["wall_ms"] for h in history
+            if h.get("config") == config and stage in h.get("stages", {})][-runs:]
+    return float(np.median(past)) if past else None
+
+
+def main():
+    ap = argparse.ArgumentParser(description="Benchmark the sprite pipeline stages")
+    ap.add_argument("--iterations", type=int, default=10)
+    ap.add_argument("--latency", type=float, default=0.05, help="fake backend seconds per call")
+    ap.add_argument("--stages", default=",".join(STAGES), help="comma list")
+    ap.add_argument("--history", default=HISTORY)
+    ap.add_argument("--baseline", type=int, default=5, help="past runs to compare against")
+    ap.add_argument("--tolerance", type=float, default=0.25, help="allowed slowdown vs baseline")
+    ap.add_argument("--no-record", action="store_true", help="don't append this run to the history "
+                                                             "(failing runs are never appended)")
+    args = ap.parse_args()
+
+    stages = [s for s in args.stages.split(",") if s]
+    unknown = set(stages) - set(STAGES)
+    if unknown:
+        ap.error(f"unknown stages: {', '.join(sorted(unknown))}")
+    config = {"iterations": args.iterations, "latency": args.latency}
+    history = load_history(args.history)
+
+    print(f"BENCH: {len(stages)} stages x {args.iterations}, fake latency {args.latency * 1000:.0f}ms", flush=True)
+    results, failed = {}, []
+    # The pipeline's own progress lines are noise here
+    with tempfile.TemporaryDirectory(prefix="bench_pipeline_") as tmp, open(os.devnull, "w") as null:
+        with contextlib.redirect_stdout(null):
+            bench = Bench(tmp, args.latency)
+        try:
+            for stage in stages:
+                with contextlib.redirect_stdout(null):
+                    stats = measure(getattr(bench, stage), args.iterations)
+                results[stage] = stats
+                base = baseline(history, config, stage, args.baseline)
+                note = ""
+                if base is not None:
+                    change = stats["wall_ms"] / base - 1 if base > 0 else 0.0
+                    note = f"  {change:+6.1%} vs {base:.1f}ms"
+                    if stats["wall_ms"] > base * (1 + args.tolerance) and stats["wall_ms"] - base > MIN_SLACK_MS:
+                        failed.append(stage)
+                        note += "  ✗ slower than threshold"
+                rss = "     n/a" if stats["peak_rss_mb"] is None else \
+                    f"{stats['peak_rss_mb']:6.1f}MB (+{stats['rss_growth_mb']:.1f})"
+                print(f"  {stage:11s} wall {stats['wall_ms']:8.1f}ms (p90 {stats['wall_p90_ms']:8.1f})  "
+                      f"cpu {stats['cpu_ms']:7.1f}ms  rss {rss}{note}", flush=True)
+        finally:
+            bench.close()
+
+    if failed and not args.no_record:
+        print("  → not recorded: a failing run would drag the baseline", flush=True)
+    elif not args.no_record:
+        history.append({"time": time.strftime("%Y-%m-%dT%H:%M:%S"), "config": config, "stages": results})
+        os.makedirs(os.path.dirname(os.path.abspath(args.history)), exist_ok=True)
+        tmp = args.history + ".tmp"
+        with open(tmp, "w") as f:
+            json.dump(history, f, indent=1)
+        os.replace(tmp, args.history)
+        print(f"  → recorded in {args.history}", flush=True)
+    if failed:
+        print(f"✗ regressions: {', '.join(failed)}", flush=True)
+        return 1
+    print("✓ no regressions", flush=True)
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,235 @@
+#!/usr/bin/env python3
+"""Pack enemy walk sheets, death effects, towers and projectiles into atlases.
+
+Every sheet is cut into square frames (frame size = sheet height), identical
+frames are stored once, and the frames are shelf-packed into a few
+power-of-two textures. Per-frame regions go to atlas.json, keyed by the
+original res:// path, so SpriteAtlas (scripts/effects/sprite_atlas.gd) can
+hand out AtlasTexture frames without slicing images at runtime.
+
+Each atlas gets a Godot .import sidecar (lossless, no mipmaps, like the
+sprites it packs) when it has none, so a checkout imports it as-is.
+--out must be inside the project: atlas.json stores res:// paths.
+
+Usage: build_atlas.py [--out DIR] [--max-size 2048] [--padding 2]
+"""
+
+import argparse
+import hashlib
+import json
+import os
+import random
+from pathlib import Path
+
+from PIL import Image
+
+ROOT = Path(__file__).resolve().parent.parent
+SPRITES = ROOT / "assets" / "sprites"
+OUT_DIR = SPRITES / "atlas"
+
+# atlas name → glob patterns (relative to assets/sprites); old/ is never packed
+GROUPS = {
+    "enemies": ["enemies/*_walk_sheet.png"],
+    "effects": ["effects/death_*_sheet.png"],
+    "props": ["towers/*_tower.png", "towers/gold_mine.png", "projectiles/*_proj.png"],
+}
+
+
+IMPORT_SIDECAR = """[remap]
+
+importer="texture"
+type="CompressedTexture2D"
+uid="{uid}"
+path="{imported}"
+metadata={{
+"vram_texture": false
+}}
+
+[deps]
+
+source_file="{source}"
+dest_files=["{imported}"]
+
+[params]
+
+compress/mode=0
+compress/high_quality=false
+compress/lossy_quality=0.7
+compress/uastc_level=0
+compress/rdo_quality_loss=0.0
+compress/hdr_compression=1
+compress/normal_map=0
+compress/channel_pack=0
+mipmaps/generate=false
+mipmaps/limit=-1
+roughness/mode=0
+roughness/src_normal=""
+process/channel_remap/red=0
+process/channel_remap/green=1
+process/channel_remap/blue=2
+process/channel_remap/alpha=3
+process/fix_alpha_border=true
+process/premult_alpha=false
+process/normal_map_invert_y=false
+process/hdr_as_srgb=false
+process/hdr_clamp_exposure=false
+process/size_limit=0
+detect_3d/compress_to=1
+"""
+
+
+def res_path(path):
+    return "res://" + path.relative_to(ROOT).as_posix()
+
+
+def new_uid():
+    """A random ResourceUID in Godot's text form (base 36, a-z then 0-9)."""
+    n, text = random.getrandbits(63), ""
+    while True:
+        n, c = divmod(n, 36)
+        text = (chr(ord("a") + c) if c < 26 else chr(ord("0") + c - 26)) + text
+        if not n:
+            return "uid://" + text
+
+
+def write_import(png):
+    """Give a new texture the sidecar Godot would write; existing ones (and their uid) stay.
+    Files outside the project have no res:// path and get none."""
+    png = Path(png).resolve()
+    sidecar = png.with_name(png.name + ".import")
+    if sidecar.exists() or not png.is_relative_to(ROOT):
+        return
+    source = res_path(png)
+    imported = f"res://.godot/imported/{png.name}-{hashlib.md5(source.encode()).hexdigest()}.ctex"
+    sidecar.write_text(IMPORT_SIDECAR.format(uid=new_uid(), imported=imported, source=source))
+
+
+def collect(patterns):
+    files = []
+    for pattern in patterns:
+        files.extend(p for p in sorted(SPRITES.glob(pattern)) if "old" not in p.parts)
+    return files
+
+
+def slice_frames(img):
+    """Cut a horizontal strip into square frames; single images are one frame."""
+    w, h = img.size
+    if w > h and w % h == 0:
+        return [img.crop((i * h, 0, (i + 1) * h, h)) for i in range(w // h)]
+    return [img]
+
+
+def next_pow2(n):
+    return 1 << max(0, (n - 1).bit_length())
+
+
+def shelf_pack(sizes, width, padding):
+    """Place rects (tallest first) on shelves of a fixed width. Returns positions and used height."""
+    order = sorted(range(len(sizes)), key=lambda i: (-sizes[i][1], -sizes[i][0]))
+    pos = [None] * len(sizes)
+    x = y = shelf_h = 0
+    for i in order:
+        w, h = sizes[i]
+        if x + w + padding > width:
+            x, y, shelf_h = 0, y + shelf_h, 0
+        pos[i] = (x + padding, y + padding)
+        x += w + padding
+        shelf_h = max(shelf_h, h + padding)
+    return pos, y + shelf_h + padding
+
+
+def build_group(name, files, out_dir, max_size, padding):
+    unique = {}  # frame hash → index into frames
+    frames = []
+    sprites = {}
+    for path in files:
+        img = Image.open(path).convert("RGBA")
+        refs = []
+        for frame in slice_frames(img):
+            digest = hashlib.sha1(frame.tobytes() + bytes(str(frame.size), "ascii")).hexdigest()
+            if digest not in unique:
+                unique[digest] = len(frames)
+                frames.append(frame)
+            refs.append(unique[digest])
+        sprites[res_path(path)] = refs
+
+    sizes = [f.size for f in frames]
+    area = sum((w + padding) * (h + padding) for w, h in sizes)
+    width = min(max_size, max(next_pow2(int(area ** 0.5)), next_pow2(max(w for w, _ in sizes) + 2 * padding)))
+    pos, used_h = shelf_pack(sizes, width, padding)
+    height = next_pow2(used_h)
+    if height > max_size:
+        raise SystemExit(f"✗ {name}: {len(frames)} frames do not fit in {max_size}x{max_size}")
+    # Prefer a squarer texture if a narrower width still fits
+    while width > 64 and height < width // 2:
+        pos2, used2 = shelf_pack(sizes, width // 2, padding)
+        if next_pow2(used2) > max_size:
+            break
+        width, pos, height = width // 2, pos2, next_pow2(used2)
+
+    atlas = Image.new("RGBA", (width, height), (0, 0, 0, 0))
+    for frame, (x, y) in zip(frames, pos):
+        atlas.paste(frame, (x, y))
+    png = out_dir / f"{name}.png"
+    atlas.save(png, optimize=True)
+    write_import(png)
+
+    regions = {
+        path: [[pos[i][0], pos[i][1], sizes[i][0], sizes[i][1]] for i in refs]
+        for path, refs in sprites.items()
+    }
+    total = sum(len(r) for r in sprites.values())
+    print(f"  {name:8s} {width}x{height}  {len(files)} sources, {total} frames ({len(frames)} unique)  "
+          f"{os.path.getsize(png)}b", flush=True)
+    return res_path(png), regions
+
+
+def build(out_dir=OUT_DIR, max_size=2048, padding=2):
+    """Pack every group into out_dir. Returns the files written (atlases + atlas.json)."""
+    out_dir = Path(out_dir).resolve()
+    out_dir.mkdir(parents=True, exist_ok=True)
+    print(f"ATLAS → {out_dir}", flush=True)
+    meta = {"version": 1, "atlases": {}, "sprites": {}}
+    written = []
+    for name, patterns in GROUPS.items():
+        files = collect(patterns)
+        if not files:
+            print(f"  {name:8s} — no sources", flush=True)
+            continue
+        texture, regions = build_group(name, files, out_dir, max_size, padding)
+        meta["atlases"][name] = texture
+        written.append(str(out_dir / f"{name}.png"))
+        for path, rects in regions.items():
+            meta["sprites"][path] = {"atlas": name, "frames": rects}
+
+    with open(out_dir / "atlas.json", "w") as f:
+        json.dump(meta, f, indent=1, sort_keys=True)
+    written.append(str(out_dir / "atlas.json"))
+    print(f"  → {out_dir / 'atlas.json'} ({len(meta['sprites'])} sprites)", flush=True)
+    return written
+
+
+def sources():
+    """Every file the atlases are built from."""
+    return [p for patterns in GROUPS.values() for p in collect(patterns)]
+
+
+def outputs(out_dir=OUT_DIR):
+    """The files build() writes: one atlas per group that has sources, and atlas.json."""
+    out_dir = Path(out_dir).resolve()
+    return [out_dir / f"{name}.png" for name, patterns in GROUPS.items() if collect(patterns)] + [out_dir / "atlas.json"]
+
+
+def main():
+    ap = argparse.ArgumentParser(description="Build sprite atlases + atlas.json")
+    ap.add_argument("--out", type=Path, default=OUT_DIR)
+    ap.add_argument("--max-size", type=int, default=2048)
+    ap.add_argument("--padding", type=int, default=2)
+    args = ap.parse_args()
+    args.out = args.out.resolve()
+    if not args.out.is_relative_to(ROOT):
+        ap.error(f"--out must be inside the project ({ROOT}): atlas.json stores res:// paths")
+    build(args.out, args.max_size, args.padding)
+
+if __name__ == "__main__":
+    main()
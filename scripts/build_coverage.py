@@ -0,0 +1,177 @@
+#!/usr/bin/env python3
+"""Precompute per-anchor path coverage for every level and tower range.
+
+For every 2x2 placement anchor and every distinct tower range (base and
+upgraded, from game_manager.gd) this stores how much of the enemy path the
+tower can reach, and where along the path that reach starts and ends:
+
+    arc     reachable path length in px
+    entry   progress ratio where the path first enters range
+    exit    progress ratio where it last leaves range
+
+Reach is range + enemy collision radius, the distance at which the tower's
+RangeArea starts overlapping an enemy. Each path segment is intersected with
+the reach circle exactly, for all anchors at once.
+
+Output is one little-endian file per level and map size preset
+(settings_manager.gd MAP_SIZES), level_N_WxH.cov under
+assets/data/coverage/, covering every anchor of that size's grid. The files
+are committed with the game (re-run after editing paths, tower ranges or
+map sizes) and read by scripts/data/coverage_map.gd for the current map:
+
+    header  "HMCV", u16 version, u16 anchors_w, u16 anchors_h, u16 n_ranges,
+            f32 path_length, 16-byte source hash
+    ranges  u16[n_ranges]
+    data    per range: u16 arc[A], u16 entry[A], u16 exit[A]
+            A = anchors_w * anchors_h, index ay * anchors_w + ax
+            ratios are scaled to 0..65534, 65535 = never in range
+
+A file whose hash matches the current path points, ranges and grid is left
+alone, so re-running after unrelated edits is free.
+
+Usage: build_coverage.py [--level N] [--size INDEX] [--out DIR] [--force]
+"""
+
+import argparse
+import hashlib
+import struct
+from pathlib import Path
+
+import numpy as np
+
+import gd_data
+from level_map import CELL_SIZE, anchor_center
+
+ROOT = Path(__file__).resolve().parent.parent
+OUT_DIR = ROOT / "assets" / "data" / "coverage"
+VERSION = 1
+MAGIC = b"HMCV"
+HEADER = struct.Struct("<4sHHHHf16s")
+ENEMY_RADIUS = 12.0  # scenes/enemies/enemy.tscn collision circle
+NONE = 0xFFFF
+
+
+def tower_ranges(towers, upgrades):
+    """Sorted distinct non-zero ranges a tower can have, upgrades included."""
+    ranges = {t.get("range", 0) for t in towers.values()}
+    for paths in upgrades.values():
+        for path in paths.values():
+            for tier in path.get("upgrades", []):
+                ranges.add(tier.get("changes", {}).get("range", 0))
+    return sorted(int(r) for r in ranges if r > 0)
+
+
+def source_hash(points, ranges, grid_w, grid_h):
+    h = hashlib.blake2b(digest_size=16)
+    h.update(struct.pack("<4H", VERSION, grid_w, grid_h, CELL_SIZE))
+    h.update(struct.pack("<d", ENEMY_RADIUS))
+    h.update(np.asarray(points, dtype="<f8").tobytes())
+    h.update(np.asarray(ranges, dtype="<u2").tobytes())
+    return h.digest()
+
+
+def anchor_centers(grid_w, grid_h):
+    """(A, 2) world centres of every anchor of a grid_w x grid_h grid, row-major (ay * anchors_w + ax)."""
+    ax, ay = np.meshgrid(np.arange(grid_w - 1), np.arange(grid_h - 1))
+    cx, cy = anchor_center(ax.ravel(), ay.ravel())
+    return np.stack([cx, cy], axis=1).astype(float)
+
+
+def coverage(points, centers, reach):
+    """(arc, entry, exit) arrays over anchors for one reach radius; entry/exit are px, NaN if none."""
+    p = np.asarray(points, dtype=float)
+    seg = np.diff(p, axis=0)
+    seg_len = np.hypot(seg[:, 0], seg[:, 1])
+    start = np.concatenate([[0.0], np.cumsum(seg_len)[:-1]])
+    keep = seg_len > 0
+    p0, seg, seg_len, start = p[:-1][keep], seg[keep], seg_len[keep], start[keep]
+    u = seg / seg_len[:, None]
+
+    # Solve |p0 + t*u - c| = reach for t along each segment, for all anchors
+    f = p0[None, :, :] - centers[:, None, :]          # (A, S, 2)
+    b = (f * u[None]).sum(axis=2)
+    disc = b * b - ((f * f).sum(axis=2) - reach * reach)
+    root = np.sqrt(np.maximum(disc, 0.0))
+    t0 = np.clip(-b - root, 0.0, seg_len)
+    t1 = np.clip(-b + root, 0.0, seg_len)
+    hit = (disc > 0) & (t1 > t0)
+
+    arc = np.where(hit, t1 - t0, 0.0).sum(axis=1)
+    entry = np.where(hit, start + t0, np.inf).min(axis=1)
+    exit_ = np.where(hit, start + t1, -np.inf).max(axis=1)
+    none = ~hit.any(axis=1)
+    entry[none] = np.nan
+    exit_[none] = np.nan
+    return arc, entry, exit_
+
+
+def _ratio(px, length):
+    out = np.full(px.shape, NONE, dtype="<u2")
+    ok = ~np.isnan(px)
+    out[ok] = np.round(np.clip(px[ok] / length, 0.0, 1.0) * (NONE - 1))
+    return out
+
+
+def build_level(points, ranges, grid_w, grid_h, digest):
+    centers = anchor_centers(grid_w, grid_h)
+    length = float(np.hypot(*np.diff(np.asarray(points, dtype=float), axis=0).T).sum())
+    blocks = []
+    for r in ranges:
+        arc, entry, exit_ = coverage(points, centers, r + ENEMY_RADIUS)
+        blocks += [np.minimum(np.round(arc), NONE).astype("<u2"), _ratio(entry, length), _ratio(exit_, length)]
+    header = HEADER.pack(MAGIC, VERSION, grid_w - 1, grid_h - 1, len(ranges), length, digest)
+    return header + np.asarray(ranges, dtype="<u2").tobytes() + b"".join(b.tobytes() for b in blocks)
+
+
+def cached_hash(path):
+    try:
+        with open(path, "rb") as f:
+            head = f.read(HEADER.size)
+    except OSError:
+        return None
+    if len(head) < HEADER.size:
+        return None
+    magic, version, *_, digest = HEADER.unpack(head)
+    return digest if magic == MAGIC and version == VERSION else None
+
+
+def main():
+    ap = argparse.ArgumentParser(description="Precompute tower coverage maps for every level")
+    ap.add_argument("--level", type=int, help="only this level")
+    ap.add_argument("--size", type=int, help="only this MAP_SIZES index")
+    ap.add_argument("--out", type=Path, default=OUT_DIR)
+    ap.add_argument("--force", action="store_true", help="rebuild even if the hash matches")
+    args = ap.parse_args()
+
+    levels = gd_data.load_levels()
+    sizes = gd_data.load_map_sizes()
+    ranges = tower_ranges(gd_data.load_tower_data(), gd_data.load_upgrade_data())
+    todo = [args.level] if args.level else sorted(levels)
+    if args.size is not None and not 0 <= args.size < len(sizes):
+        ap.error(f"--size must be 0..{len(sizes) - 1}")
+    presets = [sizes[args.size]] if args.size is not None else sizes
+    args.out.mkdir(parents=True, exist_ok=True)
+    print(f"COVERAGE: {len(todo)} levels x {len(presets)} map sizes, ranges {ranges} → {args.out}", flush=True)
+
+    for level in todo:
+        if level not in levels:
+            print(f"  ✗ level {level} not in level_data.gd", flush=True)
+            return 1
+        points = levels[level]["path"]
+        for preset in presets:
+            map_w, map_h = preset["width"], preset["height"]
+            grid_w, grid_h = map_w // CELL_SIZE, map_h // CELL_SIZE  # GridManager.setup_for_map
+            stem = f"level_{level}_{map_w}x{map_h}"
+            path = args.out / f"{stem}.cov"
+            digest = source_hash(points, ranges, grid_w, grid_h)
+            if not args.force and cached_hash(path) == digest:
+                print(f"  → {stem} unchanged, cached", flush=True)
+                continue
+            data = build_level(points, ranges, grid_w, grid_h, digest)
+            path.write_bytes(data)
+            print(f"  ✓ {stem} ({levels[level]['name']}) {len(data) // 1024}KB", flush=True)
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,155 @@
+#!/usr/bin/env python3
+"""Compile level_data.gd waves into flat spawn timelines plus per-wave stats.
+
+A wave is a list of groups ({"type", "count", "delay"}) spawned one after
+another: each enemy spawns, then the next one waits the group's delay.
+Compiling flattens that into columns sorted by spawn time, which the game
+drains with one cursor per frame (scripts/data/spawn_timeline.gd):
+
+    t       spawn offset from wave start, seconds
+    type    enemy type
+    hp      health (enemy.gd enemy_types)
+    reward  gold on kill
+
+"end" is when spawning counts as finished: the last spawn plus its delay,
+matching the old awaited-timer loop.
+
+Stats per wave, for the HUD and balance checks:
+
+    count     enemies
+    hp        total health
+    gold      kill rewards, bonus = end-of-wave bonus (25 + 5 * wave)
+    peak      most enemies on the path at once if none are killed
+    clear     when the last enemy would leak if none are killed, seconds
+
+Output is one JSON file per level under assets/data/waves/, committed
+with the game: re-run after editing waves, enemy stats or paths. Files
+whose hash (waves, enemy stats, path, version) matches are left alone;
+--check only reports stale files and exits 1 if any.
+
+Usage: compile_waves.py [--level N] [--out DIR] [--force] [--check] [--table]
+"""
+
+import argparse
+import hashlib
+import json
+from pathlib import Path
+
+import numpy as np
+
+import gd_data
+from level_map import PathLine
+
+ROOT = Path(__file__).resolve().parent.parent
+OUT_DIR = ROOT / "assets" / "data" / "waves"
+VERSION = 1
+FALLBACK_TYPE = "imp"  # wave_sim.py uses the same stand-in for unknown types
+
+
+def timeline(groups):
+    """(spawn times, types, end) for one wave's groups, sorted by time."""
+    times, types, clock = [], [], 0.0
+    for g in groups:
+        for _ in range(g["count"]):
+            times.append(clock)
+            types.append(g["type"])
+            clock += g["delay"]
+    order = sorted(range(len(times)), key=times.__getitem__)
+    return [times[i] for i in order], [types[i] for i in order], clock
+
+
+def compile_wave(number, groups, enemies, path_length):
+    times, types, end = timeline(groups)
+    stats = [enemies.get(t, enemies[FALLBACK_TYPE]) for t in types]
+    hp = [s["health"] for s in stats]
+    reward = [s["reward"] for s in stats]
+    spawn = np.asarray(times, dtype=float)
+    leave = spawn + path_length / np.asarray([s["speed"] for s in stats], dtype=float)
+    # Sweep spawn (+1) / leave (-1) events; leaves sort first at equal times
+    events = sorted([(t, 1) for t in spawn] + [(t, -1) for t in leave], key=lambda e: (e[0], e[1]))
+    on_path = np.cumsum([d for _, d in events]) if events else np.zeros(1)
+    return {
+        "spawns": {"t": [round(t, 3) for t in times], "type": types, "hp": hp, "reward": reward},
+        "end": round(end, 3),
+        "stats": {
+            "count": len(types),
+            "hp": int(sum(hp)),
+            "gold": int(sum(reward)),
+            "bonus": 25 + 5 * number,
+            "peak": int(on_path.max()),
+            "clear": round(float(leave.max()), 1) if len(leave) else 0.0,
+        },
+    }
+
+
+def compile_level(level, data, enemies):
+    length = PathLine(data["path"]).length
+    waves = [compile_wave(i + 1, groups, enemies, length) for i, groups in enumerate(data["waves"])]
+    return {"version": VERSION, "level": level, "path_length": round(length, 1), "waves": waves}
+
+
+def source_hash(data, enemies):
+    h = hashlib.blake2b(digest_size=16)
+    h.update(json.dumps([VERSION, data["path"], data["waves"], enemies], sort_keys=True).encode())
+    return h.hexdigest()
+
+
+def cached_hash(path):
+    try:
+        data = json.loads(path.read_text())
+    except (OSError, ValueError):
+        return None
+    return data.get("hash") if data.get("version") == VERSION else None
+
+
+def print_table(level, compiled):
+    print(f"  level {level}  (path {compiled['path_length']:.0f}px)", flush=True)
+    print(f"    {'wave':>4} {'count':>5} {'hp':>6} {'gold':>5} {'bonus':>5} {'peak':>4} {'spawn':>6} {'clear':>6}")
+    for i, w in enumerate(compiled["waves"], 1):
+        s = w["stats"]
+        print(f"    {i:4d} {s['count']:5d} {s['hp']:6d} {s['gold']:5d} {s['bonus']:5d} "
+              f"{s['peak']:4d} {w['end']:5.1f}s {s['clear']:5.1f}s")
+
+
+def main():
+    ap = argparse.ArgumentParser(description="Compile wave spawn timelines and per-wave stats")
+    ap.add_argument("--level", type=int, help="only this level")
+    ap.add_argument("--out", type=Path, default=OUT_DIR)
+    ap.add_argument("--force", action="store_true", help="rewrite even if the hash matches")
+    ap.add_argument("--check", action="store_true", help="write nothing, exit 1 if any file is stale")
+    ap.add_argument("--table", action="store_true", help="print the per-wave stats")
+    args = ap.parse_args()
+
+    levels = gd_data.load_levels()
+    enemies = gd_data.load_enemy_types()
+    todo = [args.level] if args.level else sorted(levels)
+    if not args.check:
+        args.out.mkdir(parents=True, exist_ok=True)
+    print(f"WAVES: {len(todo)} levels → {args.out}", flush=True)
+
+    stale = 0
+    for level in todo:
+        if level not in levels:
+            print(f"  ✗ level {level} not in level_data.gd", flush=True)
+            return 1
+        path = args.out / f"level_{level}.json"
+        digest = source_hash(levels[level], enemies)
+        compiled = compile_level(level, levels[level], enemies)
+        if args.table:
+            print_table(level, compiled)
+        if not args.force and cached_hash(path) == digest:
+            print(f"  → level {level} unchanged, cached", flush=True)
+            continue
+        if args.check:
+            print(f"  ✗ level {level} stale — run compile_waves.py", flush=True)
+            stale += 1
+            continue
+        compiled["hash"] = digest
+        path.write_text(json.dumps(compiled, separators=(",", ":")))
+        total = sum(len(w["spawns"]["t"]) for w in compiled["waves"])
+        print(f"  ✓ level {level} ({levels[level]['name']}) {len(compiled['waves'])} waves, {total} spawns", flush=True)
+    return 1 if stale else 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
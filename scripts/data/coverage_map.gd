@@ -0,0 +1,76 @@
+extends RefCounted
+class_name CoverageMap
+
+## Precomputed path coverage per tower anchor, from scripts/build_coverage.py
+## For a 2x2 anchor cell and a tower range: reachable path length in px and
+## the progress ratios where the path enters and leaves range
+## Lookups are O(1) reads from the packed file for the level and the current
+## map size (Settings.map_width x map_height, which sizes GridManager's grid), loaded once
+## Levels or map sizes without a coverage file (or ranges not in it) return {}
+## NOTE: *.cov files must be included in export presets (filter "*.cov")
+
+const COVERAGE_DIR = "res://assets/data/coverage/"
+const MAGIC = "HMCV"
+const VERSION: int = 1
+const HEADER_SIZE: int = 32
+const NONE: int = 0xFFFF
+
+static var _levels: Dictionary = {}   # .cov path -> {w, h, length, ranges, data} or {}
+
+static func _load_level(level: int) -> Dictionary:
+	var path = COVERAGE_DIR + "level_%d_%dx%d.cov" % [level, Settings.map_width, Settings.map_height]
+	if _levels.has(path):
+		return _levels[path]
+	var info: Dictionary = {}
+	_levels[path] = info
+	if not FileAccess.file_exists(path):
+		return info
+	var data = FileAccess.get_file_as_bytes(path)
+	if data.size() < HEADER_SIZE or data.slice(0, 4).get_string_from_ascii() != MAGIC \
+			or data.decode_u16(4) != VERSION:
+		push_warning("CoverageMap: bad or outdated " + path)
+		return info
+	var n_ranges = data.decode_u16(10)
+	var ranges: Dictionary = {}   # range px -> block index
+	for i in range(n_ranges):
+		ranges[data.decode_u16(HEADER_SIZE + i * 2)] = i
+	info["w"] = data.decode_u16(6)
+	info["h"] = data.decode_u16(8)
+	info["length"] = data.decode_float(12)
+	info["ranges"] = ranges
+	info["offset"] = HEADER_SIZE + n_ranges * 2
+	info["data"] = data
+	return info
+
+static func has_level(level: int) -> bool:
+	return not _load_level(level).is_empty()
+
+# Coverage of a tower with the given range at anchor (top-left cell of its 2x2)
+# Returns {"arc": px, "entry": ratio, "exit": ratio}, ratios are -1.0 when the
+# path never comes in range; {} when there is no data for this level/range/anchor
+static func lookup(level: int, anchor: Vector2i, attack_range: float) -> Dictionary:
+	var info = _load_level(level)
+	if info.is_empty():
+		return {}
+	var block = info["ranges"].get(int(attack_range), -1)
+	if block < 0 or anchor.x < 0 or anchor.y < 0 or anchor.x >= info["w"] or anchor.y >= info["h"]:
+		return {}
+	var count: int = info["w"] * info["h"]
+	var index: int = anchor.y * info["w"] + anchor.x
+	var data: PackedByteArray = info["data"]
+	var base: int = info["offset"] + block * count * 6
+	var entry = data.decode_u16(base + (count + index) * 2)
+	var exit_ratio = data.decode_u16(base + (count * 2 + index) * 2)
+	return {
+		"arc": float(data.decode_u16(base + index * 2)),
+		"entry": -1.0 if entry == NONE else entry / float(NONE - 1),
+		"exit": -1.0 if exit_ratio == NONE else exit_ratio / float(NONE - 1),
+	}
+
+# Fraction of the whole path a tower at anchor can reach, 0..1 (-1.0 without data)
+static func get_fraction(level: int, anchor: Vector2i, attack_range: float) -> float:
+	var cov = lookup(level, anchor, attack_range)
+	var length: float = _load_level(level).get("length", 0.0)
+	if cov.is_empty() or length <= 0.0:
+		return -1.0
+	return cov["arc"] / length
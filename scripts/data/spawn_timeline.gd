@@ -0,0 +1,73 @@
+extends RefCounted
+class_name SpawnTimeline
+
+## Flat, time-sorted spawn schedule per wave, from scripts/compile_waves.py
+## Each wave is {"t": [...], "type": [...], "hp": [...], "reward": [...],
+## "end": seconds, "stats": {count, hp, gold, bonus, peak, clear}}
+## main.gd drains "t"/"type" with one cursor per frame instead of awaiting a timer per enemy
+## Levels without a compiled file are compiled from LevelData at first use
+## ("hp"/"reward" empty and "stats" {} in that case)
+## NOTE: *.json under assets/data/waves must be included in export presets
+
+const WAVES_DIR = "res://assets/data/waves/"
+const VERSION: int = 1
+
+static var _levels: Dictionary = {}   # level -> Array of wave dictionaries
+
+static func _load_level(level: int) -> Array:
+	if _levels.has(level):
+		return _levels[level]
+	var waves: Array = []
+	var path = WAVES_DIR + "level_%d.json" % level
+	if FileAccess.file_exists(path):
+		var data = JSON.parse_string(FileAccess.get_file_as_string(path))
+		if data is Dictionary and int(data.get("version", 0)) == VERSION:
+			for w in data.get("waves", []):
+				var spawns: Dictionary = w.get("spawns", {})
+				waves.append({
+					"t": PackedFloat32Array(spawns.get("t", [])),
+					"type": PackedStringArray(spawns.get("type", [])),
+					"hp": PackedInt32Array(spawns.get("hp", [])),
+					"reward": PackedInt32Array(spawns.get("reward", [])),
+					"end": float(w.get("end", 0.0)),
+					"stats": w.get("stats", {}),
+				})
+		else:
+			push_warning("SpawnTimeline: bad or outdated " + path)
+	if waves.is_empty():
+		for groups in LevelData.get_waves(level):
+			waves.append(compile(groups))
+	_levels[level] = waves
+	return waves
+
+# Flatten one wave's groups: each enemy spawns, then the next waits the group's delay
+static func compile(groups: Array) -> Dictionary:
+	var times := PackedFloat32Array()
+	var types := PackedStringArray()
+	var clock: float = 0.0
+	for group in groups:
+		for i in range(group["count"]):
+			times.append(clock)
+			types.append(group["type"])
+			clock += group["delay"]
+	return {"t": times, "type": types, "hp": PackedInt32Array(), "reward": PackedInt32Array(),
+			"end": clock, "stats": {}}
+
+# Wave by 0-based index; waves past the end repeat the last one (like LevelData.get_waves callers)
+static func get_wave(level: int, wave_index: int) -> Dictionary:
+	var waves = _load_level(level)
+	if waves.is_empty():
+		return compile([])
+	return waves[clampi(wave_index, 0, waves.size() - 1)]
+
+# Precomputed stats for a wave, {} without a compiled file
+static func get_stats(level: int, wave_index: int) -> Dictionary:
+	return get_wave(level, wave_index)["stats"]
+
+# Most enemies on the path at once over the level's waves (pool warm-up sizes)
+# Uncompiled levels fall back to the largest wave's enemy count
+static func get_peak(level: int) -> int:
+	var peak: int = 0
+	for wave in _load_level(level):
+		peak = maxi(peak, int(wave["stats"].get("peak", wave["t"].size())))
+	return peak
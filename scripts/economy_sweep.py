@@ -0,0 +1,354 @@
+#!/usr/bin/env python3
+"""Economy tables for BALANCE.md, computed from the game data, plus what-if sweeps.
+
+Everything is analytic: every enemy is assumed killed, so a wave pays
+its full kill rewards plus the wave bonus (25 + 5 * wave in
+game_manager.gd complete_wave). Numbers come straight from enemy.gd
+enemy_types, game_manager.gd tower_data/upgrade_data and level_data.gd.
+
+Without sweep options the generated regions of BALANCE.md are rewritten
+(between <!-- economy_sweep:NAME --> and <!-- /economy_sweep:NAME -->).
+Hand-written Notes columns inside those tables are kept, matched by row name.
+A kept note quoting a number within 25% of one of its row's generated
+columns, but not equal to it (say "~7.4" next to a Max DPS of 7.0), has
+gone stale: it is reported, and fails --check.
+
+    enemies    HP, speed, reward, gold per HP for every enemy the levels spawn
+    towers     cost, single-target DPS, max DPS (chains, DoT), max DPS per 100g
+    levels     summary plus per-wave income for all levels
+    gold_mine  base mine payback by purchase wave and per upgrade tier
+
+Sweeps take value lists and evaluate every combination over all levels:
+    --reward-scale  multiplies kill rewards (rounded per enemy)
+    --cost-scale    multiplies tower costs (towers affordable, last wave a gold
+                    mine can be bought and still turn a profit)
+    --bonus-base / --bonus-step   wave bonus = base + step * wave
+Per-wave kill gold and HP are memoized per (level, wave, reward scale), and
+combinations are split over --jobs processes. --csv writes one row per
+combination, level and wave; --md writes a per-combination summary table.
+
+Usage: economy_sweep.py [--check] [--balance FILE]
+       economy_sweep.py --reward-scale 0.8 1 1.2 --bonus-step 3 5 7 --csv sweep.csv [--md sweep.md] [--jobs N]
+"""
+
+import argparse
+import csv
+import itertools
+import os
+import re
+import sys
+from functools import lru_cache
+from multiprocessing import Pool
+from pathlib import Path
+
+import gd_data
+
+ROOT = Path(__file__).resolve().parent.parent
+BALANCE_MD = ROOT / "BALANCE.md"
+START_GOLD, START_GOLD_STEP = 100, 25  # game_manager.gd reset_level
+BONUS_BASE, BONUS_STEP = 25, 5         # game_manager.gd complete_wave
+DOT_TICK, DOT_SHARE = 0.5, 0.5         # enemy.gd: damage * 0.5 every 0.5s
+PROJECTILE, BEAM, AOE, SPAWN, PASSIVE = range(5)
+REGION_RE = r"(<!-- economy_sweep:{0} -->\n)(.*?)(<!-- /economy_sweep:{0} -->)"
+NUMBER_RE = re.compile(r"\d+(?:\.\d+)?")
+CSV_FIELDS = ["reward_scale", "cost_scale", "bonus_base", "bonus_step", "level", "wave",
+              "enemies", "hp", "kill_gold", "bonus", "cumulative"]
+
+DATA = None  # GameData, per process
+
+
+class GameData:
+    def __init__(self):
+        self.levels = gd_data.load_levels()
+        self.enemies = gd_data.load_enemy_types()
+        self.towers = gd_data.load_tower_data()
+        self.upgrades = gd_data.load_upgrade_data()
+
+
+def _init(data=None):
+    global DATA
+    DATA = data or GameData()
+
+
+def title(key):
+    return key.replace("_", " ").title()
+
+
+# ── memoized per-wave numbers ───────────────────────────────────────────────
+@lru_cache(maxsize=None)
+def wave_counts(level, wave):
+    """((type, count), ...) in order of first appearance."""
+    counts = {}
+    for g in DATA.levels[level]["waves"][wave - 1]:
+        counts[g["type"]] = counts.get(g["type"], 0) + g["count"]
+    return tuple(counts.items())
+
+
+@lru_cache(maxsize=None)
+def wave_hp(level, wave):
+    return sum(DATA.enemies[t]["health"] * n for t, n in wave_counts(level, wave))
+
+
+@lru_cache(maxsize=None)
+def wave_kill_gold(level, wave, reward_scale=1.0):
+    return sum(round(DATA.enemies[t]["reward"] * reward_scale) * n for t, n in wave_counts(level, wave))
+
+
+def start_gold(level):
+    return START_GOLD + START_GOLD_STEP * (level - 1)
+
+
+def level_flow(level, reward_scale=1.0, bonus_base=BONUS_BASE, bonus_step=BONUS_STEP):
+    """Per-wave dicts with kill gold, bonus and cumulative income for one level."""
+    total = start_gold(level)
+    rows = []
+    for wave in range(1, len(DATA.levels[level]["waves"]) + 1):
+        kill = wave_kill_gold(level, wave, reward_scale)
+        bonus = bonus_base + bonus_step * wave
+        total += kill + bonus
+        rows.append({"wave": wave, "enemies": sum(n for _, n in wave_counts(level, wave)),
+                     "hp": wave_hp(level, wave), "kill_gold": kill, "bonus": bonus, "cumulative": total})
+    return rows
+
+
+# ── towers ──────────────────────────────────────────────────────────────────
+def tower_dps(t):
+    """(single-target DPS, max DPS): chains hit max_targets, poison/burn add their steady DoT."""
+    hit = t.get("damage", 0) * t.get("fire_rate", 0.0)
+    if t.get("attack_type") == SPAWN:
+        hit = t.get("soldier_count", 0) * t.get("soldier_damage", 0)  # tower.gd has no soldiers yet
+    most = hit * (t.get("max_targets", 3) if t.get("attack_type") == BEAM else 1)
+    for dot in ("poison", "burn"):
+        if dot in t.get("specials", []):
+            most += t.get(f"{dot}_damage", 0) * DOT_SHARE / DOT_TICK
+    return hit, most
+
+
+def mine_last_profitable(cost, gold, waves):
+    """Last wave during which buying a mine still returns more than it cost, or None."""
+    best = None
+    for bought in range(1, waves + 1):
+        if (waves - bought) * gold > cost:
+            best = bought
+    return best
+
+
+def sweep_one(combo):
+    """CSV rows and a per-level summary for one parameter combination."""
+    reward_scale, cost_scale, bonus_base, bonus_step = combo
+    towers = DATA.towers
+    mine = towers.get("gold_mine", {})
+    combat = [t["cost"] for t in towers.values() if t.get("attack_type") in (PROJECTILE, BEAM, AOE)]
+    avg_cost = sum(combat) / len(combat) * cost_scale
+    rows, summary = [], []
+    for level in sorted(DATA.levels):
+        flow = level_flow(level, reward_scale, bonus_base, bonus_step)
+        for r in flow:
+            rows.append(dict(zip(CSV_FIELDS[:5], (*combo, level)), **r))
+        hp = sum(r["hp"] for r in flow)
+        summary.append({
+            "level": level, "income": flow[-1]["cumulative"],
+            "kill_gold": sum(r["kill_gold"] for r in flow), "bonus": sum(r["bonus"] for r in flow),
+            "gold_per_100hp": 100.0 * sum(r["kill_gold"] for r in flow) / hp if hp else 0.0,
+            "towers": flow[-1]["cumulative"] / avg_cost,
+            "mine_last": mine_last_profitable(mine.get("cost", 0) * cost_scale, mine.get("gold_per_wave", 0), len(flow)),
+        })
+    return combo, rows, summary
+
+
+# ── markdown ────────────────────────────────────────────────────────────────
+def md_table(header, rows):
+    lines = ["| " + " | ".join(header) + " |", "|" + "|".join("-" * (len(h) + 2) for h in header) + "|"]
+    lines += ["| " + " | ".join(str(c) for c in row) + " |" for row in rows]
+    return "\n".join(lines) + "\n"
+
+
+def existing_notes(text, name):
+    """{first cell: last cell} from a generated table, so hand notes survive regeneration."""
+    m = re.search(REGION_RE.format(name), text, re.DOTALL)
+    notes = {}
+    for line in (m.group(2).splitlines() if m else []):
+        cells = [c.strip() for c in line.strip().strip("|").split("|")]
+        if len(cells) > 2 and not set(cells[0]) <= set("-"):
+            notes[cells[0]] = cells[-1]
+    return notes
+
+
+def note_conflicts(text):
+    """(row, note number, generated cell) for kept notes that misquote their own row."""
+    found = []
+    for name in ("enemies", "towers"):
+        m = re.search(REGION_RE.format(name), text, re.DOTALL)
+        for line in (m.group(2).splitlines() if m else []):
+            cells = [c.strip() for c in line.strip().strip("|").split("|")]
+            if len(cells) < 3 or set(cells[0]) <= set("-"):
+                continue
+            values = [float(v) for c in cells[1:-1] for v in NUMBER_RE.findall(c.replace(",", ""))]
+            for quoted in NUMBER_RE.findall(cells[-1]):
+                q = float(quoted)
+                digits = len(quoted.partition(".")[2])
+                if any(round(v, digits) == q for v in values):
+                    continue
+                near = [v for v in values if v and abs(q - v) <= 0.25 * abs(v)]
+                if near:
+                    found.append((cells[0], quoted, min(near, key=lambda v: abs(q - v))))
+    return found
+
+
+def enemies_md(notes):
+    used = {t for level in DATA.levels for w in range(1, len(DATA.levels[level]["waves"]) + 1)
+            for t, _ in wave_counts(level, w)}
+    rows = []
+    for key in sorted(used, key=lambda k: (DATA.enemies[k]["health"], k)):
+        e = DATA.enemies[key]
+        rows.append([title(key), e["health"], e["speed"], f"{e['reward']}g",
+                     f"{e['reward'] / e['health']:.3f}", notes.get(title(key), "")])
+    return md_table(["Enemy", "HP", "Speed", "Reward", "Gold/HP", "Notes"], rows)
+
+
+def towers_md(notes):
+    rows = []
+    for key, t in sorted(DATA.towers.items(), key=lambda kv: (kv[1]["cost"], kv[1]["name"])):
+        hit, most = tower_dps(t)
+        per = f"{100.0 * most / t['cost']:.1f}" if t["cost"] else "—"
+        rows.append([t["name"], t["cost"], f"{hit:.1f}", f"{most:.1f}", per, notes.get(t["name"], "")])
+    return md_table(["Tower", "Cost", "DPS", "Max DPS", "Max DPS/100g", "Notes"], rows)
+
+
+def levels_md():
+    out = []
+    summary = []
+    for level in sorted(DATA.levels):
+        flow = level_flow(level)
+        kill, bonus = sum(r["kill_gold"] for r in flow), sum(r["bonus"] for r in flow)
+        peak = max(flow, key=lambda r: r["hp"])
+        summary.append([f"L{level} {DATA.levels[level]['name']}", f"{start_gold(level)}g", f"{kill}g",
+                        f"{bonus}g", f"**{flow[-1]['cumulative']}g**", f"{sum(r['hp'] for r in flow):,}",
+                        f"W{peak['wave']} ({peak['hp']:,})"])
+    out.append(md_table(["Level", "Start", "Kill Rewards", "Wave Bonuses", "Total Available",
+                         "Total HP", "Biggest Wave (HP)"], summary))
+    for level in sorted(DATA.levels):
+        rows = [["Setup", "—", "—", "—", "—", f"{start_gold(level)}g"]]
+        for r in level_flow(level):
+            mix = " + ".join(f"{n} {title(t)}" for t, n in wave_counts(level, r["wave"]))
+            rows.append([f"W{r['wave']}", mix, f"{r['hp']:,}", f"{r['kill_gold']}g", f"{r['bonus']}g",
+                         f"{r['cumulative']}g"])
+        out.append(f"\n### Level {level} — {DATA.levels[level]['name']}\n\n")
+        out.append(md_table(["Wave", "Enemies", "HP", "Kill Reward", "Wave Bonus", "Cumulative Income"], rows))
+    return "".join(out)
+
+
+def gold_mine_md():
+    mine = DATA.towers.get("gold_mine")
+    if not mine:
+        return "No gold mine in tower_data.\n"
+    waves = max(len(lv["waves"]) for lv in DATA.levels.values())
+    cost, gold = mine["cost"], mine["gold_per_wave"]
+    rows = []
+    for bought in range(1, waves):
+        ret = (waves - bought) * gold
+        net = ret - cost
+        rows.append([f"Wave {bought}", waves - bought, f"{ret}g", f"{net:+d}g" + (" (loss!)" if net < 0 else "")])
+    out = [md_table(["Bought During", "Waves Remaining", "Total Return", "Net Profit"], rows)]
+    tiers = []
+    for path in DATA.upgrades.get("gold_mine", {}).values():
+        spent, per = cost, gold
+        for i, up in enumerate(path["upgrades"], 1):
+            if "gold_per_wave" not in up["changes"]:
+                break
+            spent += up["cost"]
+            per = up["changes"]["gold_per_wave"]
+            tiers.append([f"{path['name']} {i}", f"{spent}g", f"{per}g", f"{spent / per:.1f}"])
+    if tiers:
+        out.append("\n" + md_table(["Mine + Upgrades", "Total Cost", "Gold/Wave", "Waves to Repay"],
+                                   [["Base", f"{cost}g", f"{gold}g", f"{cost / gold:.1f}"]] + tiers))
+    return "".join(out)
+
+
+def render_balance(text):
+    sections = {
+        "enemies": lambda: enemies_md(existing_notes(text, "enemies")),
+        "towers": lambda: towers_md(existing_notes(text, "towers")),
+        "levels": levels_md,
+        "gold_mine": gold_mine_md,
+    }
+    for name, build in sections.items():
+        pattern = re.compile(REGION_RE.format(name), re.DOTALL)
+        if not pattern.search(text):
+            print(f"  ⚠ no economy_sweep:{name} region in BALANCE.md", flush=True)
+            continue
+        body = build()
+        text = pattern.sub(lambda m: m.group(1) + body + m.group(3), text)
+    return text
+
+
+def sweep_md(results):
+    rows = []
+    for (rs, cs, bb, bs), _, summary in results:
+        for s in summary:
+            rows.append([rs, cs, f"{bb}+{bs}w", f"L{s['level']}", f"{s['income']}g", f"{s['kill_gold']}g",
+                         f"{s['bonus']}g", f"{s['gold_per_100hp']:.1f}", f"{s['towers']:.1f}",
+                         f"W{s['mine_last']}" if s["mine_last"] else "never"])
+    return "# Economy sweep\n\n" + md_table(
+        ["Reward x", "Cost x", "Bonus", "Level", "Total", "Kills", "Bonuses", "Gold/100HP",
+         "Avg Towers", "Mine Profitable If Bought By"], rows)
+
+
+def main():
+    ap = argparse.ArgumentParser(description="Regenerate BALANCE.md economy tables / run what-if sweeps")
+    ap.add_argument("--balance", type=Path, default=BALANCE_MD)
+    ap.add_argument("--check", action="store_true", help="exit 1 if BALANCE.md is out of date")
+    ap.add_argument("--reward-scale", type=float, nargs="+", default=[1.0])
+    ap.add_argument("--cost-scale", type=float, nargs="+", default=[1.0])
+    ap.add_argument("--bonus-base", type=int, nargs="+", default=[BONUS_BASE])
+    ap.add_argument("--bonus-step", type=int, nargs="+", default=[BONUS_STEP])
+    ap.add_argument("--csv", type=Path, help="write the sweep's per-wave rows here")
+    ap.add_argument("--md", type=Path, help="write the sweep's summary table here")
+    ap.add_argument("--jobs", type=int, default=os.cpu_count() or 1)
+    args = ap.parse_args()
+
+    data = GameData()
+    _init(data)
+    if not (args.csv or args.md):
+        text = args.balance.read_text()
+        new = render_balance(text)
+        stale = note_conflicts(new)
+        for row, quoted, value in stale:
+            print(f"  ⚠ {row}: note says {quoted}, the table says {value:g}", flush=True)
+        if stale:
+            print(f"{'✗' if args.check else '⚠'} {len(stale)} kept notes contradict their rows — edit them in "
+                  f"{args.balance.name}", flush=True)
+        if new == text:
+            print(f"✓ {args.balance.name} up to date", flush=True)
+            return 1 if stale and args.check else 0
+        if args.check:
+            print(f"✗ {args.balance.name} is out of date — run economy_sweep.py", flush=True)
+            return 1
+        args.balance.write_text(new)
+        print(f"✓ {args.balance.name} regenerated", flush=True)
+        return 0
+
+    # Same reward scale next to each other so a worker's memoized waves get reused
+    combos = sorted(itertools.product(args.reward_scale, args.cost_scale, args.bonus_base, args.bonus_step))
+    jobs = max(1, min(args.jobs, len(combos)))
+    print(f"SWEEP: {len(combos)} combinations x {len(data.levels)} levels, {jobs} jobs", flush=True)
+    if jobs == 1:
+        results = [sweep_one(c) for c in combos]
+    else:
+        with Pool(jobs, initializer=_init, initargs=(data,)) as pool:
+            results = pool.map(sweep_one, combos, chunksize=-(-len(combos) // jobs))
+    if args.csv:
+        with open(args.csv, "w", newline="") as f:
+            writer = csv.DictWriter(f, fieldnames=CSV_FIELDS)
+            writer.writeheader()
+            for _, rows, _ in results:
+                writer.writerows(rows)
+        print(f"  ✓ {args.csv} ({sum(len(r) for _, r, _ in results)} rows)", flush=True)
+    if args.md:
+        args.md.write_text(sweep_md(results))
+        print(f"  ✓ {args.md}", flush=True)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -3,6 +3,9 @@ class_name GameParticles
 
 ## Static helper for spawning visual effects
 ## Call these from anywhere: GameParticles.spawn_*()
+## Death effect sprites come from NodePool "death_effect" and go back when their animation ends
+
+const DEATH_POOL = "death_effect"
 
 # Spawn a death poof at a position (legacy — uses generic poof)
 static func spawn_death_poof(tree: SceneTree, pos: Vector2):
@@ -15,8 +18,11 @@ static func spawn_death_effect(tree: SceneTree, pos: Vector2, enemy_type: String
 	var category = _get_death_category(enemy_type)
 	var sheet_path = "res://assets/sprites/effects/death_%s_sheet.png" % category
 	
+	# Frames come pre-packed from the sprite atlas, shared across all deaths
+	var frames = SpriteAtlas.get_sprite_frames(sheet_path, "death", 10.0, false)
+	
 	# Fall back to generic poof if category sheet doesn't exist
-	if not ResourceLoader.exists(sheet_path):
+	if not frames:
 		spawn_death_poof(tree, pos)
 		return
 	
@@ -27,34 +33,36 @@ static func spawn_death_effect(tree: SceneTree, pos: Vector2, enemy_type: String
 		"boss": Color(1.0, 0.3, 0.2, 1.0),
 	}
 	
-	var sprite = AnimatedSprite2D.new()
+	var sprite = _death_sprite()
 	sprite.global_position = pos
-	sprite.z_index = 50
 	sprite.modulate = tints.get(category, Color(1, 0.7, 0.5, 0.9))
 	
 	# Boss death is bigger
-	if category == "boss":
-		sprite.scale = Vector2(1.5, 1.5)
-	
-	var frames = SpriteFrames.new()
-	frames.remove_animation("default")
-	frames.add_animation("death")
-	
-	var sheet = load(sheet_path)
-	var img = sheet.get_image()
-	var frame_count = img.get_width() / 64
-	for i in range(frame_count):
-		var frame_img = Image.create(64, 64, false, img.get_format())
-		frame_img.blit_rect(img, Rect2i(i * 64, 0, 64, 64), Vector2i(0, 0))
-		frames.add_frame("death", ImageTexture.create_from_image(frame_img))
+	sprite.scale = Vector2(1.5, 1.5) if category == "boss" else Vector2.ONE
 	
-	frames.set_animation_speed("death", 10.0)
-	frames.set_animation_loop("death", false)
 	sprite.sprite_frames = frames
-	sprite.play("death")
-	
 	tree.root.add_child(sprite)
-	sprite.animation_finished.connect(sprite.queue_free)
+	sprite.play("death")
+
+# Pooled AnimatedSprite2D that releases itself when its (non-looping) animation ends
+static func _death_sprite() -> AnimatedSprite2D:
+	_register_death_pool()
+	return NodePool.acquire(DEATH_POOL)
+
+static func _register_death_pool():
+	if not NodePool.is_registered(DEATH_POOL):
+		NodePool.register(DEATH_POOL, func(): return _new_death_sprite())
+
+static func _new_death_sprite() -> AnimatedSprite2D:
+	var sprite = AnimatedSprite2D.new()
+	sprite.z_index = 50
+	sprite.animation_finished.connect(func(): NodePool.release(sprite))
+	return sprite
+
+# Pre-build death effect sprites (level start)
+static func warm_death_effects(count: int):
+	_register_death_pool()
+	NodePool.warm(DEATH_POOL, count)
 
 static func _get_death_category(enemy_type: String) -> String:
 	match enemy_type:
@@ -180,31 +188,17 @@ static func _create_particle(tree: SceneTree, pos: Vector2, color: Color, size:
 	return node
 
 static func _create_animated_sprite(tree: SceneTree, pos: Vector2, type: String) -> AnimatedSprite2D:
-	var sprite = AnimatedSprite2D.new()
-	sprite.global_position = pos
-	sprite.z_index = 50
-	
 	# Try to load death poof sheet
 	var sheet_path = "res://assets/sprites/effects/death_poof_sheet.png"
-	if type == "death" and ResourceLoader.exists(sheet_path):
-		var frames = SpriteFrames.new()
-		frames.remove_animation("default")
-		frames.add_animation("poof")
-		
-		var sheet = load(sheet_path)
-		var img = sheet.get_image()
-		for i in range(4):
-			var frame_img = Image.create(64, 64, false, img.get_format())
-			frame_img.blit_rect(img, Rect2i(i * 64, 0, 64, 64), Vector2i(0, 0))
-			frames.add_frame("poof", ImageTexture.create_from_image(frame_img))
-		
-		frames.set_animation_speed("poof", 10.0)
-		frames.set_animation_loop("poof", false)
+	var frames = SpriteAtlas.get_sprite_frames(sheet_path, "poof", 10.0, false) if type == "death" else null
+	if frames:
+		var sprite = _death_sprite()
+		sprite.global_position = pos
+		sprite.modulate = Color(1, 1, 1, 1)
+		sprite.scale = Vector2.ONE
 		sprite.sprite_frames = frames
-		sprite.play("poof")
-		
 		tree.root.add_child(sprite)
-		sprite.animation_finished.connect(sprite.queue_free)
+		sprite.play("poof")
 		return sprite
 	
 	# Fallback: simple colored circle that fades
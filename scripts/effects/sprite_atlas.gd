@@ -0,0 +1,97 @@
+extends RefCounted
+class_name SpriteAtlas
+
+## Shared sprite frames backed by the packed atlases from scripts/build_atlas.py
+## Frames are AtlasTexture regions looked up by the original res:// sheet path
+## SpriteFrames are built once per sheet and shared by every instance
+## Sheets missing from the atlas are sliced once and cached as a fallback
+## NOTE: atlas.json must be included in export presets (filter "*.json")
+
+const METADATA_PATH = "res://assets/sprites/atlas/atlas.json"
+const FRAME_SIZE: int = 64
+
+static var _sprites: Dictionary = {}   # res path -> {atlas, frames}
+static var _atlases: Dictionary = {}   # atlas name -> Texture2D
+static var _frame_cache: Dictionary = {}   # res path -> Array[Texture2D]
+static var _sprite_frames_cache: Dictionary = {}   # "path|anim" -> SpriteFrames
+static var _loaded: bool = false
+
+static func _ensure_loaded():
+	if _loaded:
+		return
+	_loaded = true
+	if not FileAccess.file_exists(METADATA_PATH):
+		return
+	var file = FileAccess.open(METADATA_PATH, FileAccess.READ)
+	if not file:
+		return
+	var json = JSON.new()
+	if json.parse(file.get_as_text()) != OK:
+		push_warning("SpriteAtlas: could not parse " + METADATA_PATH)
+		return
+	var data: Dictionary = json.data
+	_sprites = data.get("sprites", {})
+	var atlas_paths: Dictionary = data.get("atlases", {})
+	for atlas_name in atlas_paths:
+		if ResourceLoader.exists(atlas_paths[atlas_name]):
+			_atlases[atlas_name] = load(atlas_paths[atlas_name])
+
+# All frames of a sheet (or a single-frame sprite), in order
+# Returns an empty array if the sheet is neither packed nor loadable
+static func get_frames(sheet_path: String) -> Array:
+	if _frame_cache.has(sheet_path):
+		return _frame_cache[sheet_path]
+	_ensure_loaded()
+	var frames: Array = []
+	var entry: Dictionary = _sprites.get(sheet_path, {})
+	var atlas: Texture2D = _atlases.get(entry.get("atlas", ""), null)
+	if atlas:
+		for rect in entry["frames"]:
+			var tex = AtlasTexture.new()
+			tex.atlas = atlas
+			tex.region = Rect2(rect[0], rect[1], rect[2], rect[3])
+			frames.append(tex)
+	elif ResourceLoader.exists(sheet_path):
+		frames = _slice_sheet(load(sheet_path))
+	_frame_cache[sheet_path] = frames
+	return frames
+
+# Single texture for a sprite (first frame), or null
+static func get_texture(path: String) -> Texture2D:
+	var frames = get_frames(path)
+	return frames[0] if not frames.is_empty() else null
+
+# Shared SpriteFrames with one animation built from a sheet, or null if missing
+# Callers must not modify the returned resource
+static func get_sprite_frames(sheet_path: String, anim: String, fps: float, loop: bool) -> SpriteFrames:
+	var key = "%s|%s|%s|%s" % [sheet_path, anim, fps, loop]
+	if _sprite_frames_cache.has(key):
+		return _sprite_frames_cache[key]
+	var textures = get_frames(sheet_path)
+	if textures.is_empty():
+		return null
+	var frames = SpriteFrames.new()
+	frames.remove_animation("default")
+	frames.add_animation(anim)
+	for tex in textures:
+		frames.add_frame(anim, tex)
+	frames.set_animation_speed(anim, fps)
+	frames.set_animation_loop(anim, loop)
+	_sprite_frames_cache[key] = frames
+	return frames
+
+# Fallback for sheets that are not in the atlas — regions of the sheet texture itself
+static func _slice_sheet(sheet: Texture2D) -> Array:
+	var frames: Array = []
+	if not sheet:
+		return frames
+	var count = max(1, sheet.get_width() / FRAME_SIZE) if sheet.get_height() == FRAME_SIZE else 1
+	if count == 1:
+		frames.append(sheet)
+		return frames
+	for i in range(count):
+		var tex = AtlasTexture.new()
+		tex.atlas = sheet
+		tex.region = Rect2(i * FRAME_SIZE, 0, FRAME_SIZE, FRAME_SIZE)
+		frames.append(tex)
+	return frames
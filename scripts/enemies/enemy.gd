@@ -2,6 +2,8 @@ extends Area2D
 
 ## Base enemy script
 ## Follows a Path2D and takes damage from towers
+## Pooled together with its PathFollow2D (NodePool "enemy"): setup() may run
+## again on a reused instance, after _pool_reset()
 
 signal died()
 signal reached_end()
@@ -24,6 +26,8 @@ var poison_timer: float = 0.0
 var burn_damage: float = 0.0
 var burn_timer: float = 0.0
 var dot_tick_timer: float = 0.0
+var _dead: bool = false
+var spawn_serial: int = 0  # bumped on every reuse, so held references can tell a respawn apart
 
 # All 10 demon enemy types with stats
 var enemy_types: Dictionary = {
@@ -108,36 +112,48 @@ func setup(type: String):
 		speed = data["speed"]
 		reward = data["reward"]
 		is_flying = data.get("flying", false)
+	if is_node_ready():
+		_apply_visuals()
+
+func _pool_reset():
+	_dead = false
+	spawn_serial += 1
+	slow_multiplier = 1.0
+	slow_timer = 0.0
+	poison_damage = 0.0
+	poison_timer = 0.0
+	burn_damage = 0.0
+	burn_timer = 0.0
+	dot_tick_timer = 0.0
+	last_h_facing_right = true
+	if is_node_ready():
+		animated_sprite.modulate = Color(1, 1, 1, 1)
+		animated_sprite.flip_h = false
+
+func _enter_tree():
+	EnemyGrid.register(self)
+
+func _exit_tree():
+	EnemyGrid.unregister(self)
 
 func _ready():
+	_apply_visuals()
+
+func _apply_visuals():
 	health_bar.max_value = max_health
 	health_bar.value = health
 	_setup_animation()
 
 func _setup_animation():
-	var frames = SpriteFrames.new()
-	frames.remove_animation("default")
-	frames.add_animation("walk")
-	
+	# Shared, atlas-backed frames — built once per enemy type, not per instance
 	var sheet_path = sprite_sheets.get(enemy_type, sprite_sheets["imp"])
-	var sheet_texture = load(sheet_path)
+	var frames = SpriteAtlas.get_sprite_frames(sheet_path, "walk", anim_speeds.get(enemy_type, 6.0), true)
 	
-	if sheet_texture:
-		var sheet_image = sheet_texture.get_image()
-		var frame_width = 64
-		var frame_height = 64
-		var frame_count = sheet_image.get_width() / frame_width
-		
-		for i in range(frame_count):
-			var frame_image = Image.create(frame_width, frame_height, false, sheet_image.get_format())
-			frame_image.blit_rect(sheet_image, Rect2i(i * frame_width, 0, frame_width, frame_height), Vector2i(0, 0))
-			var frame_texture = ImageTexture.create_from_image(frame_image)
-			frames.add_frame("walk", frame_texture)
-		
-		frames.set_animation_speed("walk", anim_speeds.get(enemy_type, 6.0))
-		frames.set_animation_loop("walk", true)
-	else:
+	if not frames:
 		# Fallback: create a colored placeholder if sprite not found
+		frames = SpriteFrames.new()
+		frames.remove_animation("default")
+		frames.add_animation("walk")
 		_create_placeholder_frames(frames)
 	
 	animated_sprite.sprite_frames = frames
@@ -177,6 +193,8 @@ func _create_placeholder_frames(frames: SpriteFrames):
 var last_h_facing_right: bool = true
 
 func _process(delta: float):
+	if _dead:
+		return  # waiting to be parked or freed
 	# Handle slow effect
 	if slow_timer > 0:
 		slow_timer -= delta
@@ -226,23 +244,28 @@ func _process(delta: float):
 		
 		# Check if reached the end
 		if path_follow.progress_ratio >= 1.0:
+			_dead = true
 			GameManager.enemy_reached_end()
 			reached_end.emit()
-			queue_free()
+			_retire()
 
 func take_damage(amount: int):
+	if _dead:
+		return
 	health -= amount
 	health_bar.value = health
 	AudioManager.play_sfx("enemy_hit", -6.0)
 	
+	# Die on the killing blow: a pooled enemy outlives the flash below
+	if health <= 0:
+		die()
+		return
+	
 	# Flash white on hit
 	animated_sprite.modulate = Color(2, 2, 2, 1)
 	await get_tree().create_timer(0.1).timeout
-	if is_instance_valid(self):
+	if is_instance_valid(self) and not _dead:
 		animated_sprite.modulate = Color(1, 1, 1, 1)
-	
-	if health <= 0:
-		die()
 
 func apply_slow(amount: float, duration: float):
 	slow_multiplier = amount
@@ -266,6 +289,9 @@ func _get_death_sound() -> String:
 			return "enemy_death"
 
 func die():
+	if _dead:
+		return
+	_dead = true
 	GameManager.enemy_killed(reward)
 	AudioManager.play_sfx(_get_death_sound())
 	AudioManager.play_sfx("gold_pickup", -4.0)
@@ -273,4 +299,13 @@ func die():
 	GameParticles.spawn_death_effect(get_tree(), global_position, enemy_type)
 	GameParticles.spawn_gold_text(get_tree(), global_position, reward)
 	died.emit()
-	queue_free()
+	_retire()
+
+# False once dead or leaked, while the node waits to be parked or freed
+func is_targetable() -> bool:
+	return not _dead
+
+# Pooled enemies are released with their PathFollow2D by whoever spawned them
+func _retire():
+	if not NodePool.is_pooled(get_parent()):
+		queue_free()
@@ -0,0 +1,121 @@
+extends RefCounted
+class_name EnemyGrid
+
+## Uniform-grid spatial index over live enemies for tower, projectile and minimap queries
+## Enemies register on entering the tree and unregister on leaving it
+## Buckets are BUCKET_CELLS x BUCKET_CELLS map cells (GridManager.CELL_SIZE)
+## The index is rebuilt at most once per process frame, on the first query
+## of the frame, snapshotting each enemy's position, path progress and
+## flying flag so no query has to touch the enemy or its PathFollow2D
+## Queries only visit the buckets overlapping the search circle (or the
+## occupied buckets, when there are fewer of those)
+
+const CELL_SIZE: int = 32        # GridManager.CELL_SIZE
+const BUCKET_CELLS: int = 2
+const BUCKET_SIZE = CELL_SIZE * BUCKET_CELLS
+const ENEMY_RADIUS: float = 12.0  # enemy.tscn collision radius; towers reach the edge, not the centre
+
+static var _members: Array = []
+static var _frame: int = -1
+static var _buckets: Dictionary = {}   # Vector2i -> Array of snapshot indices
+static var _nodes: Array = []
+static var _positions := PackedVector2Array()
+static var _progress := PackedFloat32Array()
+static var _flying := PackedByteArray()
+
+static func register(enemy: Area2D):
+	_members.append(enemy)
+
+static func unregister(enemy: Area2D):
+	_members.erase(enemy)
+
+static func _bucket(pos: Vector2) -> Vector2i:
+	return Vector2i(floori(pos.x / BUCKET_SIZE), floori(pos.y / BUCKET_SIZE))
+
+static func _refresh():
+	var frame = Engine.get_process_frames()
+	if frame == _frame:
+		return
+	_frame = frame
+	_buckets.clear()
+	_nodes.clear()
+	_positions.resize(0)
+	_progress.resize(0)
+	_flying.resize(0)
+	for enemy in _members:
+		if not is_instance_valid(enemy) or not enemy.is_targetable():
+			continue
+		var follow = enemy.get_parent() as PathFollow2D
+		var pos = enemy.global_position
+		var key = _bucket(pos)
+		if not _buckets.has(key):
+			_buckets[key] = []
+		_buckets[key].append(_nodes.size())
+		_nodes.append(enemy)
+		_positions.append(pos)
+		_progress.append(follow.progress if follow else 0.0)
+		_flying.append(1 if enemy.is_flying else 0)
+
+# Snapshot indices within radius of center, filtered by air/ground
+static func _within(center: Vector2, radius: float, air: bool, ground: bool) -> PackedInt32Array:
+	_refresh()
+	var found := PackedInt32Array()
+	var lo = _bucket(center - Vector2(radius, radius))
+	var hi = _bucket(center + Vector2(radius, radius))
+	var r2 = radius * radius
+	var keys: Array = []
+	if (hi.x - lo.x + 1) * (hi.y - lo.y + 1) <= _buckets.size():
+		for by in range(lo.y, hi.y + 1):
+			for bx in range(lo.x, hi.x + 1):
+				keys.append(Vector2i(bx, by))
+	else:
+		for key in _buckets:
+			if key.x >= lo.x and key.x <= hi.x and key.y >= lo.y and key.y <= hi.y:
+				keys.append(key)
+	for key in keys:
+		for i in _buckets.get(key, []):
+			if _positions[i].distance_squared_to(center) > r2:
+				continue
+			if (air if _flying[i] else ground) and is_instance_valid(_nodes[i]) and _nodes[i].is_targetable():
+				found.append(i)
+	return found
+
+## Enemies within radius of center
+static func query_radius(center: Vector2, radius: float, air: bool = true, ground: bool = true) -> Array:
+	var enemies: Array = []
+	for i in _within(center, radius, air, ground):
+		enemies.append(_nodes[i])
+	return enemies
+
+## The enemy within radius furthest along the path (closest to the exit), or null
+static func best_progress(center: Vector2, radius: float, air: bool = true, ground: bool = true) -> Area2D:
+	var best: Area2D = null
+	var furthest: float = -1.0
+	for i in _within(center, radius, air, ground):
+		if _progress[i] > furthest:
+			furthest = _progress[i]
+			best = _nodes[i]
+	return best
+
+## Up to k enemies within radius, closest first
+static func nearest(center: Vector2, radius: float, k: int, air: bool = true, ground: bool = true) -> Array:
+	if k <= 0:
+		return []
+	var picked: Array = []   # [distance², index], kept sorted, at most k long
+	for i in _within(center, radius, air, ground):
+		var d2 = _positions[i].distance_squared_to(center)
+		if picked.size() == k and d2 >= picked[-1][0]:
+			continue
+		var at = picked.bsearch_custom([d2, i], func(a, b): return a[0] < b[0])
+		picked.insert(at, [d2, i])
+		if picked.size() > k:
+			picked.pop_back()
+	var enemies: Array = []
+	for p in picked:
+		enemies.append(_nodes[p[1]])
+	return enemies
+
+## Positions of every live enemy this frame (minimap dots)
+static func get_positions() -> PackedVector2Array:
+	_refresh()
+	return _positions
@@ -0,0 +1,204 @@
+#!/usr/bin/env python3
+"""Quantize walk sheets into an index map + palette strips for the h8.Palette addon.
+
+For every sheet this writes, into assets/sprites/enemies/palettes/ by default:
+    <name>_walk_imap.png            greyscale index map (same size as the sheet)
+    <name>_palette.png              base palette, N x 1 (index 0 = transparent)
+    <name>_palette_<variant>.png    tinted variants (poison, ice, gold, boss)
+
+Use the index map as the sprite texture with ImagePalette.gdshader and
+assign any palette strip to its `palette` uniform, so all recolors of an
+enemy share one index texture.
+
+Index values are stored as texel centres, (i + 0.5) / N, which the shader's
+nearest-filtered palette lookup resolves exactly for N <= 64. Colors are
+sorted dark → light so tints work on a consistent ramp.
+
+Every PNG written carries a "Generator: export_palettes" text chunk, and an
+existing file without it is never overwritten (the hand-made imp_palette_*
+strips pair with imp_enemy_imap.png, whose index order differs).
+
+Usage: export_palettes.py [--colors 48] [--out DIR] [--variants poison,ice] [SHEET...]
+"""
+
+import argparse
+import os
+from pathlib import Path
+
+import numpy as np
+from PIL import Image
+from PIL.PngImagePlugin import PngInfo
+
+ROOT = Path(__file__).resolve().parent.parent
+ENEMIES = ROOT / "assets" / "sprites" / "enemies"
+OUT_DIR = ENEMIES / "palettes"
+MAX_COLORS = 64
+ALPHA_MIN = 128  # index maps carry binary alpha
+GENERATOR = "export_palettes"
+
+# variant → (dark, mid, light ramp in 0-255 RGB, blend strength)
+VARIANTS = {
+    "poison": (((10, 30, 8), (70, 170, 40), (190, 255, 120)), 0.65),
+    "ice": (((12, 24, 50), (90, 160, 220), (225, 245, 255)), 0.7),
+    "gold": (((40, 22, 0), (170, 120, 28), (255, 235, 140)), 0.8),
+    "boss": (((25, 0, 5), (150, 10, 25), (255, 120, 90)), 0.5),
+}
+
+
+def luminance(rgb):
+    return rgb @ np.array([0.299, 0.587, 0.114])
+
+
+def median_cut(colors, counts, n):
+    """Split the weighted color set along its widest channel until there are n boxes."""
+    boxes = [(colors, counts)]
+    while len(boxes) < n:
+        spans = [np.ptp(c, axis=0).max() if len(c) > 1 else -1 for c, _ in boxes]
+        i = int(np.argmax(spans))
+        if spans[i] <= 0:
+            break
+        c, w = boxes.pop(i)
+        axis = int(np.argmax(np.ptp(c, axis=0)))
+        order = np.argsort(c[:, axis], kind="stable")
+        c, w = c[order], w[order]
+        cut = int(np.searchsorted(np.cumsum(w), w.sum() / 2)) + 1
+        cut = min(max(cut, 1), len(c) - 1)
+        boxes += [(c[:cut], w[:cut]), (c[cut:], w[cut:])]
+    return np.array([np.average(c, axis=0, weights=w) for c, w in boxes]).round().astype(np.uint8)
+
+
+def quantize(rgba, n_colors):
+    """Returns (index map HxW uint8, palette Nx4 uint8). Index 0 is transparent."""
+    opaque = rgba[..., 3] >= ALPHA_MIN
+    pixels = rgba[opaque][:, :3]
+    colors, inverse, counts = np.unique(pixels, axis=0, return_inverse=True, return_counts=True)
+    if len(colors) <= n_colors - 1:
+        palette = colors
+    else:
+        palette = median_cut(colors.astype(float), counts, n_colors - 1)
+    palette = palette[np.argsort(luminance(palette.astype(float)), kind="stable")]
+
+    # Nearest palette entry per unique color, then expand to pixels
+    dist = ((colors[:, None, :].astype(int) - palette[None, :, :].astype(int)) ** 2).sum(axis=2)
+    index = np.zeros(rgba.shape[:2], dtype=np.uint8)
+    index[opaque] = dist.argmin(axis=1)[inverse.ravel()] + 1
+    full = np.zeros((len(palette) + 1, 4), dtype=np.uint8)
+    full[1:, :3] = palette
+    full[1:, 3] = 255
+    return index, full
+
+
+def tint(palette, ramp, strength):
+    """Blend each color toward a 3-stop ramp sampled at its luminance."""
+    rgb = palette[:, :3].astype(float)
+    lum = luminance(rgb) / 255
+    stops = np.array(ramp, dtype=float)
+    target = np.stack([np.interp(lum, [0, 0.5, 1], stops[:, c]) for c in range(3)], axis=1)
+    out = palette.copy()
+    out[:, :3] = np.clip(rgb * (1 - strength) + target * strength, 0, 255).round()
+    out[0] = 0  # keep the transparent slot transparent
+    return out
+
+
+def encode_index(index, n):
+    """Index → greyscale texel-centre values (i + 0.5) / n, alpha from transparency."""
+    value = np.round((index.astype(float) + 0.5) / n * 255).astype(np.uint8)
+    alpha = np.where(index > 0, 255, 0).astype(np.uint8)
+    return np.dstack([value, value, value, alpha])
+
+
+def generated_here(path):
+    """True if path does not exist yet or was written by this tool."""
+    if not path.exists():
+        return True
+    try:
+        with Image.open(path) as img:
+            return img.info.get("Generator") == GENERATOR
+    except OSError:
+        return False
+
+
+def outputs(sheet_path, out_dir, variants):
+    """The files export() writes for one sheet: index map, base palette, one strip per variant."""
+    name = Path(sheet_path).name.removesuffix("_walk_sheet.png").removesuffix(".png")
+    out_dir = Path(out_dir)
+    return [out_dir / f"{name}_walk_imap.png", out_dir / f"{name}_palette.png",
+            *(out_dir / f"{name}_palette_{v}.png" for v in variants)]
+
+
+def export(sheet_path, out_dir, n_colors, variants):
+    """Write the index map and palette strips for one sheet; returns their paths.
+
+    Raises FileExistsError, before writing anything, if one of them exists
+    and was not written by this tool.
+    """
+    sheet_path = Path(sheet_path)
+    name = sheet_path.name.removesuffix("_walk_sheet.png").removesuffix(".png")
+    imap, base, *paths = outputs(sheet_path, out_dir, variants)
+    strips = dict(zip(variants, paths))
+    foreign = [p for p in [imap, base, *strips.values()] if not generated_here(p)]
+    if foreign:
+        raise FileExistsError(f"not written by {GENERATOR}, refusing to overwrite: "
+                              + ", ".join(str(p.relative_to(ROOT) if p.is_relative_to(ROOT) else p)
+                                          for p in foreign))
+
+    rgba = np.asarray(Image.open(sheet_path).convert("RGBA"))
+    index, palette = quantize(rgba, n_colors)
+    n = len(palette)
+    info = PngInfo()
+    info.add_text("Generator", GENERATOR)
+
+    written = []
+    Image.fromarray(encode_index(index, n), "RGBA").save(imap, pnginfo=info)
+    written.append(imap)
+    Image.fromarray(palette[None], "RGBA").save(base, pnginfo=info)
+    written.append(base)
+    for variant, path in strips.items():
+        ramp, strength = VARIANTS[variant]
+        Image.fromarray(tint(palette, ramp, strength)[None], "RGBA").save(path, pnginfo=info)
+        written.append(path)
+
+    # Round-trip error on opaque pixels, so a too-small palette is visible
+    opaque = index > 0
+    err = np.abs(palette[index][opaque][:, :3].astype(int) - rgba[opaque][:, :3].astype(int)).mean() if opaque.any() else 0
+    before = os.path.getsize(sheet_path)
+    after = sum(os.path.getsize(p) for p in written[:2])
+    print(f"  ✓ {name:16s} {n - 1:2d} colors  err {err:4.1f}  {before}b → {after}b "
+          f"(+{len(variants)} palettes)", flush=True)
+    return written
+
+
+def main():
+    ap = argparse.ArgumentParser(description="Export index maps + palettes for walk sheets")
+    ap.add_argument("sheets", nargs="*", type=Path, help="default: assets/sprites/enemies/*_walk_sheet.png")
+    ap.add_argument("--colors", type=int, default=48, help="palette size including transparent (max 64)")
+    ap.add_argument("--out", type=Path, default=OUT_DIR, help="output dir (default: assets/sprites/enemies/palettes)")
+    ap.add_argument("--variants", default=",".join(VARIANTS), help="comma list, empty for none")
+    args = ap.parse_args()
+
+    if not 2 <= args.colors <= MAX_COLORS:
+        ap.error(f"--colors must be 2..{MAX_COLORS}")
+    variants = [v for v in args.variants.split(",") if v]
+    unknown = set(variants) - set(VARIANTS)
+    if unknown:
+        ap.error(f"unknown variants: {', '.join(sorted(unknown))}")
+    sheets = args.sheets or sorted(ENEMIES.glob("*_walk_sheet.png"))
+    if not sheets:
+        print("✗ no walk sheets found", flush=True)
+        return 1
+
+    print(f"PALETTES: {len(sheets)} sheets, {args.colors} colors, variants: {', '.join(variants) or 'none'}",
+          flush=True)
+    args.out.mkdir(parents=True, exist_ok=True)
+    failed = 0
+    for sheet in sheets:
+        try:
+            export(sheet, args.out, args.colors, variants)
+        except FileExistsError as e:
+            print(f"  ✗ {Path(sheet).name}: {e}", flush=True)
+            failed += 1
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,155 @@
+#!/usr/bin/env python3
+"""Local stand-in for `npx mcporter` with the pixellab tools.
+
+Usage: fake_pixellab.py call '<call string>'
+       fake_pixellab.py --worker   (JSON-lines stub for gen_worker.WorkerPool)
+Writes deterministic placeholder sprites to the call's save_to_file path
+(animate_with_text writes <base>_frame{i}.png like the real backend).
+Inline worker requests get the same images in memory as frame messages,
+all sent once the latency has passed like gen_worker.mjs does, and
+nothing is written to disk.
+
+Env knobs:
+    FAKE_LATENCY     seconds to sleep per call (default 0.2)
+    FAKE_ERROR_RATE  probability of answering with an "Error:" (default 0)
+    FAKE_ERROR_CODE  what those errors are: backend (default), rate_limited
+                     (a 429 on the CLI) or bad_request (not retried by a
+                     worker pool caller)
+"""
+
+import base64
+import hashlib
+import io
+import json
+import os
+import random
+import re
+import sys
+import time
+
+from PIL import Image, ImageDraw
+
+
+def _arg(call_str, key, default=None):
+    m = re.search(rf'{key}: ("([^"]*)"|[^,)]+)', call_str)
+    if not m:
+        return default
+    return m.group(2) if m.group(2) is not None else m.group(1).strip()
+
+
+def _sprite(seed, size, frame=0):
+    """Blob with a seed-derived colour, shifted per frame so cycles differ."""
+    w, h = size
+    rng = random.Random(seed)
+    color = (rng.randint(60, 255), rng.randint(20, 200), rng.randint(20, 200), 255)
+    img = Image.new("RGBA", (w, h), (0, 0, 0, 0))
+    draw = ImageDraw.Draw(img)
+    dx = [0, 2, 0, -2][frame % 4] * w // 64
+    draw.ellipse((w // 4 + dx, h // 4, 3 * w // 4 + dx, h - 2), fill=color, outline=(0, 0, 0, 255))
+    return img
+
+
+def fake_images(call_str):
+    """[(file name, image)] the backend would produce for a call, or None without save_to_file."""
+    tool = call_str.split("(", 1)[0].strip()
+    out = _arg(call_str, "save_to_file")
+    if not out:
+        return None
+    w = int(_arg(call_str, "width", 64))
+    h = int(_arg(call_str, "height", 64))
+    seed = hashlib.sha256(call_str.encode()).hexdigest()
+    if tool.endswith("animate_with_text"):
+        base = out[:-4] if out.endswith(".png") else out
+        n = int(_arg(call_str, "n_frames", 4))
+        return [(f"{base}_frame{i}.png", _sprite(seed, (w, h), i)) for i in range(n)]
+    return [(out, _sprite(seed, (w, h)))]
+
+
+def fake_call(call_str):
+    images = fake_images(call_str)
+    if images is None:
+        return None
+    os.makedirs(os.path.dirname(images[0][0]) or ".", exist_ok=True)
+    for path, img in images:
+        img.save(path)
+    return [path for path, _ in images]
+
+
+def _latency():
+    return float(os.environ.get("FAKE_LATENCY", "0.2"))
+
+
+def _fails():
+    return random.random() < float(os.environ.get("FAKE_ERROR_RATE", "0"))
+
+
+def _error():
+    """The configured failure as (worker error dict, CLI message)."""
+    code = os.environ.get("FAKE_ERROR_CODE", "backend")
+    message = {"rate_limited": "429 Too Many Requests: rate limit exceeded",
+               "bad_request": "invalid description"}.get(code, "simulated failure")
+    return {"code": code, "message": message}, f"Error: {message}"
+
+
+def _simulate():
+    """Sleep for the configured latency; True if this call should fail."""
+    time.sleep(_latency())
+    return _fails()
+
+
+def _inline(req):
+    """Inline answer: every frame message once the call is done, then the response."""
+    images = fake_images(req.get("call", ""))
+    if images is None:
+        return {"id": req["id"], "ok": False, "error": {"code": "bad_request", "message": "save_to_file is required"}}
+    if _simulate():
+        return {"id": req["id"], "ok": False, "error": _error()[0]}
+    for i, (path, img) in enumerate(images):
+        buf = io.BytesIO()
+        img.save(buf, "PNG")
+        print(json.dumps({"id": req["id"], "frame": i, "name": os.path.basename(path),
+                          "png": base64.b64encode(buf.getvalue()).decode()}), flush=True)
+    return {"id": req["id"], "ok": True, "frames": len(images)}
+
+
+def serve():
+    """Worker mode: answer gen_worker protocol requests until stdin closes."""
+    for line in sys.stdin:
+        if not line.strip():
+            continue
+        req = json.loads(line)
+        if req.get("inline"):
+            resp = _inline(req)
+        elif _simulate():
+            resp = {"id": req["id"], "ok": False, "error": _error()[0]}
+        else:
+            files = fake_call(req.get("call", ""))
+            if files is None:
+                resp = {"id": req["id"], "ok": False,
+                        "error": {"code": "bad_request", "message": "save_to_file is required"}}
+            else:
+                resp = {"id": req["id"], "ok": True,
+                        "files": [{"path": p, "size": os.path.getsize(p)} for p in files]}
+        print(json.dumps(resp), flush=True)
+
+
+def main():
+    if sys.argv[1:] == ["--worker"]:
+        serve()
+        return 0
+    if len(sys.argv) != 3 or sys.argv[1] != "call":
+        print("usage: fake_pixellab.py call '<call string>' | --worker", file=sys.stderr)
+        return 2
+    if _simulate():
+        print(_error()[1])
+        return 1
+    files = fake_call(sys.argv[2])
+    if files is None:
+        print("Error: save_to_file is required")
+        return 1
+    print("Saved " + ", ".join(files))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,238 @@
+#!/usr/bin/env python3
+"""Read game data straight from the GDScript sources.
+
+Parses the literal dictionaries/arrays the game defines in code, so offline
+tools use the same numbers as the game instead of a copy:
+
+    load_levels()          {level: {"name", "path": [(x, y)...], "waves": [[group...]...]}}
+    load_terrain_themes()  {level: {"grass": (r, g, b), "grass_var": ..., "road": ...}}
+    load_map_sizes()       MAP_SIZES from scripts/managers/settings_manager.gd
+    load_enemy_types()     enemy_types from scripts/enemies/enemy.gd
+    load_tower_data()      tower_data from scripts/managers/game_manager.gd
+    load_upgrade_data()    upgrade_data from the same file
+
+Only literals are understood: dicts, arrays, strings, numbers, bools,
+Vector2/Color/PackedVector2Array constructors and enum members of the same
+file (AttackType.BEAM → 1). Vector2 becomes an (x, y) tuple.
+
+Usage: gd_data.py [levels|themes|sizes|enemies|towers|upgrades]   (dumps as JSON)
+"""
+
+import json
+import re
+import sys
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+LEVEL_DATA = ROOT / "scripts" / "data" / "level_data.gd"
+ENEMY_GD = ROOT / "scripts" / "enemies" / "enemy.gd"
+GAME_MANAGER = ROOT / "scripts" / "managers" / "game_manager.gd"
+SETTINGS_GD = ROOT / "scripts" / "managers" / "settings_manager.gd"
+
+TOKEN_RE = re.compile(r"""
+    (?P<ws>\s+|\#[^\n]*)
+  | (?P<str>"(?:[^"\\]|\\.)*")
+  | (?P<num>-?(?:\d+\.\d*|\.\d+|\d+)(?:[eE][-+]?\d+)?)
+  | (?P<ident>[A-Za-z_][\w.]*)
+  | (?P<punct>[{}\[\](),:=])
+""", re.VERBOSE)
+
+CONSTRUCTORS = {"Vector2", "Vector2i", "Color", "PackedVector2Array", "PackedStringArray",
+                "PackedInt32Array", "PackedFloat32Array"}
+
+
+class GDParseError(ValueError):
+    pass
+
+
+def tokenize(text, pos=0):
+    """Yield (kind, value, offset) tokens, skipping whitespace and comments."""
+    while pos < len(text):
+        m = TOKEN_RE.match(text, pos)
+        if not m:
+            raise GDParseError(f"unexpected {text[pos:pos + 20]!r} at offset {pos}")
+        pos = m.end()
+        if m.lastgroup != "ws":
+            yield m.lastgroup, m.group(), m.start()
+
+
+class Parser:
+    def __init__(self, text, pos=0, enums=None):
+        self.tokens = tokenize(text, pos)
+        self.enums = enums or {}
+        self.peeked = None
+
+    def peek(self):
+        if self.peeked is None:
+            self.peeked = next(self.tokens, (None, None, -1))
+        return self.peeked
+
+    def take(self, expect=None):
+        tok = self.peek()
+        self.peeked = None
+        if expect is not None and tok[1] != expect:
+            raise GDParseError(f"expected {expect!r}, got {tok[1]!r} at offset {tok[2]}")
+        return tok
+
+    def value(self):
+        kind, text, offset = self.take()
+        if text == "{":
+            return self._dict()
+        if text == "[":
+            return self._list("]")
+        if kind == "str":
+            return json.loads(text)
+        if kind == "num":
+            return float(text) if any(c in text for c in ".eE") else int(text)
+        if kind == "ident":
+            if text in ("true", "false"):
+                return text == "true"
+            if text == "null":
+                return None
+            if self.peek()[1] == "(":
+                self.take("(")
+                return self._construct(text, self._list(")"))
+            if text in self.enums:
+                return self.enums[text]
+            return text
+        raise GDParseError(f"unexpected {text!r} at offset {offset}")
+
+    def _dict(self):
+        out = {}
+        while self.peek()[1] != "}":
+            key = self.value()
+            sep = self.take()[1]
+            if sep not in (":", "="):
+                raise GDParseError(f"expected ':' after dict key {key!r}")
+            out[key] = self.value()
+            if self.peek()[1] == ",":
+                self.take()
+        self.take("}")
+        return out
+
+    def _list(self, close):
+        out = []
+        while self.peek()[1] != close:
+            out.append(self.value())
+            if self.peek()[1] == ",":
+                self.take()
+        self.take(close)
+        return out
+
+    @staticmethod
+    def _construct(name, args):
+        if name not in CONSTRUCTORS:
+            raise GDParseError(f"unsupported call {name}()")
+        if name.startswith("Packed"):
+            return list(args[0]) if args else []
+        return tuple(args)
+
+
+def parse_enums(source):
+    """'enum AttackType { A, B = 5, C }' → {"AttackType.A": 0, "AttackType.B": 5, ...}."""
+    enums = {}
+    for name, body in re.findall(r"enum\s+(\w+)\s*\{([^}]*)\}", source):
+        value = 0
+        for item in (s.strip() for s in re.sub(r"#[^\n]*", "", body).split(",")):
+            if not item:
+                continue
+            key, _, explicit = (p.strip() for p in item.partition("="))
+            value = int(explicit) if explicit else value
+            enums[f"{name}.{key}"] = value
+            value += 1
+    return enums
+
+
+def parse_var(source, name):
+    """Value of 'var|const <name>[: Type] = <literal>'."""
+    m = re.search(rf"^(?:var|const)\s+{name}\s*(?::\s*\w+)?\s*=\s*", source, re.MULTILINE)
+    if not m:
+        raise GDParseError(f"var {name} not found")
+    return Parser(source, m.end(), parse_enums(source)).value()
+
+
+def _func_body(source, name):
+    m = re.search(rf"^(?:static\s+)?func\s+{name}\s*\(.*?\).*?:\s*$", source, re.MULTILINE)
+    if not m:
+        raise GDParseError(f"func {name} not found")
+    end = re.compile(r"^\S", re.MULTILINE).search(source, m.end() + 1)
+    return m.end(), end.start() if end else len(source)
+
+
+def parse_return(source, name):
+    """Literal returned by the first 'return' of func <name>."""
+    start, end = _func_body(source, name)
+    m = re.compile(r"\breturn\s+").search(source, start, end)
+    if not m:
+        raise GDParseError(f"func {name} has no return")
+    return Parser(source, m.end(), parse_enums(source)).value()
+
+
+def parse_match_returns(source, name):
+    """{case: literal} for a func whose body is 'match x: <int>: return <literal>'."""
+    start, end = _func_body(source, name)
+    enums = parse_enums(source)
+    out = {}
+    for m in re.finditer(r"^\s+(\d+):[^\n]*\n(?:\s*#[^\n]*\n)*\s+return\s+", source[start:end], re.MULTILINE):
+        out[int(m.group(1))] = Parser(source, start + m.end(), enums).value()
+    return out
+
+
+def parse_var_in_func(source, func, name):
+    """Literal assigned to a local 'var <name> = ...' inside func <func>."""
+    start, end = _func_body(source, func)
+    m = re.compile(rf"\bvar\s+{name}\s*(?::\s*\w+)?\s*=\s*").search(source, start, end)
+    if not m:
+        raise GDParseError(f"var {name} not found in {func}")
+    return Parser(source, m.end(), parse_enums(source)).value()
+
+
+def load_levels(path=LEVEL_DATA):
+    source = Path(path).read_text()
+    count = parse_return(source, "get_level_count")
+    names = parse_var_in_func(source, "get_level_name", "names")
+    paths = parse_match_returns(source, "get_path_points")
+    levels = {}
+    for level in range(1, count + 1):
+        levels[level] = {
+            "name": names.get(level, f"Level {level}"),
+            "path": [tuple(p) for p in paths[level]],
+            "waves": parse_return(source, f"_level_{level}_waves"),
+        }
+    return levels
+
+
+def load_terrain_themes(path=LEVEL_DATA):
+    return parse_match_returns(Path(path).read_text(), "get_terrain_theme")
+
+
+def load_map_sizes(path=SETTINGS_GD):
+    return parse_var(Path(path).read_text(), "MAP_SIZES")
+
+
+def load_enemy_types(path=ENEMY_GD):
+    return parse_var(Path(path).read_text(), "enemy_types")
+
+
+def load_tower_data(path=GAME_MANAGER):
+    return parse_var(Path(path).read_text(), "tower_data")
+
+
+def load_upgrade_data(path=GAME_MANAGER):
+    return parse_var(Path(path).read_text(), "upgrade_data")
+
+
+def main():
+    loaders = {"levels": load_levels, "themes": load_terrain_themes, "sizes": load_map_sizes,
+               "enemies": load_enemy_types, "towers": load_tower_data, "upgrades": load_upgrade_data}
+    what = sys.argv[1] if len(sys.argv) > 1 else "levels"
+    if what not in loaders:
+        print(f"usage: gd_data.py [{'|'.join(loaders)}]", file=sys.stderr)
+        return 2
+    json.dump(loaders[what](), sys.stdout, indent=1)
+    print()
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
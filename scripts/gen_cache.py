@@ -0,0 +1,212 @@
+#!/usr/bin/env python3
+"""Content-addressed cache for pixellab generation calls.
+
+A call is keyed by a hash of its call string (minus the output path) plus
+the bytes of every image it references (style_image_path,
+reference_image_path). Changing a description, a parameter or the style
+reference therefore misses, while unchanged calls are served locally.
+
+Each entry stores the raw outputs of one call (<out>.png and any
+<out>_frame{i}.png) under <root>/<key[:2]>/<key>/. An index.json tracks
+sizes and last use; the least recently used entries are evicted once the
+store grows past max_bytes.
+
+Run on its own it prints the totals and every entry, most recently used
+first; --stats prints the totals only (entries, files, bytes).
+
+Usage: gen_cache.py [--stats] [--clear] [--root DIR]
+"""
+
+import argparse
+import glob
+import hashlib
+import json
+import os
+import re
+import shutil
+import threading
+import time
+
+CACHE_DIR = os.environ.get("GEN_CACHE_DIR", os.path.expanduser("~/.cache/hell-marches/gen"))
+MAX_BYTES = 512 * 1024 * 1024
+
+_OUTPUT_RE = re.compile(r',?\s*save_to_file: "([^"]*)"')
+_SHOW_RE = re.compile(r',?\s*show_image: \w+')
+_REF_RE = re.compile(r'(style_image_path|reference_image_path|init_image_path): "([^"]*)"')
+
+
+def output_path(call_str):
+    """The save_to_file path of a call, or None."""
+    m = _OUTPUT_RE.search(call_str)
+    return m.group(1) if m else None
+
+
+def output_files(save_path):
+    """Files a call produced: the main image (if any) plus its _frame{i} siblings."""
+    base, ext = os.path.splitext(save_path)
+    files = [save_path] if os.path.exists(save_path) else []
+    frames = glob.glob(glob.escape(base) + "_frame*" + (ext or ".png"))
+    return files + sorted(frames)
+
+
+class GenCache:
+    def __init__(self, root=CACHE_DIR, max_bytes=MAX_BYTES):
+        self.root = root
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+        self._index_path = os.path.join(root, "index.json")
+        os.makedirs(root, exist_ok=True)
+        self.index = self._load_index()
+
+    def _load_index(self):
+        try:
+            with open(self._index_path) as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return {}
+
+    def _save_index(self):
+        tmp = self._index_path + ".tmp"
+        with open(tmp, "w") as f:
+            json.dump(self.index, f, indent=1, sort_keys=True)
+        os.replace(tmp, self._index_path)
+
+    def _entry_dir(self, key):
+        return os.path.join(self.root, key[:2], key)
+
+    def key(self, call_str):
+        """Hash of the call (output path stripped) and its referenced image bytes."""
+        h = hashlib.sha256()
+        h.update(_SHOW_RE.sub("", _OUTPUT_RE.sub("", call_str)).encode())
+        for field, path in _REF_RE.findall(call_str):
+            h.update(f"\0{field}\0".encode())
+            try:
+                with open(path, "rb") as f:
+                    h.update(hashlib.sha256(f.read()).digest())
+            except OSError:
+                h.update(b"missing:" + path.encode())
+        return h.hexdigest()
+
+    def restore(self, key, save_path):
+        """Copy a cached entry's outputs to save_path. Returns True on a hit."""
+        with self._lock:
+            entry = self.index.get(key)
+            src = self._entry_dir(key)
+            if not entry or not all(os.path.exists(os.path.join(src, n)) for n in entry["files"]):
+                self.index.pop(key, None)
+                self.misses += 1
+                return False
+            base, ext = os.path.splitext(save_path)
+            os.makedirs(os.path.dirname(save_path) or ".", exist_ok=True)
+            for name in entry["files"]:
+                shutil.copyfile(os.path.join(src, name), base + name[len("out"):])
+            entry["used"] = time.time()
+            self.hits += 1
+            self._save_index()
+            return True
+
+    def store(self, key, save_path):
+        """Snapshot the outputs a call just wrote to save_path under key."""
+        files = output_files(save_path)
+        if not files:
+            return False
+        base, _ = os.path.splitext(save_path)
+        dst = self._entry_dir(key)
+        with self._lock:
+            os.makedirs(dst, exist_ok=True)
+            names = []
+            for path in files:
+                name = "out" + path[len(base):]
+                shutil.copyfile(path, os.path.join(dst, name))
+                names.append(name)
+            size = sum(os.path.getsize(os.path.join(dst, n)) for n in names)
+            self.index[key] = {"files": names, "size": size, "used": time.time()}
+            self._evict()
+            self._save_index()
+        return True
+
+    def load(self, key, save_path):
+        """A cached entry's outputs as [(file name, bytes)] named after save_path, or None on a miss."""
+        with self._lock:
+            entry = self.index.get(key)
+            src = self._entry_dir(key)
+            try:
+                blobs = []
+                for name in entry["files"] if entry else []:
+                    with open(os.path.join(src, name), "rb") as f:
+                        blobs.append((name, f.read()))
+            except OSError:
+                entry = None
+            if not entry:
+                self.index.pop(key, None)
+                self.misses += 1
+                return None
+            stem = os.path.splitext(os.path.basename(save_path))[0]
+            entry["used"] = time.time()
+            self.hits += 1
+            self._save_index()
+            return [(stem + name[len("out"):], data) for name, data in blobs]
+
+    def store_blobs(self, key, save_path, blobs):
+        """Store in-memory outputs [(file name, bytes)] of a call under key."""
+        if not blobs:
+            return False
+        stem = os.path.splitext(os.path.basename(save_path))[0]
+        dst = self._entry_dir(key)
+        with self._lock:
+            os.makedirs(dst, exist_ok=True)
+            names = []
+            for i, (name, data) in enumerate(blobs):
+                suffix = name[len(stem):] if name and name.startswith(stem) else f"_frame{i}.png"
+                names.append("out" + suffix)
+                with open(os.path.join(dst, names[-1]), "wb") as f:
+                    f.write(data)
+            self.index[key] = {"files": names, "size": sum(len(d) for _, d in blobs), "used": time.time()}
+            self._evict()
+            self._save_index()
+        return True
+
+    def total_bytes(self):
+        return sum(e["size"] for e in self.index.values())
+
+    def _evict(self):
+        total = self.total_bytes()
+        for key in sorted(self.index, key=lambda k: self.index[k]["used"]):
+            if total <= self.max_bytes:
+                break
+            total -= self.index.pop(key)["size"]
+            shutil.rmtree(self._entry_dir(key), ignore_errors=True)
+
+    def clear(self):
+        with self._lock:
+            for key in list(self.index):
+                shutil.rmtree(self._entry_dir(key), ignore_errors=True)
+            self.index = {}
+            self._save_index()
+
+
+def main():
+    ap = argparse.ArgumentParser(description="Inspect the generation cache")
+    ap.add_argument("--root", default=CACHE_DIR)
+    ap.add_argument("--clear", action="store_true", help="delete every entry")
+    ap.add_argument("--stats", action="store_true", help="print entry count and size only")
+    args = ap.parse_args()
+    cache = GenCache(args.root)
+    if args.clear:
+        cache.clear()
+        print(f"Cleared {args.root}")
+        return
+    files = sum(len(e["files"]) for e in cache.index.values())
+    print(f"{args.root}: {len(cache.index)} entries, {files} files, {cache.total_bytes()} bytes "
+          f"({cache.total_bytes() / 1024:.0f} KiB, limit {cache.max_bytes // (1024 * 1024)} MiB)")
+    if args.stats:
+        return
+    for key, e in sorted(cache.index.items(), key=lambda kv: -kv[1]["used"]):
+        stamp = time.strftime("%Y-%m-%d %H:%M", time.localtime(e["used"]))
+        print(f"  {key[:16]}  {len(e['files'])} files  {e['size']:>8d}b  {stamp}")
+
+
+if __name__ == "__main__":
+    main()
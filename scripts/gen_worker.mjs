@@ -0,0 +1,141 @@
+#!/usr/bin/env node
+// Persistent pixellab worker — one mcporter runtime serving many calls.
+// Reads JSON-lines requests on stdin, writes JSON-lines results on stdout.
+// See gen_worker.py for the protocol. Run from the directory holding the
+// mcporter config (WORK_DIR in the generator scripts).
+// Inline requests get the images as frame messages instead of files: image
+// content from the tool result is sent directly; if the backend only wrote
+// files, they are written to a private temp dir, sent and deleted, so the
+// caller's save_to_file is never touched.
+// This is not streaming. The pixellab tools return every image in one result,
+// and mcporter's callTool resolves only once the tool has finished; MCP
+// progress notifications carry no content. So all frames go out together
+// when the call completes, which saves the file round trip but not latency.
+
+import { existsSync, mkdtempSync, readFileSync, readdirSync, rmSync, statSync } from "node:fs";
+import { tmpdir } from "node:os";
+import { basename, dirname, extname, join } from "node:path";
+import readline from "node:readline";
+import { createRuntime } from "mcporter";
+
+const CALL_RE = /^\s*([\w-]+)\.([\w-]+)\(([\s\S]*)\)\s*$/;
+const ARG_RE = /([\w]+):\s*("(?:[^"\\]|\\.)*"|[^,]+)/g;
+
+// "server.tool(key: "str", n: 4, flag: true)" → {server, tool, args}
+function parseCall(str) {
+	const m = CALL_RE.exec(str);
+	if (!m) throw Object.assign(new Error(`unparseable call: ${str.slice(0, 80)}`), { code: "bad_request" });
+	const args = {};
+	for (const [, key, raw] of m[3].matchAll(ARG_RE)) {
+		const v = raw.trim();
+		if (v.startsWith('"')) args[key] = JSON.parse(v);
+		else if (v === "true" || v === "false") args[key] = v === "true";
+		else if (!Number.isNaN(Number(v))) args[key] = Number(v);
+		else args[key] = v;
+	}
+	return { server: m[1], tool: m[2], args };
+}
+
+// Main output plus any <base>_frame{i}<ext> siblings the backend wrote
+function outputFiles(savePath) {
+	const ext = extname(savePath) || ".png";
+	const stem = basename(savePath, ext);
+	const dir = dirname(savePath);
+	const names = existsSync(dir) ? readdirSync(dir) : [];
+	const frames = names.filter((n) => n.startsWith(`${stem}_frame`) && n.endsWith(ext)).sort();
+	const paths = existsSync(savePath) ? [savePath] : [];
+	return paths.concat(frames.map((n) => join(dir, n))).map((p) => ({ path: p, size: statSync(p).size }));
+}
+
+function errorText(result) {
+	return (result?.content ?? []).map((c) => c.text ?? "").join(" ").slice(0, 300);
+}
+
+function fail(id, code, message) {
+	return { id, ok: false, error: { code, message } };
+}
+
+function send(msg) {
+	process.stdout.write(JSON.stringify(msg) + "\n");
+}
+
+// Send each image of a finished inline call as a frame message; returns the count
+function sendFrames(id, result, savePath) {
+	const images = (result?.content ?? []).filter((c) => c.type === "image" && c.data);
+	if (images.length > 0) {
+		images.forEach((c, i) => send({ id, frame: i, png: c.data }));
+		return images.length;
+	}
+	if (!savePath) return 0;
+	const files = outputFiles(savePath);
+	files.forEach((f, i) => send({ id, frame: i, name: basename(f.path), png: readFileSync(f.path).toString("base64") }));
+	return files.length;
+}
+
+async function handle(runtime, req) {
+	let call;
+	try {
+		call = parseCall(req.call ?? "");
+	} catch (e) {
+		return fail(req.id, "bad_request", e.message);
+	}
+	let scratch = null;
+	if (req.inline && call.args.save_to_file) {
+		scratch = mkdtempSync(join(tmpdir(), "gen-worker-"));
+		call.args.save_to_file = join(scratch, basename(call.args.save_to_file));
+	}
+	try {
+		return await run(runtime, req, call);
+	} finally {
+		if (scratch) rmSync(scratch, { recursive: true, force: true });
+	}
+}
+
+async function run(runtime, req, call) {
+	let result;
+	const timeoutMs = (req.timeout ?? 120) * 1000;
+	let timer;
+	try {
+		result = await Promise.race([
+			runtime.callTool(call.server, call.tool, { args: call.args }),
+			new Promise((_, reject) => {
+				timer = setTimeout(() => reject(Object.assign(new Error("timeout"), { code: "timeout" })), timeoutMs);
+			}),
+		]);
+		if (result?.isError) {
+			const msg = errorText(result);
+			return fail(req.id, /rate.?limit|429|too many/i.test(msg) ? "rate_limited" : "backend", msg);
+		}
+	} catch (e) {
+		const msg = String(e?.message ?? e);
+		const code = e?.code === "timeout" ? "timeout" : /rate.?limit|429|too many/i.test(msg) ? "rate_limited" : "backend";
+		return fail(req.id, code, msg.slice(0, 300));
+	} finally {
+		clearTimeout(timer);
+	}
+	if (req.inline) {
+		const frames = sendFrames(req.id, result, call.args.save_to_file);
+		if (frames === 0) return fail(req.id, "no_output", "no images in the result");
+		return { id: req.id, ok: true, frames };
+	}
+	const files = call.args.save_to_file ? outputFiles(call.args.save_to_file) : [];
+	if (call.args.save_to_file && files.length === 0) {
+		return fail(req.id, "no_output", `nothing written to ${call.args.save_to_file}`);
+	}
+	return { id: req.id, ok: true, files };
+}
+
+const runtime = await createRuntime();
+const rl = readline.createInterface({ input: process.stdin, crlfDelay: Infinity });
+for await (const line of rl) {
+	if (!line.trim()) continue;
+	let req;
+	try {
+		req = JSON.parse(line);
+	} catch {
+		send(fail(null, "bad_request", "invalid JSON"));
+		continue;
+	}
+	send(await handle(runtime, req));
+}
+await runtime.close();
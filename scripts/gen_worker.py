@@ -0,0 +1,140 @@
+#!/usr/bin/env python3
+"""Pool of long-lived generator workers speaking JSON lines over pipes.
+
+Each worker is started once and serves many calls, so shell, npx and Node
+startup are paid per worker instead of per call.
+
+Protocol (one JSON object per line):
+    request   {"id": 7, "call": "pixellab.animate_with_text(...)", "timeout": 120}
+    response  {"id": 7, "ok": true, "files": [{"path": "...", "size": 1234}]}
+              {"id": 7, "ok": false, "error": {"code": "backend", "message": "..."}}
+
+Inline requests add "inline": true. The worker then keeps the outputs to
+itself and sends the images as frame messages before the final response,
+so the caller never touches save_to_file. gen_worker.mjs only has the
+images once the tool call has finished, so they all arrive then:
+    frame     {"id": 7, "frame": 0, "name": "imp_walk_frame0.png", "png": "<base64 PNG bytes>"}
+    response  {"id": 7, "ok": true, "frames": 4}
+
+Error codes: timeout, rate_limited, backend, no_output (retryable) and
+bad_request (not retryable). The pool itself adds worker_died when a
+worker exits mid-call; the worker is restarted.
+
+The real worker is gen_worker.mjs (mcporter runtime). fake_pixellab.py
+--worker is a stub that stands in for it offline:
+    GEN_WORKER="python3 scripts/fake_pixellab.py --worker" python3 scripts/generate_demons_v2.py
+"""
+
+import base64
+import itertools
+import json
+import os
+import queue
+import shlex
+import subprocess
+import threading
+
+WORKER_CMD = os.environ.get(
+    "GEN_WORKER", "node " + os.path.join(os.path.dirname(os.path.abspath(__file__)), "gen_worker.mjs"))
+RETRYABLE = {"timeout", "rate_limited", "backend", "no_output", "worker_died"}
+
+
+class Worker:
+    """One worker process plus a reader thread feeding its stdout into a queue."""
+
+    def __init__(self, cmd, cwd=None):
+        self.proc = subprocess.Popen(
+            shlex.split(cmd), stdin=subprocess.PIPE, stdout=subprocess.PIPE,
+            text=True, bufsize=1, cwd=cwd)
+        self.lines = queue.Queue()
+        threading.Thread(target=self._read, daemon=True).start()
+
+    def _read(self):
+        for line in self.proc.stdout:
+            self.lines.put(line)
+        self.lines.put(None)  # EOF
+
+    def request(self, msg, timeout, on_frame=None):
+        """Send one request and wait for its response. Returns None if the worker died or hung.
+
+        Frame messages for the request are passed to on_frame(index, name, png_bytes)
+        as they arrive (name may be None); the timeout applies to the gap between messages.
+        """
+        try:
+            self.proc.stdin.write(json.dumps(msg) + "\n")
+            self.proc.stdin.flush()
+        except (BrokenPipeError, OSError):
+            return None
+        while True:
+            try:
+                line = self.lines.get(timeout=timeout)
+            except queue.Empty:
+                return None
+            if line is None:
+                return None
+            try:
+                resp = json.loads(line)
+            except ValueError:
+                continue  # stray log output
+            if resp.get("id") != msg["id"]:
+                continue
+            if "frame" in resp:
+                if on_frame:
+                    on_frame(resp["frame"], resp.get("name"), base64.b64decode(resp["png"]))
+                continue
+            return resp
+
+    def close(self):
+        if self.proc.poll() is None:
+            try:
+                self.proc.stdin.close()
+                self.proc.wait(timeout=5)
+            except (OSError, subprocess.TimeoutExpired):
+                self.proc.kill()
+
+
+class WorkerPool:
+    """Fixed-size pool; call() is thread-safe and blocks until a worker is free."""
+
+    def __init__(self, size=4, cmd=WORKER_CMD, cwd=None):
+        if cwd and not os.path.isdir(cwd):
+            cwd = None
+        self.cmd = cmd
+        self.cwd = cwd
+        self.size = size
+        self._ids = itertools.count(1)
+        self._idle = queue.Queue()
+        for _ in range(size):
+            self._idle.put(Worker(cmd, cwd))
+
+    def call(self, call_str, timeout=120, on_frame=None):
+        """Run one call on a free worker. Returns the response dict.
+
+        With on_frame the images come back inline, as
+        on_frame(index, name, png_bytes), instead of being left on disk.
+        """
+        msg = {"id": next(self._ids), "call": call_str, "timeout": timeout}
+        if on_frame:
+            msg["inline"] = True
+        worker = self._idle.get()
+        try:
+            resp = worker.request(msg, timeout + 5, on_frame)
+            if resp is None:
+                hung = worker.proc.poll() is None
+                worker.proc.kill()
+                worker = Worker(self.cmd, self.cwd)
+                code = "timeout" if hung else "worker_died"
+                return {"id": msg["id"], "ok": False, "error": {"code": code, "message": f"worker {code}"}}
+            return resp
+        finally:
+            self._idle.put(worker)
+
+    def close(self):
+        for _ in range(self.size):
+            self._idle.get().close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
@@ -6,6 +6,8 @@ import time
 import os
 from PIL import Image
 
+from normalize_sheets import normalize_sheet
+
 ENEMIES_DIR = "/root/clawd/projects/tower-defense/assets/sprites/enemies"
 STYLE_REF = "/tmp/demon_sprites/style_ref_128.png"  # 128x128 upscaled reference
 TEMP_DIR = "/tmp/demon_sprites"
@@ -76,50 +78,13 @@ def generate_walk(name, desc, static_path):
     )
     
     if mcp_call(call) and os.path.exists(anim_path):
-        anim = Image.open(anim_path).convert("RGBA")
-        w, h = anim.size
-        print(f"  → Anim output: {w}x{h}", flush=True)
-        
-        if w == 256 and h == 64:
-            anim.save(sheet_path)
-        elif w >= 4 * h:
-            # Horizontal strip
-            frame_w = w // 4
-            sheet = Image.new("RGBA", (256, 64), (0,0,0,0))
-            for i in range(4):
-                f = anim.crop((i*frame_w, 0, (i+1)*frame_w, h))
-                f = f.resize((64, 64), Image.NEAREST)
-                sheet.paste(f, (i*64, 0))
-            sheet.save(sheet_path)
-        elif h >= 4 * w:
-            # Vertical strip
-            frame_h = h // 4
-            sheet = Image.new("RGBA", (256, 64), (0,0,0,0))
-            for i in range(4):
-                f = anim.crop((0, i*frame_h, w, (i+1)*frame_h))
-                f = f.resize((64, 64), Image.NEAREST)
-                sheet.paste(f, (i*64, 0))
-            sheet.save(sheet_path)
-        else:
-            # Unknown format — try grid or single image
-            sheet = Image.new("RGBA", (256, 64), (0,0,0,0))
-            # Try 2x2 grid
-            if w >= 2*h//2 and h >= 2*w//2:
-                fw, fh = w//2, h//2
-                for row in range(2):
-                    for col in range(2):
-                        i = row*2 + col
-                        f = anim.crop((col*fw, row*fh, (col+1)*fw, (row+1)*fh))
-                        f = f.resize((64, 64), Image.NEAREST)
-                        sheet.paste(f, (i*64, 0))
-            else:
-                scaled = anim.resize((64, 64), Image.NEAREST)
-                for i in range(4):
-                    sheet.paste(scaled, (i*64, 0 if i%2==0 else -1))
-            sheet.save(sheet_path)
-        
-        print(f"  → {sheet_path}", flush=True)
-        return sheet_path
+        # Frame layout (strip, grid, single image) is detected from the alpha channel
+        try:
+            normalize_sheet([anim_path], sheet_path)
+            print(f"  → {sheet_path}", flush=True)
+            return sheet_path
+        except (OSError, ValueError) as e:
+            print(f"  ✗ Could not normalize {anim_path}: {e}", flush=True)
     
     # Fallback: bob animation from static
     print(f"  ⚠ Animation failed, creating bounce fallback", flush=True)
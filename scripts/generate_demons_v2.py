@@ -1,46 +1,37 @@
 #!/usr/bin/env python3
 """Generate all 10 demon sprites + walk animations. Fixed version with:
 - direction: "east" (not "right")
-- Individual frame files combined into sprite sheet
+- Raw walk outputs (frames, strips, grids) normalized by normalize_sheets
 - Run from /root/clawd for mcporter config
+- Static → walk chains run concurrently via sprite_scheduler
+- With the worker pool, images come back in memory and each sprite/sheet
+  is encoded once (TEMP_DIR only sees files on the --cli path)
 """
 
-import subprocess
-import time
+import argparse
+import io
 import os
 from PIL import Image
 
+from gen_cache import CACHE_DIR, GenCache
+from gen_worker import WorkerPool
+from normalize_sheets import decode, write_sheet
+from sprite_scheduler import GenerationError, Scheduler, mcp_frames as _mcp_frames
+
 ENEMIES_DIR = "/root/clawd/projects/tower-defense/assets/sprites/enemies"
 STYLE_REF = "/tmp/demon_sprites/style_ref_128.png"
 TEMP_DIR = "/tmp/demon_sprites"
 WORK_DIR = "/root/clawd"
+CACHE = None  # GenCache, set in main() unless --no-cache
+POOL = None  # WorkerPool, set in main() unless --cli
 
-os.makedirs(TEMP_DIR, exist_ok=True)
-os.makedirs(ENEMIES_DIR, exist_ok=True)
-
-def mcp(call_str, timeout=120):
-    cmd = f"npx mcporter call '{call_str}'"
-    print(f"  → {call_str[:100]}...", flush=True)
-    try:
-        r = subprocess.run(cmd, shell=True, capture_output=True, text=True, timeout=timeout, cwd=WORK_DIR)
-        out = r.stdout + r.stderr
-        if r.returncode != 0 or "Error" in out[:500]:
-            print(f"  ✗ {out[:200]}", flush=True)
-            return False
-        print(f"  ✓ OK", flush=True)
-        return True
-    except subprocess.TimeoutExpired:
-        print(f"  ✗ Timeout", flush=True)
-        return False
+def mcp_frames(call_str, timeout=120, on_frame=None):
+    return _mcp_frames(call_str, timeout=timeout, cwd=WORK_DIR, cache=CACHE, pool=POOL, on_frame=on_frame)
 
 def gen_static(name, desc, neg=""):
     raw = f"{TEMP_DIR}/{name}_raw128.png"
     final = f"{ENEMIES_DIR}/{name}_enemy.png"
     
-    if os.path.exists(final):
-        print(f"  → Already exists: {final}", flush=True)
-        return final
-    
     neg_part = f', negative_description: "{neg}"' if neg else ""
     call = (
         f'pixellab.generate_image_bitforge('
@@ -55,13 +46,14 @@ def gen_static(name, desc, neg=""):
         f'save_to_file: "{raw}", show_image: false)'
     )
     
-    if mcp(call) and os.path.exists(raw):
-        img = Image.open(raw).convert("RGBA")
-        scaled = img.resize((64, 64), Image.NEAREST)
-        scaled.save(final)
-        print(f"  → {final}", flush=True)
-        return final
-    return None
+    blobs = mcp_frames(call)
+    if not blobs:
+        raise GenerationError("backend reported OK but sent no image")
+    img = Image.open(io.BytesIO(blobs[0][1])).convert("RGBA")
+    scaled = img.resize((64, 64), Image.NEAREST)
+    scaled.save(final)
+    print(f"  → {final}", flush=True)
+    return final
 
 def gen_walk(name, desc, static_path):
     sheet_path = f"{ENEMIES_DIR}/{name}_walk_sheet.png"
@@ -77,41 +69,17 @@ def gen_walk(name, desc, static_path):
         f'save_to_file: "{base}.png", show_image: false)'
     )
     
-    if mcp(call):
-        # Check for individual frame files
-        frames = []
-        for i in range(4):
-            fpath = f"{base}_frame{i}.png"
-            if os.path.exists(fpath):
-                frames.append(Image.open(fpath).convert("RGBA"))
-        
-        if len(frames) == 4:
-            sheet = Image.new("RGBA", (256, 64), (0,0,0,0))
-            for i, f in enumerate(frames):
-                if f.size != (64, 64):
-                    f = f.resize((64, 64), Image.NEAREST)
-                sheet.paste(f, (i*64, 0))
-            sheet.save(sheet_path)
-            print(f"  → {sheet_path} (4 real frames)", flush=True)
-            return sheet_path
-        
-        # Check for single combined file
-        if os.path.exists(f"{base}.png"):
-            img = Image.open(f"{base}.png").convert("RGBA")
-            w, h = img.size
-            if w >= 4*h:
-                fw = w // 4
-                sheet = Image.new("RGBA", (256, 64), (0,0,0,0))
-                for i in range(4):
-                    f = img.crop((i*fw, 0, (i+1)*fw, h)).resize((64,64), Image.NEAREST)
-                    sheet.paste(f, (i*64, 0))
-                sheet.save(sheet_path)
-                print(f"  → {sheet_path} (strip)", flush=True)
-                return sheet_path
-    
-    # Fallback: bounce from static
-    print(f"  ⚠ Using bounce fallback", flush=True)
-    return make_fallback(static_path, sheet_path)
+    # Decode each image as it arrives; the sheet is assembled and encoded once
+    images = {}
+    try:
+        blobs = mcp_frames(call, on_frame=lambda n, data: images.__setitem__(n, decode(data)))
+        # Per-frame images if the backend sent them, otherwise whatever combined image it returned
+        names = [n for n, _ in blobs if "_frame" in n] or [n for n, _ in blobs]
+        write_sheet([images[n] for n in names], sheet_path, label=f"{name} walk")
+    except (OSError, ValueError) as e:
+        raise GenerationError(f"no usable walk frames for {name}: {e}")
+    print(f"  → {sheet_path} ({len(names)} raw image(s))", flush=True)
+    return sheet_path
 
 def make_fallback(static_path, sheet_path):
     if not static_path or not os.path.exists(static_path):
@@ -157,39 +125,52 @@ DEMONS = [
      "small, thin, cute, friendly, unimposing, no horns"),
 ]
 
+def parse_args():
+    ap = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    ap.add_argument("--workers", type=int, default=4, help="concurrent backend calls")
+    ap.add_argument("--rate", type=float, default=1.0, help="max calls per second")
+    ap.add_argument("--retries", type=int, default=3, help="retries per call on timeout/Error")
+    ap.add_argument("--cache-dir", default=CACHE_DIR, help="content-addressed generation cache")
+    ap.add_argument("--cache-mb", type=int, default=512, help="cache size limit (LRU eviction)")
+    ap.add_argument("--no-cache", action="store_true", help="always call the backend")
+    ap.add_argument("--cli", action="store_true", help="spawn npx mcporter per call instead of a worker pool")
+    return ap.parse_args()
+
+def schedule(sched, demons):
+    """Queue a static → walk chain per demon. Walks fall back to a bounce sheet."""
+    for name, desc, neg in demons:
+        sched.add(f"{name}:static", lambda n=name, d=desc, ng=neg: gen_static(n, d, ng))
+        sched.add(
+            f"{name}:walk",
+            lambda static, n=name, d=desc: gen_walk(n, d, static),
+            deps=[f"{name}:static"],
+            fallback=lambda static, n=name: make_fallback(static, f"{ENEMIES_DIR}/{n}_walk_sheet.png"),
+        )
+
 def main():
+    global CACHE, POOL
+    args = parse_args()
+    if not args.no_cache:
+        CACHE = GenCache(args.cache_dir, args.cache_mb * 1024 * 1024)
+    os.makedirs(TEMP_DIR, exist_ok=True)
+    os.makedirs(ENEMIES_DIR, exist_ok=True)
+    
     print("=" * 60, flush=True)
-    print("DEMON SPRITES — Phase 1", flush=True)
+    print(f"DEMON SPRITES — {len(DEMONS)} static → walk chains, {args.workers} workers", flush=True)
     print("=" * 60, flush=True)
     
-    # Phase 1: Generate all static sprites
-    print("\n─── PHASE 1: Static Sprites ───", flush=True)
-    statics = {}
-    for i, (name, desc, neg) in enumerate(DEMONS):
-        print(f"\n[{i+1}/10] {name.upper()} static", flush=True)
-        path = gen_static(name, desc, neg)
-        if path:
-            statics[name] = path
-        else:
-            print(f"  ❌ FAILED", flush=True)
-        time.sleep(0.5)
-    
-    print(f"\n✅ Statics: {len(statics)}/10", flush=True)
-    
-    # Phase 2: Generate all walk animations
-    print("\n─── PHASE 2: Walk Animations ───", flush=True)
-    walks = {}
-    for i, (name, desc, neg) in enumerate(DEMONS):
-        if name not in statics:
-            print(f"\n[{i+1}/10] {name.upper()} — skipped (no static)", flush=True)
-            continue
-        print(f"\n[{i+1}/10] {name.upper()} walk", flush=True)
-        path = gen_walk(name, desc, statics[name])
-        if path:
-            walks[name] = path
-        time.sleep(0.5)
-    
-    print(f"\n✅ Walks: {len(walks)}/10", flush=True)
+    if not args.cli:
+        POOL = WorkerPool(args.workers, cwd=WORK_DIR)
+    sched = Scheduler(workers=args.workers, rate=args.rate, retries=args.retries)
+    schedule(sched, DEMONS)
+    try:
+        sched.run()
+    finally:
+        if POOL:
+            POOL.close()
+    ok = sched.summary()
+    if CACHE:
+        print(f"  cache: {CACHE.hits} hits, {CACHE.misses} misses", flush=True)
     
     # Summary
     print(f"\n{'='*60}", flush=True)
@@ -199,6 +180,7 @@ def main():
         if os.path.isfile(fp) and f.endswith('.png'):
             img = Image.open(fp)
             print(f"  {f:30s} {img.size[0]:3d}x{img.size[1]:3d}  {os.path.getsize(fp):>6d}b", flush=True)
+    return 0 if ok else 1
 
 if __name__ == "__main__":
-    main()
+    raise SystemExit(main())
@@ -0,0 +1,66 @@
+#!/usr/bin/env python3
+"""Map geometry shared by the offline level tools.
+
+Mirrors GridManager (scripts/managers/grid_manager.gd): 32px cells, an 80x45
+grid, 2x2 towers centred on the corner between their cells, and path cells
+marked from the curve's baked points plus their 8 neighbours.
+"""
+
+import numpy as np
+
+CELL_SIZE = 32
+GRID_W = 80
+GRID_H = 45
+BAKE_INTERVAL = 5.0  # Curve2D default, used by mark_path_cells
+
+
+class PathLine:
+    """Enemy path polyline with arc-length lookups (PathFollow2D.progress)."""
+
+    def __init__(self, points):
+        self.points = np.asarray(points, dtype=float)
+        seg = np.diff(self.points, axis=0)
+        self.seg_len = np.hypot(seg[:, 0], seg[:, 1])
+        self.cum = np.concatenate([[0.0], np.cumsum(self.seg_len)])
+        self.length = float(self.cum[-1])
+
+    def at(self, progress):
+        """(x, y) arrays for progress values of any shape."""
+        p = np.asarray(progress, dtype=float)
+        return np.interp(p, self.cum, self.points[:, 0]), np.interp(p, self.cum, self.points[:, 1])
+
+    def baked(self, interval=BAKE_INTERVAL):
+        """Points every `interval` px along the path, like Curve2D.get_baked_points()."""
+        n = max(2, int(np.ceil(self.length / interval)) + 1)
+        return np.stack(self.at(np.linspace(0.0, self.length, n)), axis=1)
+
+
+def world_to_grid(xy):
+    """GridManager.world_to_grid for an (N, 2) array: truncate, then clamp."""
+    g = np.trunc(np.asarray(xy, dtype=float) / CELL_SIZE).astype(int)
+    g[:, 0] = np.clip(g[:, 0], 0, GRID_W - 1)
+    g[:, 1] = np.clip(g[:, 1], 0, GRID_H - 1)
+    return g
+
+
+def path_cells(points):
+    """(GRID_W, GRID_H) bool grid of cells blocked by the path."""
+    cells = world_to_grid(PathLine(points).baked())
+    grid = np.zeros((GRID_W, GRID_H), dtype=bool)
+    for dx in (-1, 0, 1):
+        for dy in (-1, 0, 1):
+            x, y = cells[:, 0] + dx, cells[:, 1] + dy
+            ok = (x >= 0) & (x < GRID_W) & (y >= 0) & (y < GRID_H)
+            grid[x[ok], y[ok]] = True
+    return grid
+
+
+def free_anchors(blocked):
+    """(GRID_W-1, GRID_H-1) bool grid: True where a 2x2 tower fits with its top-left cell there."""
+    b = np.asarray(blocked, dtype=bool)
+    return ~(b[:-1, :-1] | b[1:, :-1] | b[:-1, 1:] | b[1:, 1:])
+
+
+def anchor_center(ax, ay):
+    """World position of a tower placed at anchor cell (ax, ay)."""
+    return ax * CELL_SIZE + CELL_SIZE, ay * CELL_SIZE + CELL_SIZE
@@ -8,11 +8,18 @@ extends Node
 ## - Variant randomization (e.g. button_click, button_click_2, button_click_3)
 ## - Volume controls (master, sfx, music) with persistence
 ## - Audio bus routing (Master → SFX / Music)
+## - SFX are the trimmed/normalized clips from scripts/preprocess_audio.py
+##   (originals live in assets/audio/source/, which is not imported or exported)
+## - Optional manifest from the same script: only "hot" sounds preloaded,
+##   the rest and all music loaded on first play
+## NOTE: audio_manifest.json must be included in export presets (filter "assets/audio/*.json")
 
 # ── Constants ──
 const SFX_POOL_SIZE: int = 16
 const SFX_COOLDOWN_MS: int = 80
 const AUDIO_SETTINGS_PATH: String = "user://audio_settings.json"
+const AUDIO_MANIFEST_PATH: String = "res://assets/audio/audio_manifest.json"
+const AUDIO_MANIFEST_VERSION: int = 1
 
 # ── Volume Settings (linear 0.0–1.0) ──
 var master_volume: float = 1.0
@@ -29,65 +36,66 @@ var _music_b: AudioStreamPlayer
 var _active_music: AudioStreamPlayer
 var _current_music: String = ""
 var _sfx_cooldowns: Dictionary = {}
+var _lazy_sfx: Dictionary = {}  # sound name -> true, loaded on first play_sfx
 
 # ── SFX File Paths ──
 var _sfx_paths: Dictionary = {
 	"arrow_fire": [
-		"res://assets/audio/combat/arrow_fire.wav",
-		"res://assets/audio/combat/arrow_fire_2.wav",
+		"res://assets/audio/processed/combat/arrow_fire.wav",
+		"res://assets/audio/processed/combat/arrow_fire_2.wav",
 	],
-	"fire_attack": ["res://assets/audio/combat/fire_attack.wav"],
-	"frost_attack": ["res://assets/audio/combat/frost_attack.wav"],
-	"holy_attack": ["res://assets/audio/combat/holy_attack.wav"],
-	"poison_attack": ["res://assets/audio/combat/poison_attack.wav"],
-	"wind_attack": ["res://assets/audio/combat/wind_attack.wav"],
+	"fire_attack": ["res://assets/audio/processed/combat/fire_attack.wav"],
+	"frost_attack": ["res://assets/audio/processed/combat/frost_attack.wav"],
+	"holy_attack": ["res://assets/audio/processed/combat/holy_attack.wav"],
+	"poison_attack": ["res://assets/audio/processed/combat/poison_attack.wav"],
+	"wind_attack": ["res://assets/audio/processed/combat/wind_attack.wav"],
 	"spell": [
-		"res://assets/audio/combat/spell_00.wav",
-		"res://assets/audio/combat/spell_01.wav",
-		"res://assets/audio/combat/spell_02.wav",
-		"res://assets/audio/combat/spell_03.wav",
+		"res://assets/audio/processed/combat/spell_00.wav",
+		"res://assets/audio/processed/combat/spell_01.wav",
+		"res://assets/audio/processed/combat/spell_02.wav",
+		"res://assets/audio/processed/combat/spell_03.wav",
 	],
-	"explosion_impact": ["res://assets/audio/combat/explosion_impact.wav"],
-	"hit_metal": ["res://assets/audio/combat/hit_metal.wav"],
+	"explosion_impact": ["res://assets/audio/processed/combat/explosion_impact.wav"],
+	"hit_metal": ["res://assets/audio/processed/combat/hit_metal.wav"],
 	"enemy_death": [
-		"res://assets/audio/combat/enemy_death.wav",
-		"res://assets/audio/combat/enemy_death_2.wav",
+		"res://assets/audio/processed/combat/enemy_death.wav",
+		"res://assets/audio/processed/combat/enemy_death_2.wav",
 	],
-	"enemy_death_ogre": ["res://assets/audio/combat/enemy_death_ogre.wav"],
-	"enemy_death_shade": ["res://assets/audio/combat/enemy_death_shade.wav"],
+	"enemy_death_ogre": ["res://assets/audio/processed/combat/enemy_death_ogre.wav"],
+	"enemy_death_shade": ["res://assets/audio/processed/combat/enemy_death_shade.wav"],
 	"enemy_hit": [
-		"res://assets/audio/combat/enemy_hit.wav",
-		"res://assets/audio/combat/enemy_hit_2.wav",
-		"res://assets/audio/combat/enemy_hit_3.wav",
+		"res://assets/audio/processed/combat/enemy_hit.wav",
+		"res://assets/audio/processed/combat/enemy_hit_2.wav",
+		"res://assets/audio/processed/combat/enemy_hit_3.wav",
 	],
-	"enemy_hit_soft": ["res://assets/audio/combat/enemy_hit_soft.wav"],
+	"enemy_hit_soft": ["res://assets/audio/processed/combat/enemy_hit_soft.wav"],
 	"gold_pickup": [
-		"res://assets/audio/combat/gold_pickup.wav",
-		"res://assets/audio/combat/gold_pickup_2.wav",
-		"res://assets/audio/combat/gold_pickup_3.wav",
+		"res://assets/audio/processed/combat/gold_pickup.wav",
+		"res://assets/audio/processed/combat/gold_pickup_2.wav",
+		"res://assets/audio/processed/combat/gold_pickup_3.wav",
 	],
 	"button_click": [
-		"res://assets/audio/ui/button_click.wav",
-		"res://assets/audio/ui/button_click_2.wav",
-		"res://assets/audio/ui/button_click_3.wav",
+		"res://assets/audio/processed/ui/button_click.wav",
+		"res://assets/audio/processed/ui/button_click_2.wav",
+		"res://assets/audio/processed/ui/button_click_3.wav",
 	],
 	"button_hover": [
-		"res://assets/audio/ui/button_hover.wav",
-		"res://assets/audio/ui/button_hover_2.wav",
+		"res://assets/audio/processed/ui/button_hover.wav",
+		"res://assets/audio/processed/ui/button_hover_2.wav",
 	],
-	"defeat": ["res://assets/audio/ui/defeat.wav"],
-	"error": ["res://assets/audio/ui/error.wav"],
-	"menu_close": ["res://assets/audio/ui/menu_close.wav"],
-	"menu_open": ["res://assets/audio/ui/menu_open.wav"],
-	"select": ["res://assets/audio/ui/select.wav"],
-	"tower_place": ["res://assets/audio/ui/tower_place.wav"],
-	"tower_sell": ["res://assets/audio/ui/tower_sell.wav"],
+	"defeat": ["res://assets/audio/processed/ui/defeat.wav"],
+	"error": ["res://assets/audio/processed/ui/error.wav"],
+	"menu_close": ["res://assets/audio/processed/ui/menu_close.wav"],
+	"menu_open": ["res://assets/audio/processed/ui/menu_open.wav"],
+	"select": ["res://assets/audio/processed/ui/select.wav"],
+	"tower_place": ["res://assets/audio/processed/ui/tower_place.wav"],
+	"tower_sell": ["res://assets/audio/processed/ui/tower_sell.wav"],
 	"tower_upgrade": [
-		"res://assets/audio/ui/tower_upgrade.wav",
-		"res://assets/audio/ui/tower_upgrade_alt.wav",
+		"res://assets/audio/processed/ui/tower_upgrade.wav",
+		"res://assets/audio/processed/ui/tower_upgrade_alt.wav",
 	],
-	"victory_fanfare": ["res://assets/audio/ui/victory_fanfare.wav"],
-	"wave_start": ["res://assets/audio/ui/wave_start.wav"],
+	"victory_fanfare": ["res://assets/audio/processed/ui/victory_fanfare.wav"],
+	"wave_start": ["res://assets/audio/processed/ui/wave_start.wav"],
 }
 
 # ── Music File Paths ──
@@ -123,8 +131,8 @@ func _ready():
 	process_mode = Node.PROCESS_MODE_ALWAYS
 	_setup_audio_buses()
 	_create_players()
+	_load_manifest()
 	_preload_sfx()
-	_preload_music()
 	_load_settings()
 	_apply_volumes()
 
@@ -155,33 +163,56 @@ func _create_players():
 		add_child(player)
 		_sfx_pool.append(player)
 
+# Note which sounds can wait until first use
+# Without a manifest (or with an outdated one) everything is preloaded
+func _load_manifest():
+	if not FileAccess.file_exists(AUDIO_MANIFEST_PATH):
+		return
+	var manifest = JSON.parse_string(FileAccess.get_file_as_string(AUDIO_MANIFEST_PATH))
+	if not manifest is Dictionary or int(manifest.get("version", 0)) != AUDIO_MANIFEST_VERSION:
+		push_warning("AudioManager: bad or outdated " + AUDIO_MANIFEST_PATH)
+		return
+	var sfx: Dictionary = manifest.get("sfx", {})
+	for sound_name in sfx:
+		if _sfx_paths.has(sound_name) and sfx[sound_name].get("tier", "hot") == "lazy":
+			_lazy_sfx[sound_name] = true
+
 func _preload_sfx():
 	for sound_name in _sfx_paths:
-		var streams: Array = []
-		for path in _sfx_paths[sound_name]:
-			if ResourceLoader.exists(path):
-				streams.append(load(path))
-			else:
-				push_warning("AudioManager: SFX not found — " + path)
-		if not streams.is_empty():
-			_sfx[sound_name] = streams
-
-func _preload_music():
-	for track_name in _music_paths:
-		var path = _music_paths[track_name]
+		if not _lazy_sfx.has(sound_name):
+			_load_sfx(sound_name)
+
+func _load_sfx(sound_name: String):
+	var streams: Array = []
+	for path in _sfx_paths[sound_name]:
 		if ResourceLoader.exists(path):
-			var stream = load(path)
-			if stream is AudioStreamOggVorbis:
-				stream.loop = true
-			_music[track_name] = stream
+			streams.append(load(path))
 		else:
-			push_warning("AudioManager: Music not found — " + path)
+			push_warning("AudioManager: SFX not found — " + path)
+	if not streams.is_empty():
+		_sfx[sound_name] = streams
+
+# Music is loaded on first play; Ogg streams decode as they play
+func _get_music(track_name: String) -> AudioStream:
+	if _music.has(track_name):
+		return _music[track_name]
+	var path = _music_paths.get(track_name, "")
+	if path == "" or not ResourceLoader.exists(path):
+		return null
+	var stream = load(path)
+	if stream is AudioStreamOggVorbis:
+		stream.loop = true
+	_music[track_name] = stream
+	return stream
 
 # ══════════════════════════════════════════════════════════
 # SFX PLAYBACK
 # ══════════════════════════════════════════════════════════
 
 func play_sfx(sound_name: String, volume_db: float = 0.0) -> void:
+	if _lazy_sfx.has(sound_name):
+		_lazy_sfx.erase(sound_name)
+		_load_sfx(sound_name)
 	if not _sfx.has(sound_name):
 		return
 	
@@ -212,7 +243,8 @@ func play_music(track_name: String, fade_duration: float = 1.0) -> void:
 	if track_name == _current_music:
 		return
 	
-	if not _music.has(track_name):
+	var stream = _get_music(track_name)
+	if stream == null:
 		push_warning("AudioManager: Unknown music — " + track_name)
 		return
 	
@@ -229,7 +261,7 @@ func play_music(track_name: String, fade_duration: float = 1.0) -> void:
 		old_player = _music_b
 	
 	# Start new track silently
-	new_player.stream = _music[track_name]
+	new_player.stream = stream
 	new_player.volume_db = -80.0
 	new_player.play()
 	
@@ -75,12 +75,17 @@ func world_to_grid(world_pos: Vector2) -> Vector2i:
 func grid_to_world(grid_pos: Vector2i) -> Vector2:
 	return Vector2(grid_pos.x * CELL_SIZE, grid_pos.y * CELL_SIZE)
 
-# Get the snapped center position for a 2x2 tower placement
-func get_tower_snap_position(world_pos: Vector2) -> Vector2:
+# Top-left cell of the 2x2 area a tower placed at world_pos would occupy
+func get_tower_anchor(world_pos: Vector2) -> Vector2i:
 	var grid_pos = world_to_grid(world_pos)
 	# Clamp so 2x2 tower stays within grid
 	grid_pos.x = clampi(grid_pos.x, 0, grid_width - 2)
 	grid_pos.y = clampi(grid_pos.y, 0, grid_height - 2)
+	return grid_pos
+
+# Get the snapped center position for a 2x2 tower placement
+func get_tower_snap_position(world_pos: Vector2) -> Vector2:
+	var grid_pos = get_tower_anchor(world_pos)
 	# Return center of the 2x2 area
 	return Vector2(
 		grid_pos.x * CELL_SIZE + CELL_SIZE,
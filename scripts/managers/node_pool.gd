@@ -0,0 +1,125 @@
+extends Node
+
+## Node pools for hot spawn paths (autoload "NodePool"): projectiles, death effects,
+## enemy path followers
+## register(key, factory) (or register_scene(scene)), then acquire(key) instead
+## of instantiate()/new() and release(node) instead of queue_free()
+## Released nodes are detached from the tree at the end of the frame (no
+## processing, no physics) and handed out again by the next acquire
+## Reused nodes get _pool_reset() called on them and on any descendant that
+## has it, so each pooled script clears its own per-use state there
+## Counters per pool (get_stats, and the debugger's Monitors tab under pools/):
+##   hits (reused), misses (built new), in_use, high_water (peak in_use), parked
+
+const STAT_NAMES = ["hits", "misses", "in_use", "high_water"]
+
+var _factories: Dictionary = {}   # key -> Callable returning a new Node
+var _parked: Dictionary = {}      # key -> Array of detached nodes
+var _stats: Dictionary = {}       # key -> {hits, misses, in_use, high_water}
+var _scenes: Dictionary = {}      # key -> PackedScene kept alive for register_scene pools
+
+# Registering an existing key only swaps its factory (e.g. a new level's main scene)
+func register(key: String, factory: Callable):
+	var known = _factories.has(key)
+	_factories[key] = factory
+	if known:
+		return
+	_parked[key] = []
+	_stats[key] = {"hits": 0, "misses": 0, "in_use": 0, "high_water": 0}
+	for stat in STAT_NAMES:
+		var id = "pools/%s_%s" % [key, stat]
+		if not Performance.has_custom_monitor(id):
+			Performance.add_custom_monitor(id, func(): return _stats.get(key, {}).get(stat, 0))
+	if not Performance.has_custom_monitor("pools/%s_parked" % key):
+		Performance.add_custom_monitor("pools/%s_parked" % key, func(): return _parked.get(key, []).size())
+
+# Pool keyed by the scene's path, building nodes with instantiate(); returns the key
+func register_scene(scene: PackedScene) -> String:
+	var key = "scene:" + scene.resource_path
+	if not _factories.has(key):
+		_scenes[key] = scene
+		register(key, scene.instantiate)
+	return key
+
+func is_registered(key: String) -> bool:
+	return _factories.has(key)
+
+# Build parked nodes until the pool holds count (parked + in use)
+func warm(key: String, count: int):
+	if not _factories.has(key):
+		return
+	var parked: Array = _parked[key]
+	while parked.size() + _stats[key]["in_use"] < count:
+		parked.append(_build(key))
+
+func acquire(key: String) -> Node:
+	var stats: Dictionary = _stats[key]
+	var parked: Array = _parked[key]
+	var node: Node
+	if parked.is_empty():
+		node = _build(key)
+		stats["misses"] += 1
+	else:
+		node = parked.pop_back()
+		stats["hits"] += 1
+		_reset(node)
+	node.set_meta("pool_released", false)
+	stats["in_use"] += 1
+	stats["high_water"] = maxi(stats["high_water"], stats["in_use"])
+	return node
+
+# Give a node back; nodes from no pool are simply freed. Releasing twice is a no-op
+func release(node: Node):
+	if not is_instance_valid(node):
+		return
+	var key = node.get_meta("pool_key", "")
+	if not _factories.has(key):
+		node.queue_free()
+		return
+	if node.get_meta("pool_released", false):
+		return
+	node.set_meta("pool_released", true)
+	_stats[key]["in_use"] = maxi(_stats[key]["in_use"] - 1, 0)  # may predate a clear()
+	# Detach later: release often happens inside physics or signal callbacks
+	_park.call_deferred(node)
+
+func is_pooled(node: Node) -> bool:
+	return is_instance_valid(node) and _factories.has(node.get_meta("pool_key", ""))
+
+func get_stats() -> Dictionary:
+	var out: Dictionary = {}
+	for key in _stats:
+		out[key] = _stats[key].duplicate()
+		out[key]["parked"] = _parked[key].size()
+	return out
+
+# Free every parked node and zero the counters (level exit); factories stay registered
+func clear():
+	for key in _parked:
+		for node in _parked[key]:
+			if is_instance_valid(node):
+				node.free()
+		_parked[key].clear()
+		_stats[key] = {"hits": 0, "misses": 0, "in_use": 0, "high_water": 0}
+
+func _build(key: String) -> Node:
+	var node: Node = _factories[key].call()
+	node.set_meta("pool_key", key)
+	return node
+
+func _park(node: Node):
+	if not is_instance_valid(node) or not node.get_meta("pool_released", false):
+		return
+	var parent = node.get_parent()
+	if parent:
+		parent.remove_child(node)
+	_parked[node.get_meta("pool_key")].append(node)
+
+func _reset(node: Node):
+	if node.has_method("_pool_reset"):
+		node._pool_reset()
+	for child in node.get_children():
+		_reset(child)
+
+func _exit_tree():
+	clear()
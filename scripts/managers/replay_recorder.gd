@@ -0,0 +1,87 @@
+extends RefCounted
+class_name ReplayRecorder
+
+## Records a run as a compact binary replay (read by scripts/replay.py)
+## Header: "HMRP", u8 version, u8 level, u16 tick rate, u32 unix start time
+## Events: varint((ticks since previous event << 3) | kind), then varint payload
+##   WAVE    wave number
+##   PLACE   tower type index (GameManager.tower_data order), anchor x, anchor y
+##   UPGRADE anchor x, anchor y, path index (upgrade_data order), new level
+##   SELL    anchor x, anchor y
+##   END     won, lives, kills, gold earned, score, waves completed
+## Ticks are game time at TICK_RATE (paused time does not count)
+## Recording only appends a few bytes to a buffer per player action
+
+const MAGIC = "HMRP"
+const VERSION: int = 1
+const TICK_RATE: int = 60
+const CELL_SIZE: int = 32
+
+enum Kind { WAVE, PLACE, UPGRADE, SELL, END }
+
+var level: int = 0
+var _buf := PackedByteArray()
+var _time: float = 0.0
+var _last_tick: int = 0
+var _finished: bool = false
+
+func begin(level_num: int):
+	level = level_num
+	_time = 0.0
+	_last_tick = 0
+	_finished = false
+	_buf = PackedByteArray()
+	_buf.append_array(MAGIC.to_ascii_buffer())
+	_buf.append(VERSION)
+	_buf.append(level_num)
+	_buf.resize(_buf.size() + 6)
+	_buf.encode_u16(6, TICK_RATE)
+	_buf.encode_u32(8, int(Time.get_unix_time_from_system()))
+
+func advance(delta: float):
+	_time += delta
+
+func wave_started(wave_number: int):
+	_event(Kind.WAVE, [wave_number])
+
+func tower_placed(tower_type: String, anchor: Vector2i):
+	var index = GameManager.tower_data.keys().find(tower_type)
+	if index >= 0:
+		_event(Kind.PLACE, [index, anchor.x, anchor.y])
+
+func tower_upgraded(tower: Node2D, path: String, new_level: int):
+	var anchor = _anchor(tower.global_position)
+	var index = GameManager.upgrade_data.get(tower.get_tower_type(), {}).keys().find(path)
+	if index >= 0:
+		_event(Kind.UPGRADE, [anchor.x, anchor.y, index, new_level])
+
+func tower_sold(tower: Node2D):
+	var anchor = _anchor(tower.global_position)
+	_event(Kind.SELL, [anchor.x, anchor.y])
+
+# Close the log with the claimed result; returns the replay bytes
+func finish(won: bool, score: Dictionary) -> PackedByteArray:
+	if not _finished:
+		_event(Kind.END, [1 if won else 0, score.get("lives_remaining", 0), score.get("enemies_killed", 0),
+				score.get("gold_earned", 0), score.get("score", 0), GameManager.current_wave])
+		_finished = true
+	return _buf
+
+# Towers sit on the corner between their 2x2 cells (GridManager.get_tower_snap_position)
+func _anchor(pos: Vector2) -> Vector2i:
+	return Vector2i(roundi(pos.x / CELL_SIZE) - 1, roundi(pos.y / CELL_SIZE) - 1)
+
+func _event(kind: int, payload: Array):
+	if _finished or _buf.is_empty():
+		return
+	var tick = int(_time * TICK_RATE)
+	_varint(((tick - _last_tick) << 3) | kind)
+	_last_tick = tick
+	for v in payload:
+		_varint(maxi(int(v), 0))
+
+func _varint(v: int):
+	while v >= 0x80:
+		_buf.append((v & 0x7F) | 0x80)
+		v >>= 7
+	_buf.append(v)
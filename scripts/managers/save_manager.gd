@@ -2,8 +2,10 @@ extends Node
 class_name SaveManager
 
 ## Handles saving and loading highscores and game progress
+## Finished runs are also kept as binary replays (see ReplayRecorder)
 
 const SAVE_PATH = "user://save_data.json"
+const REPLAY_DIR = "user://replays/"
 
 static func save_highscore(level: int, score_data: Dictionary):
 	var data = _load_all()
@@ -46,6 +48,20 @@ static func load_progress() -> int:
 	var data = _load_all()
 	return data.get("max_level_unlocked", 1)
 
+# Write a finished run's replay; returns its path ("" on failure)
+static func save_replay(level: int, data: PackedByteArray) -> String:
+	if data.is_empty():
+		return ""
+	DirAccess.make_dir_recursive_absolute(REPLAY_DIR)
+	var stamp = Time.get_datetime_string_from_system().replace(":", "-")
+	var path = REPLAY_DIR + "level_%d_%s.hmr" % [level, stamp]
+	var file = FileAccess.open(path, FileAccess.WRITE)
+	if not file:
+		return ""
+	file.store_buffer(data)
+	file.close()
+	return path
+
 static func _load_all() -> Dictionary:
 	if not FileAccess.file_exists(SAVE_PATH):
 		return {}
@@ -0,0 +1,250 @@
+#!/usr/bin/env python3
+"""Normalize raw walk-animation outputs into 256x64 sheets (4 x 64px frames).
+
+The backend answers animate_with_text with separate frame files, a horizontal
+or vertical strip, a 2x2 grid or a single image, at whatever size it likes.
+Instead of guessing the layout from the aspect ratio, frame boundaries are
+found from the alpha occupancy projections: every candidate grid is scored
+by how much opaque pixels its cut lines cross, and the cuts are snapped to
+the emptiest column/row nearby. Frames are then cropped to their content,
+scaled by one factor per sheet, bottom-aligned to a shared baseline and
+centred horizontally.
+
+Usage: normalize_sheets.py [--out DIR] [--jobs N] RAW...
+       RAW is a raw output file or a directory of them. Files are grouped
+       by name: imp_walk_frame0..3.png / imp_walk.png / imp_anim.png
+       → imp_walk_sheet.png
+"""
+
+import argparse
+import io
+import os
+import re
+from collections import defaultdict
+from multiprocessing import Pool
+from pathlib import Path
+
+import numpy as np
+from PIL import Image
+
+FRAME = 64
+N_FRAMES = 4
+BASELINE = 2  # empty rows kept under the feet
+ALPHA_MIN = 8  # alpha below this counts as empty
+GRIDS = [(4, 1), (1, 4), (2, 2), (1, 1)]  # candidate (cols, rows) layouts
+SINGLE_PENALTY = 0.25  # a lone image must beat every real split by this much
+
+RAW_RE = re.compile(r"^(?P<stem>(?P<name>.+?)(?:_walk_retry|_walk|_anim))(?:_frame(?P<idx>\d+))?\.png$")
+
+
+def load(path):
+    return np.asarray(Image.open(path).convert("RGBA"))
+
+
+def decode(data):
+    """PNG bytes (e.g. a streamed frame) → RGBA array."""
+    return np.asarray(Image.open(io.BytesIO(data)).convert("RGBA"))
+
+
+def _snap(occupancy, guess, radius):
+    """Emptiest index within guess±radius, nearest to guess on ties."""
+    lo, hi = max(1, guess - radius), min(len(occupancy) - 1, guess + radius)
+    if lo >= hi:
+        return guess
+    window = occupancy[lo:hi + 1]
+    best = np.flatnonzero(window == window.min()) + lo
+    return int(best[np.argmin(np.abs(best - guess))])
+
+
+def split_frames(rgba, n=N_FRAMES):
+    """Cut one raw image into frames using the alpha projections."""
+    mask = rgba[..., 3] >= ALPHA_MIN
+    h, w = mask.shape
+    col_occ = mask.sum(axis=0)
+    row_occ = mask.sum(axis=1)
+    best = None
+    for cols, rows in GRIDS:
+        if cols * rows not in (n, 1) or w < cols or h < rows:
+            continue
+        cw, ch = w / cols, h / rows
+        xs = [_snap(col_occ, round(cw * i), int(cw * 0.15)) for i in range(1, cols)]
+        ys = [_snap(row_occ, round(ch * i), int(ch * 0.15)) for i in range(1, rows)]
+        cost = sum(col_occ[x] for x in xs) / h + sum(row_occ[y] for y in ys) / w
+        cost += abs(np.log(cw / ch))
+        if cols * rows == 1:
+            cost += SINGLE_PENALTY
+        if best is None or cost < best[0]:
+            best = (cost, [0] + xs + [w], [0] + ys + [h])
+    _, xs, ys = best
+    return [rgba[y0:y1, x0:x1] for y0, y1 in zip(ys, ys[1:]) for x0, x1 in zip(xs, xs[1:])]
+
+
+def load_frames(paths, n=N_FRAMES):
+    """Frames for one sheet: per-frame files as-is, a single file is split."""
+    return pick_frames([load(p) for p in paths], n)
+
+
+def pick_frames(images, n=N_FRAMES):
+    """Frames for one sheet from decoded raw images: several are used as-is, one is split."""
+    if len(images) == 1:
+        frames = split_frames(images[0], n)
+    else:
+        frames = list(images)
+    if len(frames) >= n:
+        # Evenly spaced pick keeps the cycle shape if the backend sent extra frames
+        return [frames[i] for i in np.linspace(0, len(frames) - 1, n).round().astype(int)]
+    return [frames[i % len(frames)] for i in range(n)]
+
+
+def bboxes(frames):
+    """(y0, y1, x0, x1) of the opaque content per frame, None when empty.
+
+    Same-sized frames are stacked and measured in one pass.
+    """
+    out = [None] * len(frames)
+    by_shape = defaultdict(list)
+    for i, f in enumerate(frames):
+        by_shape[f.shape].append(i)
+    for idx in by_shape.values():
+        mask = np.stack([frames[i][..., 3] for i in idx]) >= ALPHA_MIN
+        rows, cols = mask.any(axis=2), mask.any(axis=1)
+        h, w = rows.shape[1], cols.shape[1]
+        y0, y1 = rows.argmax(axis=1), h - rows[:, ::-1].argmax(axis=1)
+        x0, x1 = cols.argmax(axis=1), w - cols[:, ::-1].argmax(axis=1)
+        for k, i in enumerate(idx):
+            if rows[k].any():
+                out[i] = (int(y0[k]), int(y1[k]), int(x0[k]), int(x1[k]))
+    return out
+
+
+def _scale_for(frames, boxes, size):
+    """One scale for the whole sheet: an exact 1/k for oversized cells, else shrink to fit."""
+    cell_h = max(f.shape[0] for f in frames)
+    if cell_h > size and cell_h % size == 0:
+        scale = size / cell_h
+    else:
+        scale = 1.0
+    content = [b for b in boxes if b]
+    if not content:
+        return scale
+    tallest = max(y1 - y0 for y0, y1, _, _ in content) * scale
+    widest = max(x1 - x0 for _, _, x0, x1 in content) * scale
+    return scale * min(1.0, (size - BASELINE) / tallest, size / widest)
+
+
+def _resize_nearest(img, scale):
+    if scale == 1.0:
+        return img
+    h, w = img.shape[:2]
+    nh, nw = max(1, round(h * scale)), max(1, round(w * scale))
+    ys = np.minimum((np.arange(nh) / scale).astype(int), h - 1)
+    xs = np.minimum((np.arange(nw) / scale).astype(int), w - 1)
+    return img[ys[:, None], xs[None, :]]
+
+
+def normalize(frames, size=FRAME):
+    """n raw frames → (size, n*size, 4) sheet, bottom-aligned and centred."""
+    boxes = bboxes(frames)
+    scale = _scale_for(frames, boxes, size)
+    out = np.zeros((len(frames), size, size, 4), dtype=np.uint8)
+    for i, (frame, box) in enumerate(zip(frames, boxes)):
+        if box is None:
+            continue
+        y0, y1, x0, x1 = box
+        crop = _resize_nearest(frame[y0:y1, x0:x1], scale)[:size - BASELINE, :size]
+        ch, cw = crop.shape[:2]
+        top = size - BASELINE - ch
+        left = (size - cw) // 2
+        out[i, top:top + ch, left:left + cw] = crop
+    return out.transpose(1, 0, 2, 3).reshape(size, len(frames) * size, 4)
+
+
+def normalize_sheet(paths, sheet_path, n=N_FRAMES, size=FRAME):
+    """Build one sheet from raw output files. Raises ValueError if nothing is drawn."""
+    paths = [str(p) for p in paths]
+    if not paths:
+        raise ValueError("no raw frames")
+    return write_sheet([load(p) for p in paths], sheet_path, n, size, os.path.basename(paths[0]))
+
+
+def write_sheet(images, sheet_path, n=N_FRAMES, size=FRAME, label="raw frames"):
+    """Build one sheet from decoded raw images and encode it once. Raises ValueError if nothing is drawn."""
+    if not images:
+        raise ValueError("no raw frames")
+    sheet = normalize(pick_frames(images, n), size)
+    if not sheet[..., 3].any():
+        raise ValueError(f"no opaque pixels in {label}")
+    Image.fromarray(sheet, "RGBA").save(sheet_path)
+    return sheet_path
+
+
+def group_raw(inputs):
+    """name → raw files. Frame files win over a combined file of the same stem,
+    and the newest stem wins when several map to one name (imp_walk, imp_walk_retry)."""
+    files = []
+    for p in map(Path, inputs):
+        files.extend(sorted(p.glob("*.png")) if p.is_dir() else [p])
+    stems = defaultdict(lambda: {"frames": [], "combined": None, "name": None})
+    for f in files:
+        m = RAW_RE.match(f.name)
+        if not m:
+            continue
+        entry = stems[(f.parent, m.group("stem"))]
+        entry["name"] = m.group("name")
+        if m.group("idx") is not None:
+            entry["frames"].append((int(m.group("idx")), f))
+        else:
+            entry["combined"] = f
+    roster = {}
+    for entry in stems.values():
+        paths = [f for _, f in sorted(entry["frames"])] or [entry["combined"]]
+        mtime = max(f.stat().st_mtime for f in paths)
+        if entry["name"] not in roster or mtime > roster[entry["name"]][0]:
+            roster[entry["name"]] = (mtime, paths)
+    return {name: paths for name, (_, paths) in sorted(roster.items())}
+
+
+def _work(item):
+    name, paths, out_dir = item
+    sheet_path = os.path.join(out_dir, f"{name}_walk_sheet.png")
+    try:
+        normalize_sheet(paths, sheet_path)
+        return name, sheet_path, None
+    except (OSError, ValueError) as e:
+        return name, sheet_path, str(e)
+
+
+def normalize_roster(roster, out_dir, jobs=1):
+    """Normalize every entry of {name: [raw files]}; returns [(name, sheet, error)]."""
+    items = [(name, paths, str(out_dir)) for name, paths in roster.items()]
+    if jobs <= 1 or len(items) <= 1:
+        return [_work(item) for item in items]
+    with Pool(min(jobs, len(items))) as pool:
+        return pool.map(_work, items)
+
+
+def main():
+    ap = argparse.ArgumentParser(description="Normalize raw walk outputs into 256x64 sheets")
+    ap.add_argument("raw", nargs="+", help="raw output files or directories")
+    ap.add_argument("--out", default=".", help="directory for *_walk_sheet.png")
+    ap.add_argument("--jobs", type=int, default=os.cpu_count() or 1)
+    args = ap.parse_args()
+    os.makedirs(args.out, exist_ok=True)
+
+    roster = group_raw(args.raw)
+    if not roster:
+        print("✗ no raw outputs found", flush=True)
+        return 1
+    print(f"NORMALIZE: {len(roster)} sheets, {args.jobs} jobs → {args.out}", flush=True)
+    failed = 0
+    for name, sheet, err in normalize_roster(roster, args.out, args.jobs):
+        if err:
+            failed += 1
+            print(f"  ✗ {name}: {err}", flush=True)
+        else:
+            print(f"  ✓ {name} → {sheet}", flush=True)
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,233 @@
+#!/usr/bin/env python3
+"""Trim, normalize and convert the game's SFX, and write a load manifest.
+
+Reads the sound tables from scripts/managers/audio_manager.gd (_sfx_paths,
+_music_paths) so the manifest always matches what the game plays.
+_sfx_paths names the processed clips, res://assets/audio/processed/<group>/;
+each is built from the original of the same name under
+assets/audio/source/<group>/. The originals are build inputs only: that
+directory has a .gdignore, so Godot neither imports nor exports them.
+
+Every SFX variant goes through the same chain:
+    - downmixed to mono and resampled to 44.1 kHz (linear interpolation)
+    - leading/trailing audio under SILENCE_DB trimmed, keeping a short pad
+      and a fade-out so the cut does not click
+    - peak-normalized to PEAK_DB
+    - written as 16-bit PCM to its _sfx_paths entry
+
+Music is left alone (Ogg Vorbis already streams); its duration and size
+are read from the Ogg headers.
+
+assets/audio/audio_manifest.json, read by AudioManager:
+
+    {"version", "format": {"rate", "channels", "bits"},
+     "sfx": {name: {"tier": "hot" | "lazy", "variants": [
+         {"path", "source" (repo-relative original), "hash", "duration",
+          "bytes", "source_bytes"}]}},
+     "music": {name: {"path", "duration", "bytes"}}}
+
+Combat sounds and anything shorter than HOT_MAX_SECONDS are "hot" and
+preloaded at startup; the rest (fanfares, long UI stings) load on first
+play. Variants whose source hash is unchanged are not re-encoded.
+
+The processed clips and the manifest are committed with the game: re-run
+after adding or replacing a sound.
+
+Usage: preprocess_audio.py [--dry-run] [--force] [--hot NAME ...]
+"""
+
+import argparse
+import hashlib
+import json
+import struct
+import wave
+from pathlib import Path
+
+import numpy as np
+
+import gd_data
+
+ROOT = Path(__file__).resolve().parent.parent
+AUDIO_GD = ROOT / "scripts" / "managers" / "audio_manager.gd"
+AUDIO_DIR = ROOT / "assets" / "audio"
+OUT_DIR = AUDIO_DIR / "processed"
+SOURCE_DIR = AUDIO_DIR / "source"
+MANIFEST = AUDIO_DIR / "audio_manifest.json"
+VERSION = 1
+RATE = 44100
+SILENCE_DB = -48.0
+PEAK_DB = -1.0
+PAD_S = 0.01       # kept before the first / after the last audible sample
+FADE_S = 0.02      # fade-out over the end of the kept tail
+HOT_MAX_SECONDS = 0.5
+HOT_GROUPS = {"combat"}
+
+
+def res_to_path(res):
+    return ROOT / res.replace("res://", "", 1)
+
+
+def source_of(out):
+    """The original a processed clip is built from: same group and name under SOURCE_DIR."""
+    return SOURCE_DIR / out.relative_to(OUT_DIR)
+
+
+def read_wav(path):
+    """(float32 samples shaped (frames, channels) in -1..1, sample rate)."""
+    with wave.open(str(path)) as w:
+        channels, width, rate = w.getnchannels(), w.getsampwidth(), w.getframerate()
+        raw = w.readframes(w.getnframes())
+    if width == 1:
+        data = (np.frombuffer(raw, np.uint8).astype(np.float32) - 128.0) / 128.0
+    elif width == 2:
+        data = np.frombuffer(raw, "<i2").astype(np.float32) / 32768.0
+    elif width == 3:
+        b = np.frombuffer(raw, np.uint8).reshape(-1, 3).astype(np.int32)
+        data = ((b[:, 0] | (b[:, 1] << 8) | (b[:, 2] << 16)) << 8 >> 8).astype(np.float32) / 8388608.0
+    elif width == 4:
+        data = np.frombuffer(raw, "<i4").astype(np.float32) / 2147483648.0
+    else:
+        raise ValueError(f"{path}: unsupported sample width {width}")
+    return data.reshape(-1, channels), rate
+
+
+def write_wav(path, mono):
+    path.parent.mkdir(parents=True, exist_ok=True)
+    pcm = np.round(np.clip(mono, -1.0, 1.0) * 32767.0).astype("<i2")
+    with wave.open(str(path), "wb") as w:
+        w.setnchannels(1)
+        w.setsampwidth(2)
+        w.setframerate(RATE)
+        w.writeframes(pcm.tobytes())
+
+
+def resample(x, rate):
+    if rate == RATE or len(x) < 2:
+        return x
+    n = max(1, int(round(len(x) * RATE / rate)))
+    return np.interp(np.arange(n) * (rate / RATE), np.arange(len(x)), x).astype(np.float32)
+
+
+def trim(x):
+    """Drop leading/trailing audio quieter than SILENCE_DB, keeping PAD_S and fading out the tail."""
+    loud = np.flatnonzero(np.abs(x) > 10 ** (SILENCE_DB / 20))
+    if len(loud) == 0:
+        return x[:0]
+    pad = int(PAD_S * RATE)
+    x = x[max(0, loud[0] - pad):loud[-1] + pad + 1].copy()
+    fade = min(len(x), int(FADE_S * RATE))
+    x[len(x) - fade:] *= np.linspace(1.0, 0.0, fade, dtype=np.float32)
+    return x
+
+
+def normalize(x):
+    peak = float(np.abs(x).max()) if len(x) else 0.0
+    return x * (10 ** (PEAK_DB / 20) / peak) if peak > 0 else x
+
+
+def process(src):
+    samples, rate = read_wav(src)
+    return normalize(trim(resample(samples.mean(axis=1), rate)))
+
+
+def ogg_info(path):
+    """(duration seconds, sample rate) from the Vorbis identification header and last page's granule."""
+    data = path.read_bytes()
+    ident = data.find(b"\x01vorbis")
+    if not data.startswith(b"OggS") or ident < 0:
+        raise ValueError(f"{path}: not Ogg Vorbis")
+    rate = struct.unpack_from("<I", data, ident + 12)[0]
+    granule = struct.unpack_from("<q", data, data.rfind(b"OggS") + 6)[0]
+    return granule / rate, rate
+
+
+def file_hash(path):
+    h = hashlib.sha256(f"v{VERSION} {RATE} {SILENCE_DB} {PEAK_DB} {PAD_S} {FADE_S}".encode())
+    h.update(path.read_bytes())
+    return h.hexdigest()[:16]
+
+
+def load_manifest():
+    try:
+        data = json.loads(MANIFEST.read_text())
+    except (OSError, ValueError):
+        return {}
+    return data if data.get("version") == VERSION else {}
+
+
+def previous_variants(manifest):
+    """{source path: variant entry} from an earlier run."""
+    return {v["source"]: v for s in manifest.get("sfx", {}).values() for v in s["variants"]}
+
+
+def main():
+    ap = argparse.ArgumentParser(description="Trim/normalize SFX and write the audio manifest")
+    ap.add_argument("--dry-run", action="store_true", help="report savings, write nothing")
+    ap.add_argument("--force", action="store_true", help="re-encode even if the source is unchanged")
+    ap.add_argument("--hot", nargs="*", default=[], help="extra sound names to preload")
+    args = ap.parse_args()
+
+    source = AUDIO_GD.read_text()
+    sfx_paths = gd_data.parse_var(source, "_sfx_paths")
+    music_paths = gd_data.parse_var(source, "_music_paths")
+    previous = {} if args.force else previous_variants(load_manifest())
+    print(f"AUDIO: {sum(map(len, sfx_paths.values()))} SFX variants, {len(music_paths)} music tracks", flush=True)
+
+    sfx, before, after, encoded = {}, 0, 0, 0
+    for name, paths in sfx_paths.items():
+        variants = []
+        for res in paths:
+            out = res_to_path(res)
+            if not out.is_relative_to(OUT_DIR):
+                print(f"  ✗ {res} is not under {OUT_DIR.relative_to(ROOT)}", flush=True)
+                continue
+            src = source_of(out)
+            source = src.relative_to(ROOT).as_posix()
+            if not src.exists():
+                print(f"  ✗ {source} missing (source of {res})", flush=True)
+                continue
+            digest = file_hash(src)
+            entry = previous.get(source)
+            if not (entry and entry["hash"] == digest and out.exists()) or args.dry_run:
+                mono = process(src)
+                if not args.dry_run:
+                    write_wav(out, mono)
+                encoded += 1
+                entry = {"path": res, "source": source, "hash": digest,
+                         "duration": round(len(mono) / RATE, 3),
+                         "bytes": 44 + len(mono) * 2, "source_bytes": src.stat().st_size}
+            variants.append(entry)
+            before += entry["source_bytes"]
+            after += entry["bytes"]
+        if not variants:
+            continue
+        hot = (name in args.hot or any(Path(v["source"]).parent.name in HOT_GROUPS for v in variants)
+               or max(v["duration"] for v in variants) <= HOT_MAX_SECONDS)
+        sfx[name] = {"tier": "hot" if hot else "lazy", "variants": variants}
+        total = sum(v["bytes"] for v in variants)
+        print(f"  {'◆' if hot else '→'} {name:18s} {sfx[name]['tier']:4s} "
+              f"{max(v['duration'] for v in variants):6.2f}s {total // 1024:5d}KB", flush=True)
+
+    music = {}
+    for name, res in music_paths.items():
+        path = res_to_path(res)
+        if not path.exists():
+            print(f"  ✗ {res} missing", flush=True)
+            continue
+        duration, _ = ogg_info(path)
+        music[name] = {"path": res, "duration": round(duration, 2), "bytes": path.stat().st_size}
+        print(f"  → {name:18s} strm {duration:6.2f}s {music[name]['bytes'] // 1024:5d}KB", flush=True)
+
+    hot_kb = sum(v["bytes"] for s in sfx.values() if s["tier"] == "hot" for v in s["variants"]) // 1024
+    print(f"  SFX {before // 1024}KB → {after // 1024}KB ({encoded} encoded), hot set {hot_kb}KB", flush=True)
+    if args.dry_run:
+        return 0
+    MANIFEST.write_text(json.dumps({
+        "version": VERSION, "format": {"rate": RATE, "channels": 1, "bits": 16},
+        "sfx": sfx, "music": music}, indent=1) + "\n")
+    print(f"  ✓ {MANIFEST.relative_to(ROOT)}", flush=True)
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
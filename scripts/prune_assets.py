@@ -0,0 +1,271 @@
+#!/usr/bin/env python3
+"""Find unreferenced and near-duplicate assets, and quarantine the unreferenced ones.
+
+Every file under assets/ (minus .import sidecars and directories with a
+.gdignore, which Godot does not import) is checked against the
+res:// references in the project's scripts, scenes and data:
+    - literal paths in .gd, .tscn, .tres, .gdshader, project.godot, *.cfg
+      and the JSON under assets/ (atlas.json, the audio manifest, ...)
+    - format strings: "res://assets/sprites/towers/%s.png" % type matches
+      every file the pattern could produce
+    - path constants: const DECO_PATH = "res://.../" used as
+      DECO_PATH + "gem.png" references that file; used any other way (or a
+      literal followed by `+ name`) it references the whole prefix
+Files matching KEEP always count as referenced: palette strips and index
+maps assigned to materials in the editor, the death effect frames and
+terrain tiles kept as source art, and every output asset_build.py declares
+for its ROSTER (the <name>_enemy.png statics, which validate_walks.py
+also reads).
+
+Images are also hashed (256-bit difference hash of the alpha-composited
+greyscale image) and grouped when their hashes differ in at most
+--threshold bits and share an aspect ratio, which catches backups,
+re-exports and old/ copies that are identical to the eye.
+
+Reported savings are the source file, its .import sidecar and the
+imported copies it lists under .godot/imported. --quarantine moves the
+unreferenced files (with their sidecars) to .asset_quarantine/, which Godot
+does not scan; --restore moves them back.
+
+Usage: prune_assets.py [--quarantine | --restore] [--threshold 12] [--keep GLOB ...] [--json OUT]
+"""
+
+import argparse
+import fnmatch
+import json
+import re
+import shutil
+from pathlib import Path
+
+import numpy as np
+from PIL import Image
+
+from asset_build import ENEMIES_DIR, ROSTER
+
+ROOT = Path(__file__).resolve().parent.parent
+ASSETS = ROOT / "assets"
+QUARANTINE = ROOT / ".asset_quarantine"
+QUARANTINE_LOG = QUARANTINE / "quarantine.json"
+SOURCE_GLOBS = ["**/*.gd", "**/*.tscn", "**/*.tres", "**/*.gdshader", "project.godot", "**/*.cfg",
+                "assets/**/*.json"]
+SKIP_DIRS = {".godot", ".git", ".asset_build", ".asset_quarantine", "__pycache__"}
+IMAGE_EXTS = {".png", ".jpg", ".jpeg", ".webp", ".bmp"}
+NOT_RESOURCES = {".md", ".txt", ".import"}  # docs and sidecars are never exported as resources
+HASH_SIZE = 16      # 256-bit hash; 8x8 lumps dark walk sheets of different enemies together
+MIN_HASH_SIZE = 8
+KEEP = ["*_palette.png", "*_palette_*.png", "*_imap.png", "death_frame_*.png",
+        "res://assets/sprites/terrain/*.png"]
+
+LITERAL_RE = re.compile(r'"(res://[^"]*)"(\s*\+)?')
+CONST_RE = re.compile(r'^\s*(?:const|var)\s+(\w+)\s*(?::\s*\w+\s*)?:?=\s*"(res://[^"]*)"', re.MULTILINE)
+FORMAT_RE = re.compile(r"%[-+ 0-9.]*[sdifxXcv]")
+
+
+def res_path(path):
+    return "res://" + path.relative_to(ROOT).as_posix()
+
+
+def to_glob(res):
+    """A res:// string with format placeholders → fnmatch pattern."""
+    return FORMAT_RE.sub("*", res.replace("*", "[*]")).replace("%%", "%")
+
+
+def source_files():
+    for pattern in SOURCE_GLOBS:
+        for path in sorted(ROOT.glob(pattern)):
+            if path.is_file() and not SKIP_DIRS.intersection(path.relative_to(ROOT).parts):
+                yield path
+
+
+def references(text):
+    """res:// patterns referenced by one source file."""
+    refs = set()
+    consts = dict(CONST_RE.findall(text))
+    defined = {m.start(2) - 1 for m in CONST_RE.finditer(text)}
+    for m in LITERAL_RE.finditer(text):
+        if m.start() in defined:
+            continue
+        refs.add(m.group(1) + ("*" if m.group(2) else ""))
+    for name, value in consts.items():
+        for use in re.finditer(rf"(?<![\w.])(?:\w+\.)?{name}\b(?!\s*(?::\s*\w+\s*)?:?=)", text):
+            tail = re.match(r'\s*\+\s*"([^"]*)"(\s*\+)?', text[use.end():])
+            if tail:
+                refs.add(value + tail.group(1) + ("*" if tail.group(2) else ""))
+            else:
+                refs.add(value + "*" if value.endswith("/") else value)
+    return {to_glob(r) for r in refs}
+
+
+def collect_references():
+    patterns, literal = set(), set()
+    for path in source_files():
+        try:
+            found = references(path.read_text(errors="replace"))
+        except OSError:
+            continue
+        patterns |= found
+        literal |= {p for p in found if not any(c in p for c in "*?[")}
+    return patterns, literal
+
+
+def asset_files():
+    # Directories with a .gdignore (e.g. assets/audio/source/) hold build inputs Godot never imports
+    ignored = [d.parent for d in ASSETS.rglob(".gdignore")]
+    return sorted(p for p in ASSETS.rglob("*")
+                  if p.is_file() and p.suffix.lower() not in NOT_RESOURCES and not p.name.startswith(".")
+                  and not any(p.is_relative_to(d) for d in ignored))
+
+
+def import_outputs(path):
+    """The .import sidecar plus the imported copies it lists (dest_files)."""
+    sidecar = path.with_name(path.name + ".import")
+    if not sidecar.exists():
+        return []
+    files = [sidecar]
+    m = re.search(r"dest_files=\[([^\]]*)\]", sidecar.read_text(errors="replace"))
+    for res in re.findall(r'"(res://[^"]*)"', m.group(1) if m else ""):
+        dest = ROOT / res.replace("res://", "", 1)
+        if dest.exists():
+            files.append(dest)
+    return files
+
+
+def footprint(path):
+    return path.stat().st_size + sum(f.stat().st_size for f in import_outputs(path))
+
+
+def dhash(path):
+    """HASH_SIZE² bit difference hash; transparent pixels count as black."""
+    with Image.open(path) as img:
+        img = img.convert("RGBA")
+        flat = Image.new("RGBA", img.size, (0, 0, 0, 255))
+        flat.alpha_composite(img)
+        grey = np.asarray(flat.convert("L").resize((HASH_SIZE + 1, HASH_SIZE), Image.LANCZOS), dtype=np.int16)
+    return (grey[:, 1:] > grey[:, :-1]).ravel()
+
+
+def duplicate_groups(paths, threshold):
+    """Groups of same-aspect images whose hashes are all within threshold bits of each other."""
+    hashed = []
+    for path in paths:
+        try:
+            with Image.open(path) as img:
+                size = img.size
+            if min(size) < MIN_HASH_SIZE:
+                continue  # palette strips and the like: nothing to compare
+            hashed.append((path, round(size[0] / size[1], 2), dhash(path)))
+        except (OSError, ValueError) as e:
+            print(f"  ⚠ {path.relative_to(ROOT)}: cannot hash ({e})", flush=True)
+    if len(hashed) < 2:
+        return []
+    bits = np.array([h for _, _, h in hashed], dtype=np.int32)
+    dist = bits @ (1 - bits).T + (1 - bits) @ bits.T
+    close = (dist <= threshold) & (np.array([a for _, a, _ in hashed])[:, None] == [a for _, a, _ in hashed])
+    groups, placed = [], set()
+    for i in range(len(hashed)):
+        if i in placed:
+            continue
+        group = [i]
+        for j in range(i + 1, len(hashed)):
+            if j not in placed and close[j, group].all():
+                group.append(j)
+        if len(group) > 1:
+            placed.update(group)
+            groups.append(([hashed[k][0] for k in group], int(dist[np.ix_(group, group)].max())))
+    return groups
+
+
+def quarantine(paths):
+    log = json.loads(QUARANTINE_LOG.read_text()) if QUARANTINE_LOG.exists() else []
+    QUARANTINE.mkdir(exist_ok=True)
+    (QUARANTINE / ".gdignore").touch()
+    for path in paths:
+        for src in [path] + import_outputs(path)[:1]:
+            rel = src.relative_to(ROOT).as_posix()
+            dest = QUARANTINE / rel
+            dest.parent.mkdir(parents=True, exist_ok=True)
+            shutil.move(src, dest)
+            log.append(rel)
+    QUARANTINE_LOG.write_text(json.dumps(sorted(set(log)), indent=1))
+    print(f"  ✓ moved {len(paths)} assets to {QUARANTINE.name}/ (restore with --restore)", flush=True)
+
+
+def restore():
+    if not QUARANTINE_LOG.exists():
+        print("Nothing quarantined", flush=True)
+        return 0
+    restored = 0
+    for rel in json.loads(QUARANTINE_LOG.read_text()):
+        src, dest = QUARANTINE / rel, ROOT / rel
+        if not src.exists():
+            continue
+        if dest.exists():
+            print(f"  ⚠ {rel} exists again, left in quarantine", flush=True)
+            continue
+        dest.parent.mkdir(parents=True, exist_ok=True)
+        shutil.move(src, dest)
+        restored += 1
+    left = [rel for rel in json.loads(QUARANTINE_LOG.read_text()) if (QUARANTINE / rel).exists()]
+    QUARANTINE_LOG.write_text(json.dumps(left, indent=1))
+    print(f"  ✓ restored {restored} files, {len(left)} still quarantined", flush=True)
+    return 0
+
+
+def main():
+    ap = argparse.ArgumentParser(description="Report/quarantine unreferenced and duplicate assets")
+    mode = ap.add_mutually_exclusive_group()
+    mode.add_argument("--quarantine", action="store_true", help="move unreferenced assets out of the project")
+    mode.add_argument("--restore", action="store_true", help="move quarantined assets back")
+    ap.add_argument("--threshold", type=int, default=12, help="max differing hash bits (of 256) for near-duplicates")
+    ap.add_argument("--keep", nargs="*", default=[], help="extra globs (res:// paths) to treat as referenced")
+    ap.add_argument("--json", help="write the report here")
+    args = ap.parse_args()
+    if args.restore:
+        return restore()
+
+    patterns, literal = collect_references()
+    keep = KEEP + [res_path(ENEMIES_DIR / f"{name}_enemy.png") for name in ROSTER] + args.keep
+    files = asset_files()
+    res = {p: res_path(p) for p in files}
+    used = {p for p in files if any(fnmatch.fnmatchcase(res[p], pat) for pat in patterns)
+            or any(fnmatch.fnmatchcase(p.name, k) or fnmatch.fnmatchcase(res[p], k) for k in keep)}
+    unused = [p for p in files if p not in used]
+    sizes = {p: footprint(p) for p in files}
+    missing = sorted(r for r in literal if r.startswith("res://assets/") and not r.endswith("/")
+                     and not (ROOT / r.replace("res://", "", 1)).exists())
+    print(f"ASSETS: {len(files)} files, {len(used)} referenced ({len(patterns)} reference patterns), "
+          f"{len(unused)} unreferenced", flush=True)
+
+    by_dir = {}
+    for p in unused:
+        by_dir.setdefault(p.parent, []).append(p)
+    for folder, group in sorted(by_dir.items()):
+        print(f"  ◆ {folder.relative_to(ROOT)}/  {sum(sizes[p] for p in group) // 1024}KB", flush=True)
+        for p in group:
+            print(f"      {p.name:40s} {sizes[p] // 1024:6d}KB", flush=True)
+    for r in missing:
+        print(f"  ⚠ referenced but missing: {r}", flush=True)
+
+    dupes = duplicate_groups([p for p in files if p.suffix.lower() in IMAGE_EXTS], args.threshold)
+    print(f"DUPLICATES: {len(dupes)} groups within {args.threshold} bits", flush=True)
+    for group, dist in sorted(dupes, key=lambda g: res[g[0][0]]):
+        marks = ", ".join(f"{p.relative_to(ASSETS)}{'' if p in used else ' (unused)'}" for p in group)
+        print(f"  → d≤{dist}: {marks}", flush=True)
+
+    saved = sum(sizes[p] for p in unused)
+    print(f"  {'✓' if not unused else '→'} unreferenced assets: {saved / 1024:.0f}KB "
+          f"incl. .import sidecars and imported copies", flush=True)
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump({"unreferenced": [{"path": res[p], "bytes": sizes[p]} for p in unused],
+                       "missing": missing, "bytes": saved,
+                       "duplicates": [{"paths": [res[p] for p in g], "distance": d,
+                                       "unused": [res[p] for p in g if p not in used]} for g, d in dupes]},
+                      f, indent=1)
+    if args.quarantine and unused:
+        quarantine(unused)
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
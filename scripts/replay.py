@@ -0,0 +1,284 @@
+#!/usr/bin/env python3
+"""Read and verify run replays recorded by the game (ReplayRecorder, *.hmr).
+
+Format (little-endian):
+    header  "HMRP", u8 version, u8 level, u16 tick rate, u32 unix start time
+    events  varint((ticks since previous event << 3) | kind), then varints:
+            0 WAVE     wave number
+            1 PLACE    tower type index (tower_data order), anchor x, anchor y
+            2 UPGRADE  anchor x, anchor y, path index (upgrade_data order), new level
+            3 SELL     anchor x, anchor y
+            4 END      won, lives, kills, gold earned, score, waves completed
+
+verify turns each replay into a wave_sim build and re-simulates it headless,
+all replays of a level in one batch. A tower placed during a wave fights
+from its event's tick, counted from that wave's WAVE event; one placed
+before the first wave fights from wave 1. Where the sim can only place
+an action at a wave boundary, the timing goes the player's way:
+
+    UPGRADE  a new build entry from the upgrade's tick; the old entry keeps
+             fighting to the end of the wave (folded into the tower if it
+             was placed in the same wave)
+    SELL     the tower fights to the end of the wave; the game's
+             half-value refund arrives at the next wave start
+
+Every entry was paid for in the game, so none waits for the sim's gold.
+A replay passes when the simulated outcome matches the claimed END record:
+same win/loss, lives within --lives-tolerance, or the same losing wave
+within one. A replay that fails, but passes once every mid-wave tower is
+counted from its wave's start, depends on timing the sim cannot pin down.
+It is reported as unverifiable (⚠) rather than failed. The claimed kills,
+gold and score must also be ones the run could have earned:
+    kills   at most the enemies spawned in the waves played, minus the
+            simulated leaks (less --lives-tolerance)
+    gold    at most every spawned enemy's reward, the wave bonuses and
+            the gold mines' income
+    score   at most lives x 100 + kills x 10 + 300 (GameManager's
+            _calculate_score, full time bonus), from the checked lives
+            and kills
+
+Exit status is 1 if any replay fails (unverifiable ones do not), so a
+replay corpus works as a balance regression check
+(git bisect run python3 scripts/replay.py verify DIR).
+
+Usage: replay.py dump FILE...
+       replay.py verify FILE|DIR... [--lives-tolerance 3] [--json OUT]
+"""
+
+import argparse
+import json
+import struct
+import sys
+import time
+from pathlib import Path
+
+import numpy as np
+
+from compile_waves import timeline
+from wave_sim import STATS, START_LIVES, GameData, simulate, tower_row
+
+MAGIC = b"HMRP"
+VERSION = 1
+HEADER = struct.Struct("<4sBBHI")
+WAVE, PLACE, UPGRADE, SELL, END = range(5)
+KINDS = ["WAVE", "PLACE", "UPGRADE", "SELL", "END"]
+PAYLOAD = {WAVE: 1, PLACE: 3, UPGRADE: 4, SELL: 2, END: 6}
+END_FIELDS = ["won", "lives", "kills", "gold", "score", "waves"]
+
+
+class ReplayError(ValueError):
+    pass
+
+
+def _varints(data, pos):
+    """Yield (value, next offset) for consecutive LEB128 varints."""
+    while pos < len(data):
+        value = shift = 0
+        while True:
+            if pos >= len(data):
+                raise ReplayError("truncated varint")
+            byte = data[pos]
+            pos += 1
+            value |= (byte & 0x7F) << shift
+            shift += 7
+            if byte < 0x80:
+                break
+        yield value, pos
+
+
+def read_replay(path):
+    data = Path(path).read_bytes()
+    if len(data) < HEADER.size:
+        raise ReplayError("too short")
+    magic, version, level, tick_rate, started = HEADER.unpack_from(data)
+    if magic != MAGIC:
+        raise ReplayError("not a replay")
+    if version != VERSION:
+        raise ReplayError(f"version {version}, expected {VERSION}")
+    values = _varints(data, HEADER.size)
+    events, end, tick = [], None, 0
+    for head, _ in values:
+        kind = head & 7
+        if kind not in PAYLOAD:
+            raise ReplayError(f"unknown event kind {kind}")
+        tick += head >> 3
+        try:
+            payload = [next(values)[0] for _ in range(PAYLOAD[kind])]
+        except StopIteration:
+            raise ReplayError(f"truncated {KINDS[kind]} event")
+        events.append((tick, kind, payload))
+        if kind == END:
+            end = dict(zip(END_FIELDS, payload))
+    return {"path": str(path), "level": level, "tick_rate": tick_rate, "started": started,
+            "events": events, "end": end, "bytes": len(data)}
+
+
+def to_build(replay, data):
+    """wave_sim build entries for a replay's placements, upgrades and sells."""
+    types = list(data.towers)
+    rows, towers, wave, wave_tick = [], {}, 0, 0
+    for tick, kind, p in replay["events"]:
+        # Before the first wave, actions count from wave 1's start
+        when = {"wave": wave, "at": (tick - wave_tick) / replay["tick_rate"]} if wave else {"wave": 1}
+        if kind == WAVE:
+            wave, wave_tick = p[0], tick
+        elif kind == PLACE:
+            if p[0] >= len(types):
+                raise ReplayError(f"unknown tower type index {p[0]}")
+            cost = data.towers[types[p[0]]]["cost"]
+            rows.append({"type": types[p[0]], "anchor": p[1:3], "upgrades": {}, "cost": cost, "placed": True,
+                         **when})
+            towers[tuple(p[1:3])] = {"row": len(rows) - 1, "value": cost}
+        elif kind == UPGRADE:
+            tower = towers.get(tuple(p[:2]))
+            if tower is None:
+                raise ReplayError(f"upgrade of missing tower at {p[:2]}")
+            row = rows[tower["row"]]
+            paths = list(data.upgrades[row["type"]])
+            path, level = paths[p[2]], p[3]
+            cost = data.upgrades[row["type"]][path]["upgrades"][level - 1]["cost"]
+            upgrades = dict(row["upgrades"], **{path: level})
+            tower["value"] += cost
+            if row["wave"] == when["wave"]:  # placed this wave: upgraded from the start
+                row["upgrades"], row["cost"] = upgrades, row["cost"] + cost
+            else:
+                row["until"] = when["wave"] + 1
+                rows.append(dict(row, upgrades=upgrades, cost=cost, until=np.inf, **when))
+                tower["row"] = len(rows) - 1
+        elif kind == SELL:
+            tower = towers.pop(tuple(p[:2]), None)
+            if tower is None:
+                raise ReplayError(f"sell of missing tower at {p[:2]}")
+            rows[tower["row"]].update(until=when["wave"] + (1 if wave else 0), refund=tower["value"] // 2)
+    return rows
+
+
+def wave_start_build(build):
+    """The build with every mid-wave entry counted from its wave's start."""
+    return [{k: v for k, v in row.items() if k != "at"} for row in build]
+
+
+def dump(paths):
+    for path in paths:
+        r = read_replay(path)
+        stamp = time.strftime("%Y-%m-%d %H:%M", time.localtime(r["started"]))
+        print(f"{path}: level {r['level']}, {len(r['events'])} events, {r['bytes']}B, recorded {stamp}")
+        for tick, kind, payload in r["events"]:
+            print(f"  {tick / r['tick_rate']:8.2f}s  {KINDS[kind]:8s} {payload}")
+    return 0
+
+
+def replay_files(paths):
+    for p in map(Path, paths):
+        yield from sorted(p.glob("*.hmr")) if p.is_dir() else [p]
+
+
+def sim_outcome(leaks_row):
+    """(lives left, waves survived) from one sim's per-wave leaks."""
+    lost = np.cumsum(leaks_row) >= START_LIVES
+    waves = int(np.argmax(lost)) + 1 if lost.any() else len(leaks_row)
+    return max(0, START_LIVES - int(leaks_row.sum())), waves
+
+
+def claim_limits(data, level, build, waves, leaks, tolerance):
+    """Most kills and gold a run that reached `waves` could have, given the sim's leaks."""
+    played = data.levels[level]["waves"][:waves]
+    enemies = [data.enemies.get(t, data.enemies["imp"]) for g in played for t in timeline(g)[1]]
+    kills = len(enemies) - max(0, int(leaks[:len(played)].sum()) - tolerance)
+    gold = sum(e["reward"] for e in enemies) + sum(25 + 5 * w for w in range(1, len(played) + 1))
+    for row in build:  # mine income at each wave start the entry was standing for
+        per_wave = tower_row(data, row)[STATS.index("gold")]
+        gold += per_wave * sum(1 for w in range(1, len(played) + 1) if row["wave"] <= w < row.get("until", np.inf))
+    return kills, gold
+
+
+def check(data, level, claim, build, leaks, tolerance):
+    """Compare a claimed END record with one sim's per-wave leaks."""
+    lives, waves = sim_outcome(leaks)
+    won = lives > 0
+    if claim["won"]:
+        good = won and abs(lives - claim["lives"]) <= tolerance
+    else:
+        good = not won and abs(waves - claim["waves"]) <= 1
+    max_kills, max_gold = claim_limits(data, level, build, claim["waves"], leaks, tolerance)
+    max_score = (min(claim["lives"], lives + tolerance) * 100 + min(claim["kills"], max_kills) * 10 + 300)
+    inflated = [f"{name} {claim[name]} > {limit}" for name, limit in
+                (("kills", max_kills), ("gold", max_gold), ("score", max_score)) if claim[name] > limit]
+    good = bool(good and not inflated)
+    return {"good": good, "status": "ok" if good else "failed", "inflated": inflated,
+            "sim": {"won": won, "lives": lives, "waves": waves},
+            "limits": {"kills": max_kills, "gold": max_gold, "score": max_score}}
+
+
+def verify(paths, tolerance, out):
+    data = GameData()
+    by_level, results, ok = {}, [], True
+    for path in replay_files(paths):
+        try:
+            r = read_replay(path)
+            if r["end"] is None:
+                print(f"  ⚠ {path}: no END record (unfinished run), skipped", flush=True)
+                continue
+            by_level.setdefault(r["level"], []).append((r, to_build(r, data)))
+        except (OSError, ReplayError, KeyError, IndexError) as e:
+            print(f"  ✗ {path}: {e}", flush=True)
+            results.append({"path": str(path), "ok": False, "error": str(e)})
+            ok = False
+    total = sum(len(v) for v in by_level.values())
+    print(f"REPLAYS: {total} to verify over {len(by_level)} levels", flush=True)
+
+    for level, batch in sorted(by_level.items()):
+        if level not in data.levels:
+            print(f"  ✗ level {level}: not in level_data.gd", flush=True)
+            ok = False
+            continue
+        start = time.perf_counter()
+        res = simulate(data, level, [build for _, build in batch])
+        elapsed = time.perf_counter() - start
+        played = sum(r["events"][-1][0] / r["tick_rate"] for r, _ in batch)
+        print(f"  level {level}: {len(batch)} replays in {elapsed:.2f}s "
+              f"({played / max(elapsed, 1e-9):.0f}x real time)", flush=True)
+        checks = [check(data, level, r["end"], build, res["leaks"][i], tolerance) for i, (r, build) in enumerate(batch)]
+        # Failures that pass with every mid-wave tower counted from its wave's start hinge on timing
+        retry = [i for i, (c, (_, build)) in enumerate(zip(checks, batch))
+                 if not c["good"] and any("at" in row for row in build)]
+        if retry:
+            alt = simulate(data, level, [wave_start_build(batch[i][1]) for i in retry])
+            for j, i in enumerate(retry):
+                if check(data, level, batch[i][0]["end"], batch[i][1], alt["leaks"][j], tolerance)["good"]:
+                    checks[i]["status"] = "unverifiable"
+        for (r, _), c in zip(batch, checks):
+            claim, sim = r["end"], c["sim"]
+            ok &= c["status"] != "failed"
+            mark = {"ok": "✓", "unverifiable": "⚠"}.get(c["status"], "✗")
+            print(f"    {mark} {Path(r['path']).name}: claimed "
+                  f"{'win' if claim['won'] else 'loss'} lives {claim['lives']} wave {claim['waves']} "
+                  f"kills {claim['kills']} score {claim['score']} — sim {'win' if sim['won'] else 'loss'} "
+                  f"lives {sim['lives']} wave {sim['waves']}" + "".join(f", {x}" for x in c["inflated"])
+                  + (" (unverifiable: passes only with mid-wave towers from the wave start)"
+                     if c["status"] == "unverifiable" else ""), flush=True)
+            results.append({"path": r["path"], "ok": c["status"] != "failed", "status": c["status"],
+                            "level": level, "claimed": claim, "sim": sim, "limits": c["limits"]})
+    if out:
+        with open(out, "w") as f:
+            json.dump(results, f, indent=1)
+    return 0 if ok else 1
+
+
+def main():
+    ap = argparse.ArgumentParser(description="Read and verify run replays")
+    sub = ap.add_subparsers(dest="cmd", required=True)
+    d = sub.add_parser("dump", help="print a replay's events")
+    d.add_argument("files", nargs="+")
+    v = sub.add_parser("verify", help="re-simulate replays and check their claimed result")
+    v.add_argument("files", nargs="+", help="replay files or directories of *.hmr")
+    v.add_argument("--lives-tolerance", type=int, default=3)
+    v.add_argument("--json", help="write per-replay results here")
+    args = ap.parse_args()
+    if args.cmd == "dump":
+        return dump(args.files)
+    return verify(args.files, args.lives_tolerance, args.json)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,318 @@
+#!/usr/bin/env python3
+"""Concurrent job scheduler for the sprite generators.
+
+Runs generation jobs (e.g. static → walk chains) on a bounded thread pool.
+Backend calls made through mcp() are paced by an adaptive token bucket, which
+only slows down on rate-limit responses, and retried with exponential
+backoff on timeouts and "Error" responses.
+
+Calls go to a gen_worker.WorkerPool when one is given, otherwise through
+one `npx mcporter call` per request. mcp_frames() gets the images back
+in memory instead of leaving them at save_to_file. Point MCPORTER (or GEN_WORKER, see
+gen_worker.py) at a local fake to exercise the whole pipeline offline:
+    MCPORTER="python3 scripts/fake_pixellab.py" python3 scripts/generate_demons_v2.py --cli
+"""
+
+import os
+import random
+import subprocess
+import threading
+import time
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+
+from gen_cache import output_files, output_path
+from gen_worker import RETRYABLE
+
+MCPORTER = os.environ.get("MCPORTER", "npx mcporter")
+RATE_LIMIT_HINTS = ("rate limit", "too many requests", "429")
+
+# Bucket of the scheduler running the current job; mcp() paces remote calls with it
+_local = threading.local()
+
+
+def _pace():
+    bucket = getattr(_local, "bucket", None)
+    if bucket:
+        bucket.acquire()
+
+
+class GenerationError(Exception):
+    """A backend call failed. Retryable errors are retried with backoff."""
+
+    def __init__(self, message, retryable=True, rate_limited=False):
+        super().__init__(message)
+        self.retryable = retryable
+        self.rate_limited = rate_limited
+
+
+def mcp(call_str, timeout=120, cwd=None, cache=None, pool=None):
+    """Execute an MCP call. Returns the output files, raises GenerationError.
+
+    With a WorkerPool the call is sent to a persistent worker; otherwise
+    mcporter is spawned for it. With a GenCache, unchanged calls are
+    restored from the cache and fresh outputs are stored after success.
+    """
+    save_path = output_path(call_str)
+    key = cache.key(call_str) if cache and save_path else None
+    if key and cache.restore(key, save_path):
+        print(f"  ◆ cache hit {key[:12]} → {save_path}", flush=True)
+        return output_files(save_path)
+    if save_path:
+        # Stale frames from an earlier run must not pass for fresh output
+        for path in output_files(save_path):
+            os.remove(path)
+    _pace()
+    print(f"  → {call_str[:100]}...", flush=True)
+    if pool:
+        files = _pool_call(pool, call_str, timeout)
+    else:
+        _cli_call(call_str, timeout, cwd)
+        files = output_files(save_path) if save_path else []
+    if key:
+        cache.store(key, save_path)
+    return files
+
+
+def mcp_frames(call_str, timeout=120, cwd=None, cache=None, pool=None, on_frame=None):
+    """Execute an MCP call and return its images as [(file name, png bytes)].
+
+    With a WorkerPool the images come back inline: on_frame(name, png_bytes)
+    runs for each as the worker sends it (all at once when the call
+    finishes, see gen_worker.mjs) and nothing is written to disk. Without a pool this falls back to
+    mcporter and reads the files it wrote. Cache hits are replayed through
+    on_frame the same way.
+    """
+    save_path = output_path(call_str)
+    key = cache.key(call_str) if cache and save_path else None
+    blobs = cache.load(key, save_path) if key else None
+    if blobs is not None:
+        print(f"  ◆ cache hit {key[:12]} → memory", flush=True)
+        for name, data in blobs:
+            if on_frame:
+                on_frame(name, data)
+        return blobs
+    if not pool:
+        blobs = []
+        for path in mcp(call_str, timeout, cwd):
+            with open(path, "rb") as f:
+                blobs.append((os.path.basename(path), f.read()))
+            if on_frame:
+                on_frame(*blobs[-1])
+    else:
+        _pace()
+        print(f"  ⇢ {call_str[:100]}...", flush=True)
+        blobs = []
+
+        def got(index, name, data):
+            blobs.append((name or f"frame{index}.png", data))
+            if on_frame:
+                on_frame(*blobs[-1])
+
+        _pool_call(pool, call_str, timeout, got)
+    if key:
+        cache.store_blobs(key, save_path, blobs)
+    return blobs
+
+
+def _pool_call(pool, call_str, timeout, on_frame=None):
+    resp = pool.call(call_str, timeout, on_frame)
+    if not resp.get("ok"):
+        err = resp.get("error") or {}
+        code = err.get("code", "backend")
+        raise GenerationError(f"{code}: {err.get('message', '')}"[:200],
+                              retryable=code in RETRYABLE, rate_limited=code == "rate_limited")
+    return [f["path"] for f in resp.get("files", [])]
+
+
+def _cli_call(call_str, timeout, cwd):
+    cmd = f"{MCPORTER} call '{call_str}'"
+    if cwd and not os.path.isdir(cwd):
+        cwd = None
+    try:
+        r = subprocess.run(cmd, shell=True, capture_output=True, text=True, timeout=timeout, cwd=cwd)
+    except subprocess.TimeoutExpired:
+        raise GenerationError(f"timeout after {timeout}s")
+    out = r.stdout + r.stderr
+    if r.returncode != 0 or "Error" in out[:500]:
+        limited = any(h in out.lower() for h in RATE_LIMIT_HINTS)
+        raise GenerationError(out[:200].strip() or f"exit code {r.returncode}", rate_limited=limited)
+    return out
+
+
+class TokenBucket:
+    """Thread-safe token bucket with AIMD rate adaptation.
+
+    Rate-limited calls halve the refill rate (down to min_rate); each success
+    adds back a tenth of the configured rate until it is restored.
+    """
+
+    def __init__(self, rate, burst=1, min_rate=0.05):
+        self.max_rate = float(rate)
+        self.rate = float(rate)
+        self.min_rate = min_rate
+        self.burst = burst
+        self.tokens = float(burst)
+        self._stamp = time.monotonic()
+        self._lock = threading.Lock()
+
+    def _refill(self):
+        now = time.monotonic()
+        self.tokens = min(self.burst, self.tokens + (now - self._stamp) * self.rate)
+        self._stamp = now
+
+    def acquire(self):
+        while True:
+            with self._lock:
+                self._refill()
+                if self.tokens >= 1.0:
+                    self.tokens -= 1.0
+                    return
+                wait_s = (1.0 - self.tokens) / self.rate
+            time.sleep(wait_s)
+
+    def slow_down(self):
+        with self._lock:
+            self._refill()
+            self.rate = max(self.min_rate, self.rate / 2.0)
+            self.tokens = min(self.tokens, 0.0)
+
+    def speed_up(self):
+        with self._lock:
+            self._refill()
+            self.rate = min(self.max_rate, self.rate + self.max_rate * 0.1)
+
+
+class Job:
+    """One unit of work. fn receives the results of its deps, in order."""
+
+    def __init__(self, name, fn, deps=(), fallback=None):
+        self.name = name
+        self.fn = fn
+        self.deps = tuple(deps)
+        self.fallback = fallback
+        self.status = "pending"  # pending → running → ok | fallback | failed | skipped
+        self.attempts = 0
+        self.result = None
+        self.error = None
+        self.elapsed = 0.0
+
+
+class Scheduler:
+    """Runs jobs with bounded concurrency, respecting dependencies.
+
+    A job starts once all of its deps succeeded (or fell back). If a dep
+    failed or was skipped, the job is skipped. run() only wakes up when a
+    job finishes, and then looks at that job's dependents alone.
+    """
+
+    def __init__(self, workers=4, rate=1.0, burst=2, retries=3, backoff=2.0, max_backoff=60.0):
+        self.workers = workers
+        self.bucket = TokenBucket(rate, burst)
+        self.retries = retries
+        self.backoff = backoff
+        self.max_backoff = max_backoff
+        self.jobs = {}
+        self.wall_time = 0.0
+
+    def add(self, name, fn, deps=(), fallback=None):
+        """Add a job. Deps must already be added, which keeps the graph acyclic."""
+        if name in self.jobs:
+            # Re-adding a name could point an earlier job's deps at a later one
+            raise ValueError(f"{name}: job already added")
+        for dep in deps:
+            if dep not in self.jobs:
+                raise KeyError(f"{name}: unknown dependency {dep!r}")
+        job = Job(name, fn, deps, fallback)
+        self.jobs[name] = job
+        return job
+
+    def _attempt(self, job, args):
+        start = time.monotonic()
+        _local.bucket = self.bucket
+        try:
+            for attempt in range(1, self.retries + 2):
+                job.attempts = attempt
+                try:
+                    job.result = job.fn(*args)
+                    self.bucket.speed_up()
+                    job.status = "ok"
+                    return job
+                except GenerationError as e:
+                    job.error = str(e)
+                    if e.rate_limited:  # timeouts and bad prompts say nothing about the rate
+                        self.bucket.slow_down()
+                    if not e.retryable or attempt > self.retries:
+                        break
+                    delay = min(self.max_backoff, self.backoff * 2 ** (attempt - 1))
+                    delay *= random.uniform(0.5, 1.0)
+                    print(f"  ↻ {job.name}: {e} — retry {attempt}/{self.retries} in {delay:.1f}s", flush=True)
+                    time.sleep(delay)
+            if job.fallback:
+                job.result = job.fallback(*args)
+                job.status = "fallback" if job.result else "failed"
+            else:
+                job.status = "failed"
+            return job
+        finally:
+            job.elapsed = time.monotonic() - start
+
+    def run(self):
+        start = time.monotonic()
+        unmet = {name: len(job.deps) for name, job in self.jobs.items()}
+        dependents = {name: [] for name in self.jobs}
+        for job in self.jobs.values():
+            for dep in job.deps:
+                dependents[dep].append(job)
+        running = {}
+        with ThreadPoolExecutor(max_workers=self.workers) as pool:
+            def launch(job):
+                job.status = "running"
+                args = [self.jobs[d].result for d in job.deps]
+                running[pool.submit(self._attempt, job, args)] = job
+
+            def settle(job):
+                # Start the jobs this one was the last dep of; skip everything behind a failure
+                for nxt in dependents[job.name]:
+                    if nxt.status != "pending":
+                        continue
+                    if job.status in ("failed", "skipped"):
+                        nxt.status = "skipped"
+                        nxt.error = "dependency failed"
+                        settle(nxt)
+                        continue
+                    unmet[nxt.name] -= 1
+                    if not unmet[nxt.name]:
+                        launch(nxt)
+
+            for job in list(self.jobs.values()):
+                if not job.deps:
+                    launch(job)
+            while running:
+                done, _ = wait(running, return_when=FIRST_COMPLETED)
+                for fut in done:
+                    job = running.pop(fut)
+                    try:
+                        fut.result()
+                    except Exception as e:  # non-generation bug in a job body
+                        job.status = "failed"
+                        job.error = f"{type(e).__name__}: {e}"
+                    mark = {"ok": "✓", "fallback": "⚠"}.get(job.status, "✗")
+                    print(f"  {mark} {job.name} ({job.status}, {job.elapsed:.1f}s)", flush=True)
+                    settle(job)
+        self.wall_time = time.monotonic() - start
+        return self.jobs
+
+    def summary(self):
+        """Print a per-job table and totals. Returns True if nothing failed."""
+        print(f"\n{'=' * 60}", flush=True)
+        print("SUMMARY", flush=True)
+        for job in self.jobs.values():
+            note = f"  {job.error}" if job.status != "ok" and job.error else ""
+            print(f"  {job.name:28s} {job.status:9s} {job.attempts}x {job.elapsed:6.1f}s{note}", flush=True)
+        counts = {}
+        for job in self.jobs.values():
+            counts[job.status] = counts.get(job.status, 0) + 1
+        busy = sum(j.elapsed for j in self.jobs.values())
+        print(f"\n  {', '.join(f'{v} {k}' for k, v in sorted(counts.items()))}", flush=True)
+        print(f"  wall {self.wall_time:.1f}s, job time {busy:.1f}s, final rate {self.bucket.rate:.2f}/s", flush=True)
+        return not any(j.status in ("failed", "skipped") for j in self.jobs.values())
@@ -2,6 +2,8 @@ extends Area2D
 
 ## Projectile that flies toward a target enemy
 ## Supports splash damage, slow, and poison on hit
+## Pooled per scene (NodePool): the tower sets the fields, adds it to the
+## tree and calls launch(); hits and timeouts release it back to the pool
 
 var target: Area2D = null
 var damage: int = 10
@@ -18,40 +20,73 @@ var apply_poison_on_hit: bool = false
 var poison_damage: float = 4.0
 var poison_duration: float = 4.0
 
-func _ready():
+const LIFETIME: float = 3.0
+const PROJ_TEXTURES = {
+	"arrow": "res://assets/sprites/projectiles/arrow_proj.png",
+	"cannon": "res://assets/sprites/projectiles/cannon_proj.png",
+	"magic": "res://assets/sprites/projectiles/magic_proj.png",
+	"frost": "res://assets/sprites/projectiles/frost_proj.png",
+	"poison": "res://assets/sprites/projectiles/poison_proj.png",
+	"holy": "res://assets/sprites/projectiles/holy_proj.png",
+}
+
+var _life: float = 0.0
+var _spent: bool = false
+var _target_serial: int = -1  # target.spawn_serial at launch; a pooled enemy respawns with a new one
+
+# Called once in the tree, after the tower has set the fields above
+func launch():
 	# Set projectile sprite based on type
-	var proj_textures = {
-		"arrow": "res://assets/sprites/projectiles/arrow_proj.png",
-		"cannon": "res://assets/sprites/projectiles/cannon_proj.png",
-		"magic": "res://assets/sprites/projectiles/magic_proj.png",
-		"frost": "res://assets/sprites/projectiles/frost_proj.png",
-		"poison": "res://assets/sprites/projectiles/poison_proj.png",
-		"holy": "res://assets/sprites/projectiles/holy_proj.png",
-	}
-	if proj_textures.has(projectile_type):
-		var tex_path = proj_textures[projectile_type]
-		if ResourceLoader.exists(tex_path):
-			$Sprite2D.texture = load(tex_path)
+	if PROJ_TEXTURES.has(projectile_type):
+		var texture = SpriteAtlas.get_texture(PROJ_TEXTURES[projectile_type])
+		if texture:
+			$Sprite2D.texture = texture
 	
 	if target and is_instance_valid(target):
+		_target_serial = target.spawn_serial
+	if _target_alive():
 		direction = (target.global_position - global_position).normalized()
 	
-	# Auto-destroy after 3 seconds if it misses
-	await get_tree().create_timer(3.0).timeout
-	if is_instance_valid(self):
-		queue_free()
+	# Auto-release after LIFETIME seconds if it misses
+	_life = LIFETIME
+
+func _pool_reset():
+	target = null
+	_target_serial = -1
+	direction = Vector2.ZERO
+	rotation = 0.0
+	projectile_type = "arrow"
+	splash_radius = 0.0
+	apply_slow_on_hit = false
+	apply_poison_on_hit = false
+	_spent = false
+
+# False once the target died, even if its pooled node is already walking again
+func _target_alive() -> bool:
+	return target != null and is_instance_valid(target) and target.is_targetable() \
+			and target.spawn_serial == _target_serial
 
 func _process(delta: float):
-	if target and is_instance_valid(target):
+	if _spent:
+		return
+	_life -= delta
+	if _life <= 0.0:
+		_spent = true
+		NodePool.release(self)
+		return
+	if _target_alive():
 		direction = (target.global_position - global_position).normalized()
 	
 	position += direction * speed * delta
 	rotation = direction.angle()
 
 func _on_area_entered(area: Area2D):
-	if area.is_in_group("enemies") and area.has_method("take_damage"):
+	if _spent:
+		return
+	if area.is_in_group("enemies") and area.has_method("take_damage") and area.is_targetable():
+		_spent = true
 		_apply_hit(area)
-		queue_free()
+		NodePool.release(self)
 
 func _apply_hit(enemy: Area2D):
 	# Direct hit
@@ -81,10 +116,4 @@ func _apply_effects(enemy: Area2D):
 		enemy.apply_poison(poison_damage, poison_duration)
 
 func _get_enemies_in_radius(radius: float) -> Array:
-	var enemies: Array = []
-	var space_state = get_world_2d().direct_space_state
-	# Simple distance check against all enemies
-	for node in get_tree().get_nodes_in_group("enemies"):
-		if is_instance_valid(node) and global_position.distance_to(node.global_position) <= radius:
-			enemies.append(node)
-	return enemies
+	return EnemyGrid.query_radius(global_position, radius)
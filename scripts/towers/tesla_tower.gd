@@ -2,8 +2,8 @@ extends Node2D
 
 ## Tesla Tower - Zaps up to 3 enemies with continuous lightning
 ## No projectiles — draws lightning bolts directly to targets
+## Targets are the closest enemies from an EnemyGrid query
 
-@onready var range_area: Area2D = $RangeArea
 @onready var sprite: Sprite2D = $Sprite2D
 @onready var zap_timer: Timer = $ZapTimer
 
@@ -12,7 +12,6 @@ var damage: int = 5
 var attack_range: float = 140.0
 var fire_rate: float = 4.0  # zaps per second
 var max_targets: int = 3
-var enemies_in_range: Array = []
 var current_targets: Array = []
 var lightning_lines: Array = []
 var can_zap: bool = true
@@ -33,12 +32,7 @@ func _apply_setup(type: String):
 	fire_rate = data["fire_rate"]
 	
 	# Set tower sprite
-	sprite.texture = load("res://assets/sprites/towers/tesla_tower.png")
-	
-	# Set range collision shape
-	var shape = CircleShape2D.new()
-	shape.radius = attack_range
-	$RangeArea/CollisionShape2D.shape = shape
+	sprite.texture = SpriteAtlas.get_texture("res://assets/sprites/towers/tesla_tower.png")
 	
 	# Set zap rate
 	zap_timer.wait_time = 1.0 / fire_rate
@@ -53,29 +47,8 @@ func _process(_delta: float):
 		_zap()
 
 func _update_targets():
-	# Remove invalid enemies
-	var valid: Array = []
-	for e in enemies_in_range:
-		if is_instance_valid(e):
-			valid.append(e)
-	enemies_in_range = valid
-	
-	# Pick up to max_targets closest enemies
-	current_targets.clear()
-	
-	if enemies_in_range.is_empty():
-		return
-	
-	# Sort by distance
-	var sorted_enemies = enemies_in_range.duplicate()
-	sorted_enemies.sort_custom(func(a, b):
-		var da = global_position.distance_squared_to(a.global_position)
-		var db = global_position.distance_squared_to(b.global_position)
-		return da < db
-	)
-	
-	for i in range(min(max_targets, sorted_enemies.size())):
-		current_targets.append(sorted_enemies[i])
+	# Up to max_targets closest enemies; range reaches the enemy's edge
+	current_targets = EnemyGrid.nearest(global_position, attack_range + EnemyGrid.ENEMY_RADIUS, max_targets)
 
 func _update_lightning():
 	# Remove old lightning lines
@@ -128,12 +101,5 @@ func _zap():
 		if is_instance_valid(target) and target.has_method("take_damage"):
 			target.take_damage(damage)
 
-func _on_range_area_area_entered(area: Area2D):
-	if area.is_in_group("enemies"):
-		enemies_in_range.append(area)
-
-func _on_range_area_area_exited(area: Area2D):
-	enemies_in_range.erase(area)
-
 func _on_zap_timer_timeout():
 	can_zap = true
@@ -2,8 +2,8 @@ extends Node2D
 
 ## Universal tower script — handles all tower types via data-driven behavior
 ## Projectile, beam (chain lightning), AoE, and passive towers
+## Targets come from EnemyGrid queries around the tower, not per-tower range areas
 
-@onready var range_area: Area2D = $RangeArea
 @onready var sprite: Sprite2D = $Sprite2D
 @onready var shoot_timer: Timer = $ShootTimer
 @onready var barrel: Marker2D = $Barrel
@@ -16,7 +16,6 @@ var attack_range: float = 150.0
 var fire_rate: float = 1.0
 var projectile_speed: float = 300.0
 var current_target: Area2D = null
-var enemies_in_range: Array = []
 var can_shoot: bool = true
 var _pending_type: String = ""
 
@@ -29,6 +28,7 @@ var upgrade_levels: Dictionary = {"path_a": 0, "path_b": 0, "path_c": 0}
 # Beam tower vars
 var max_targets: int = 3
 var lightning_lines: Array = []
+var _beam_targets: Array = []
 
 # AoE vars (flame tower)
 var aoe_active: bool = false
@@ -59,14 +59,9 @@ func _apply_setup(type: String):
 	
 	# Set tower sprite
 	var texture_path = "res://assets/sprites/towers/%s.png" % type
-	if ResourceLoader.exists(texture_path):
-		sprite.texture = load(texture_path)
-	
-	# Set range collision shape (skip for passive towers)
-	if attack_range > 0:
-		var shape = CircleShape2D.new()
-		shape.radius = attack_range
-		$RangeArea/CollisionShape2D.shape = shape
+	var texture = SpriteAtlas.get_texture(texture_path)
+	if texture:
+		sprite.texture = texture
 	
 	# Set fire rate
 	if fire_rate > 0:
@@ -96,57 +91,30 @@ func _process(_delta: float):
 			if can_shoot and not _get_current_beam_targets().is_empty():
 				_zap()
 		GameManager.AttackType.AOE:
-			if can_shoot and not enemies_in_range.is_empty():
-				_aoe_damage()
+			if can_shoot:
+				var targets = _get_valid_targets()
+				if not targets.is_empty():
+					_aoe_damage(targets)
 		GameManager.AttackType.PASSIVE, GameManager.AttackType.SPAWN:
 			pass  # No active attack
 
 func _update_target():
-	# Remove invalid enemies
-	_clean_enemies()
-	
-	if enemies_in_range.is_empty():
-		current_target = null
-		return
-	
-	# Filter by targeting rules
-	var valid = _get_valid_targets()
-	if valid.is_empty():
+	# Target enemy furthest along the path (closest to exit)
+	if attack_range <= 0:
 		current_target = null
 		return
-	
-	# Target enemy furthest along the path (closest to exit)
-	var best_target: Area2D = null
-	var best_progress: float = 0.0
-	
-	for enemy in valid:
-		var path_follow = enemy.get_parent() as PathFollow2D
-		if path_follow and path_follow.progress_ratio > best_progress:
-			best_progress = path_follow.progress_ratio
-			best_target = enemy
-	
-	current_target = best_target
+	current_target = EnemyGrid.best_progress(global_position, _reach(),
+			_tower_data.get("targets_air", true), _tower_data.get("targets_ground", true))
 
-func _get_valid_targets() -> Array:
-	var targets_air = _tower_data.get("targets_air", true)
-	var targets_ground = _tower_data.get("targets_ground", true)
-	var valid: Array = []
-	for e in enemies_in_range:
-		if not is_instance_valid(e):
-			continue
-		if e.is_flying and not targets_air:
-			continue
-		if not e.is_flying and not targets_ground:
-			continue
-		valid.append(e)
-	return valid
+# Range reaches the enemy's edge, as the old range Area2D overlap did
+func _reach() -> float:
+	return attack_range + EnemyGrid.ENEMY_RADIUS
 
-func _clean_enemies():
-	var valid: Array = []
-	for e in enemies_in_range:
-		if is_instance_valid(e):
-			valid.append(e)
-	enemies_in_range = valid
+func _get_valid_targets() -> Array:
+	if attack_range <= 0:
+		return []
+	return EnemyGrid.query_radius(global_position, _reach(),
+			_tower_data.get("targets_air", true), _tower_data.get("targets_ground", true))
 
 func _shoot_projectile():
 	if not projectile_scene:
@@ -160,7 +128,7 @@ func _shoot_projectile():
 	if not attack_sfx.is_empty():
 		AudioManager.play_sfx(attack_sfx)
 	
-	var projectile = projectile_scene.instantiate()
+	var projectile = NodePool.acquire(NodePool.register_scene(projectile_scene))
 	if barrel:
 		projectile.global_position = barrel.global_position
 	else:
@@ -202,26 +170,15 @@ func _shoot_projectile():
 		projectile.projectile_type = proj_type
 	
 	get_tree().root.add_child(projectile)
+	projectile.launch()
 
 # === BEAM (Chain Lightning) ===
 func _update_beam_targets():
-	_clean_enemies()
+	_beam_targets = EnemyGrid.nearest(global_position, _reach(), max_targets,
+			_tower_data.get("targets_air", true), _tower_data.get("targets_ground", true))
 
 func _get_current_beam_targets() -> Array:
-	var valid = _get_valid_targets()
-	if valid.is_empty():
-		return []
-	
-	valid.sort_custom(func(a, b):
-		var da = global_position.distance_squared_to(a.global_position)
-		var db = global_position.distance_squared_to(b.global_position)
-		return da < db
-	)
-	
-	var targets: Array = []
-	for i in range(min(max_targets, valid.size())):
-		targets.append(valid[i])
-	return targets
+	return _beam_targets.filter(func(e): return is_instance_valid(e) and e.is_targetable())
 
 func _update_lightning():
 	for line in lightning_lines:
@@ -269,12 +226,11 @@ func _zap():
 			GameParticles.spawn_frost_hit(get_tree(), target.global_position)  # Electric spark
 
 # === AOE (Flame Tower) ===
-func _aoe_damage():
+func _aoe_damage(targets: Array):
 	can_shoot = false
 	shoot_timer.start()
 	AudioManager.play_sfx("fire_attack", -3.0)
 	GameParticles.spawn_fire_burst(get_tree(), global_position)
-	var targets = _get_valid_targets()
 	for target in targets:
 		if is_instance_valid(target) and target.has_method("take_damage"):
 			target.take_damage(damage)
@@ -326,11 +282,7 @@ func apply_upgrade(path: String) -> bool:
 	for stat in changes:
 		match stat:
 			"damage": damage = changes[stat]
-			"range":
-				attack_range = changes[stat]
-				var shape = CircleShape2D.new()
-				shape.radius = attack_range
-				$RangeArea/CollisionShape2D.shape = shape
+			"range": attack_range = changes[stat]
 			"fire_rate":
 				fire_rate = changes[stat]
 				shoot_timer.wait_time = 1.0 / fire_rate
@@ -356,12 +308,5 @@ func apply_upgrade(path: String) -> bool:
 	return true
 
 # Signal handlers
-func _on_range_area_area_entered(area: Area2D):
-	if area.is_in_group("enemies"):
-		enemies_in_range.append(area)
-
-func _on_range_area_area_exited(area: Area2D):
-	enemies_in_range.erase(area)
-
 func _on_shoot_timer_timeout():
 	can_shoot = true
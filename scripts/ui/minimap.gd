@@ -8,7 +8,6 @@ const MARGIN: float = 10.0
 
 var map_size: Vector2 = Vector2(2560, 1440)
 var path_points: PackedVector2Array = PackedVector2Array()
-var _enemies_container: Node = null
 var _towers_container: Node = null
 
 func _ready():
@@ -22,8 +21,7 @@ func setup(p_map_size: Vector2, p_path_points: PackedVector2Array):
 	path_points = p_path_points
 	queue_redraw()
 
-func set_containers(enemies: Node, towers: Node):
-	_enemies_container = enemies
+func set_towers_container(towers: Node):
 	_towers_container = towers
 
 func _process(_delta: float):
@@ -58,14 +56,9 @@ func _draw():
 				var tp = Vector2(tower.global_position.x * scale_x, tower.global_position.y * scale_y)
 				draw_circle(tp, 2.5, Color(0.2, 0.9, 0.3, 0.9))
 	
-	# Enemies (red dots)
-	if _enemies_container and is_instance_valid(_enemies_container):
-		for follow in _enemies_container.get_children():
-			if is_instance_valid(follow) and follow is PathFollow2D:
-				for child in follow.get_children():
-					if is_instance_valid(child):
-						var ep = Vector2(child.global_position.x * scale_x, child.global_position.y * scale_y)
-						draw_circle(ep, 1.5, Color(1.0, 0.3, 0.2, 0.9))
+	# Enemies (red dots) — this frame's EnemyGrid snapshot, no node walk
+	for pos in EnemyGrid.get_positions():
+		draw_circle(Vector2(pos.x * scale_x, pos.y * scale_y), 1.5, Color(1.0, 0.3, 0.2, 0.9))
 	
 	# Camera viewport rectangle
 	var cam = get_viewport().get_camera_2d()
@@ -0,0 +1,231 @@
+#!/usr/bin/env python3
+"""Score walk sheets and queue the bad ones for regeneration.
+
+Every *_walk_sheet.png (4 x 64px frames) is loaded as an array and checked:
+
+    empty       frames with (almost) no opaque pixels
+    duplicate   frame pairs that are identical
+    motion      per-step difference between consecutive frames after the
+                best shift of up to ±SHIFT px; a bounce fallback (one image
+                pasted with small offsets) has none
+    bleed       opaque pixels on the frame seams, i.e. content cut off by
+                the frame border or spilling into the next frame
+    drift       hue histogram distance from the static <name>_enemy.png
+
+Sheets are decoded in parallel and scored together as one (N, 4, 64, 64, 4)
+batch. Results go to a JSON report; the walk targets of failing sheets are
+appended to the asset_build retry queue (asset_build.py --retry-queue).
+
+Usage: validate_walks.py [--jobs N] [--report FILE] [--no-queue] [SHEET...]
+"""
+
+import argparse
+import json
+import os
+from multiprocessing import Pool
+from pathlib import Path
+
+import numpy as np
+from PIL import Image
+
+ROOT = Path(__file__).resolve().parent.parent
+ENEMIES_DIR = ROOT / "assets" / "sprites" / "enemies"
+BUILD_DIR = ROOT / ".asset_build"
+REPORT_PATH = BUILD_DIR / "walk_report.json"
+QUEUE_PATH = BUILD_DIR / "retry_queue.json"
+
+FRAME = 64
+N_FRAMES = 4
+ALPHA_MIN = 128
+SHIFT = 3  # px searched each way when aligning frames
+EMPTY_MAX = 16  # opaque pixels at or below this make a frame empty
+MOTION_MIN = 0.04  # aligned per-step difference below this is no animation
+BLEED_MAX = 16  # opaque pixels allowed on a frame seam (limbs may touch it)
+DRIFT_MAX = 0.6  # total variation distance between hue histograms
+HUE_BINS = 12
+
+
+def load(path):
+    """(frames (4, 64, 64, 4) uint8 or None, static RGBA or None, error)."""
+    path = Path(path)
+    try:
+        sheet = np.asarray(Image.open(path).convert("RGBA"))
+    except OSError as e:
+        return None, None, str(e)
+    if sheet.shape[:2] != (FRAME, FRAME * N_FRAMES):
+        return None, None, f"size {sheet.shape[1]}x{sheet.shape[0]}, expected {FRAME * N_FRAMES}x{FRAME}"
+    frames = sheet.reshape(FRAME, N_FRAMES, FRAME, 4).transpose(1, 0, 2, 3)
+    static_path = path.with_name(path.name.replace("_walk_sheet.png", "_enemy.png"))
+    static = None
+    if static_path.exists():
+        static = np.asarray(Image.open(static_path).convert("RGBA"))
+    return np.ascontiguousarray(frames), static, None
+
+
+def _premultiplied(frames):
+    f = frames.astype(np.float32) / 255
+    return np.concatenate([f[..., :3] * f[..., 3:], f[..., 3:]], axis=-1)
+
+
+def motion(frames):
+    """(N, 4) aligned difference from each frame to the next (cyclic).
+
+    The next frame is shifted by every offset within ±SHIFT and the smallest
+    mean difference over the pixels either frame covers is kept.
+    """
+    pm = _premultiplied(frames)                        # (N, 4, H, W, 4)
+    cover = frames[..., 3] >= ALPHA_MIN
+    nxt, nxt_cover = np.roll(pm, -1, axis=1), np.roll(cover, -1, axis=1)
+    best = np.full(frames.shape[:2], np.inf, dtype=np.float32)
+    for dy in range(-SHIFT, SHIFT + 1):
+        for dx in range(-SHIFT, SHIFT + 1):
+            moved = np.roll(nxt, (dy, dx), axis=(2, 3))
+            union = cover | np.roll(nxt_cover, (dy, dx), axis=(2, 3))
+            diff = np.abs(pm - moved).sum(axis=-1) * union
+            score = diff.sum(axis=(2, 3)) / np.maximum(union.sum(axis=(2, 3)), 1) / 4
+            best = np.minimum(best, score)
+    return best
+
+
+def duplicates(frames):
+    """Per sheet, the list of identical frame pairs (i, j)."""
+    flat = frames.reshape(frames.shape[0], N_FRAMES, -1)
+    same = (flat[:, :, None, :] == flat[:, None, :, :]).all(axis=-1)
+    iu = np.triu_indices(N_FRAMES, 1)
+    return [[(int(i), int(j)) for i, j in zip(*iu) if row[i, j]] for row in same]
+
+
+def seam_bleed(frames):
+    """(N, 4) opaque pixels in each frame's first and last column."""
+    edge = frames[:, :, :, [0, -1], 3] >= ALPHA_MIN
+    return edge.sum(axis=(2, 3))
+
+
+def hue_histogram(rgba):
+    """Chroma-weighted hue histogram of the opaque pixels, normalized.
+
+    Hue instead of RGB bins so shading differences between the static and
+    the walk (same creature, lighter or darker) don't count as drift.
+    """
+    rgb = rgba[rgba[..., 3] >= ALPHA_MIN][:, :3].astype(float) / 255
+    hist = np.zeros(HUE_BINS)
+    if not len(rgb):
+        return hist
+    hi, lo = rgb.max(axis=1), rgb.min(axis=1)
+    chroma = hi - lo
+    r, g, b = rgb.T
+    safe = np.where(chroma > 0, chroma, 1)
+    hue = np.where(hi == r, ((g - b) / safe) % 6, np.where(hi == g, (b - r) / safe + 2, (r - g) / safe + 4))
+    hist = np.bincount((hue / 6 * HUE_BINS).astype(int) % HUE_BINS, weights=chroma, minlength=HUE_BINS)
+    return hist / hist.sum() if hist.sum() else hist
+
+
+def drift(frames, static):
+    """Total variation distance between the sheet's and the static's hue histograms."""
+    if static is None:
+        return None
+    return float(0.5 * np.abs(hue_histogram(frames.reshape(-1, 4)) - hue_histogram(static)).sum())
+
+
+def score(names, frames, statics):
+    """Score a (N, 4, 64, 64, 4) batch. Returns {name: result dict}."""
+    opaque = (frames[..., 3] >= ALPHA_MIN).sum(axis=(2, 3))
+    steps = motion(frames)
+    dups = duplicates(frames)
+    bleed = seam_bleed(frames)
+    results = {}
+    for k, name in enumerate(names):
+        empty = [int(i) for i in np.flatnonzero(opaque[k] <= EMPTY_MAX)]
+        d = drift(frames[k], statics[k])
+        problems = []
+        if empty:
+            problems.append(f"empty frames {empty}")
+        if dups[k]:
+            problems.append(f"duplicate frames {dups[k]}")
+        if len(empty) < N_FRAMES and steps[k].max() < MOTION_MIN:
+            problems.append(f"no motion after alignment ({steps[k].max():.3f})")
+        if bleed[k].max() > BLEED_MAX:
+            problems.append(f"bleed across frame border ({int(bleed[k].max())}px)")
+        if d is not None and d > DRIFT_MAX:
+            problems.append(f"palette drift {d:.2f} from static")
+        results[name] = {
+            "ok": not problems,
+            "problems": problems,
+            "opaque": opaque[k].tolist(),
+            "motion": [round(float(v), 4) for v in steps[k]],
+            "duplicates": dups[k],
+            "bleed": bleed[k].tolist(),
+            "drift": None if d is None else round(d, 4),
+        }
+    return results
+
+
+def validate(paths, jobs=1):
+    """Load sheets in parallel, score them as one batch. Returns {name: result}."""
+    names = [Path(p).name.removesuffix("_walk_sheet.png") for p in paths]
+    if jobs > 1 and len(paths) > 1:
+        with Pool(min(jobs, len(paths))) as pool:
+            loaded = pool.map(load, paths)
+    else:
+        loaded = [load(p) for p in paths]
+    results = {}
+    batch = [(n, f, s) for n, (f, s, err) in zip(names, loaded) if err is None]
+    for name, (_, _, err) in zip(names, loaded):
+        if err is not None:
+            results[name] = {"ok": False, "problems": [err]}
+    if batch:
+        results.update(score([b[0] for b in batch], np.stack([b[1] for b in batch]), [b[2] for b in batch]))
+    return {name: results[name] for name in names}
+
+
+def queue_retries(names, path=QUEUE_PATH):
+    """Append <name>:walk targets to the asset_build retry queue. Returns the queue."""
+    try:
+        with open(path) as f:
+            queue = json.load(f)
+    except (OSError, ValueError):
+        queue = []
+    for name in names:
+        target = f"{name}:walk"
+        if target not in queue:
+            queue.append(target)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    with open(path, "w") as f:
+        json.dump(queue, f, indent=1)
+    return queue
+
+
+def main():
+    ap = argparse.ArgumentParser(description="Score walk sheets and queue failures for retry")
+    ap.add_argument("sheets", nargs="*", type=Path, help="default: assets/sprites/enemies/*_walk_sheet.png")
+    ap.add_argument("--jobs", type=int, default=os.cpu_count() or 1)
+    ap.add_argument("--report", type=Path, default=REPORT_PATH)
+    ap.add_argument("--no-queue", action="store_true", help="report only, don't queue retries")
+    args = ap.parse_args()
+
+    sheets = args.sheets or sorted(ENEMIES_DIR.glob("*_walk_sheet.png"))
+    if not sheets:
+        print("✗ no walk sheets found", flush=True)
+        return 1
+    print(f"VALIDATE: {len(sheets)} walk sheets", flush=True)
+    results = validate(sheets, args.jobs)
+    for name, r in results.items():
+        if r["ok"]:
+            print(f"  ✓ {name:16s} motion {min(r['motion']):.3f}-{max(r['motion']):.3f}  "
+                  f"drift {r['drift'] if r['drift'] is not None else '-'}", flush=True)
+        else:
+            print(f"  ✗ {name:16s} {'; '.join(r['problems'])}", flush=True)
+
+    args.report.parent.mkdir(parents=True, exist_ok=True)
+    with open(args.report, "w") as f:
+        json.dump(results, f, indent=1)
+    print(f"  → {args.report}", flush=True)
+    failed = [name for name, r in results.items() if not r["ok"]]
+    if failed and not args.no_queue:
+        queue = queue_retries(failed)
+        print(f"  → queued {len(failed)} walks for retry ({len(queue)} in {QUEUE_PATH})", flush=True)
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
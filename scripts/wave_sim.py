@@ -0,0 +1,803 @@
+#!/usr/bin/env python3
+"""Headless wave simulator driven by the game's own level, enemy and tower data.
+
+Runs a batch of independent games side by side: every array carries a
+leading "sim" axis. Each sim gets a build — an ordered buy list of towers —
+and buys the next entry at the start of a wave whenever it can afford it,
+like a player would.
+
+Nothing steps time. Each tower's reach is precomputed as runs of path
+progress where an enemy overlaps its range circle, so the time an enemy
+spends in range of every tower is a closed-form window. Enemies are
+resolved one at a time in the order they would reach the exit: each
+tower's attacks on the enemy are a regular series starting once the enemy
+is in range and the tower is free, the kill time is where the summed
+damage of all series and DoT ticks first reaches its health (bisection on
+that step function), and each tower is busy with it until then. That is a
+few hundred array operations per enemy for the whole batch: 500-1300 sims/s
+on one core for 8-tower builds (L5 slowest), against 10-40 stepped at
+dt=0.1.
+
+SteppedSim (--dt) is the fixed-timestep model it replaced, kept as the
+reference. Over 150 random 8-tower builds per level against it at dt=0.05,
+the analytic model agrees on win/loss for 93-96% of builds, with a mean
+absolute lives error of 0.7-0.8 (correlation 0.77-0.96). Its errors lean
+towards losing: its win rate is 0-6 points lower. tests/test_wave_sim.py
+holds it to 85% agreement and 1.5 lives.
+
+Modelled after the game scripts:
+    enemies   path progress at speed x slow, poison/burn ticking every 0.5s
+              from spawn (enemy.gd), leak = -1 life
+    towers    range = CircleShape radius + enemy radius (area overlap),
+              air/ground filter, 1/fire_rate between attacks
+              projectile: stays on the enemy furthest along until it dies
+                          or leaves (a later enemy waits for the tower),
+                          flight time to the middle of the covered run,
+                          splash 50% to the enemies behind it, slow/poison
+                          on hit, air and holy multipliers
+              beam:       every enemy in range, damage scaled down when more
+                          than max_targets overlap (counted from arrivals)
+              aoe:        every valid enemy in range + burn
+              gold mine:  gold_per_wave at wave start
+              barracks:   nothing (tower.gd does not implement SPAWN yet)
+    economy   start 100 + 25*(level-1), kill rewards, wave bonus 25 + 5*wave
+    slow      from the first frost hit until slow_duration after the
+              enemy leaves the last frost tower that shot it
+
+Waves run back to back.
+
+Usage: wave_sim.py [--level N|all] [--sims 1000] [--towers 8] [--seed 0]
+                   [--build builds.json] [--jobs N] [--min-win-rate 0.5] [--dt 0.05]
+       builds.json: [[{"type": "arrow_tower", "anchor": [12, 14],
+                       "upgrades": {"path_a": 1}, "wave": 1}, ...], ...]
+       optional entry keys: "at" (seconds into "wave" the tower is placed,
+       it attacks from then), "cost" (overrides tower + upgrade cost),
+       "placed" (true: bought in a recorded game, so not held back by the
+       sim's gold), "until" (wave at whose start the entry is removed) and
+       "refund" (gold then)
+"""
+
+import argparse
+import json
+import sys
+import time
+from multiprocessing import Pool
+
+import numpy as np
+
+import gd_data
+from compile_waves import timeline
+from level_map import PathLine, anchor_center, free_anchors, path_cells
+
+PROJECTILE, BEAM, AOE, SPAWN, PASSIVE = range(5)
+ENEMY_RADIUS = 12.0  # scenes/enemies/enemy.tscn collision circle
+DOT_TICK = 0.5
+SPLASH_FRACTION = 0.5
+SPLASH_LOOKAHEAD = 8  # enemies behind the target that splash can reach
+BIN = 4.0  # px of path progress per coverage bin
+BISECT = 14  # kill-time bisection steps, ~0.01s on a 200s walk
+SLOTS = 4  # SteppedSim: projectiles in flight per tower
+CHUNK = 16  # SteppedSim: bins per coarse chunk for the "anything near this tower" prefilter
+MAX_WAVE_TIME = 900.0  # SteppedSim: a wave still running after this is cut off
+NEVER = -1e9  # time sentinel: no attack yet / empty coverage run
+START_LIVES = 20
+COMBAT_TOWERS = ["arrow_tower", "cannon_tower", "magic_tower", "tesla_tower", "frost_tower",
+                 "flame_tower", "antiair_tower", "sniper_tower", "poison_tower", "bomb_tower",
+                 "holy_tower", "storm_tower"]
+
+# Per-tower stat columns, filled from tower_data (+ upgrades)
+STATS = ["kind", "x", "y", "range", "damage", "period", "proj_speed", "splash", "slow_amount",
+         "slow_duration", "poison_damage", "poison_duration", "burn_damage", "burn_duration",
+         "max_targets", "air", "ground", "air_mult", "holy_mult", "gold", "cost", "placed", "wave", "at", "until", "refund"]
+
+
+class GameData:
+    """Everything the sim reads from the GDScript sources, parsed once."""
+
+    def __init__(self):
+        self.levels = gd_data.load_levels()
+        self.enemies = gd_data.load_enemy_types()
+        self.towers = gd_data.load_tower_data()
+        self.upgrades = gd_data.load_upgrade_data()
+        self.holy_types = set()
+        for t in self.towers.values():
+            self.holy_types.update(t.get("holy_bonus_types", []))
+
+
+def tower_row(data, spec):
+    """One STATS row for a build entry {"type", "anchor", "upgrades", "wave"[, "at", "cost", "placed",
+    "until", "refund"]}."""
+    s = dict(data.towers[spec["type"]])
+    cost = s["cost"]
+    for path, level in spec.get("upgrades", {}).items():
+        for up in data.upgrades[spec["type"]][path]["upgrades"][:level]:
+            s.update(up["changes"])
+            cost += up["cost"]
+    x, y = anchor_center(*spec["anchor"])
+    specials = s.get("specials", [])
+    rate = s.get("fire_rate", 0.0)
+    return [
+        s["attack_type"], x, y, s.get("range", 0.0), s.get("damage", 0),
+        1.0 / rate if rate > 0 else np.inf, s.get("projectile_speed", 0.0),
+        s.get("splash_radius", 0.0) if "splash" in specials else 0.0,
+        s.get("slow_amount", 1.0) if "slow" in specials else 1.0,
+        s.get("slow_duration", 0.0) if "slow" in specials else 0.0,
+        s.get("poison_damage", 0.0) if "poison" in specials else 0.0,
+        s.get("poison_duration", 0.0) if "poison" in specials else 0.0,
+        s.get("burn_damage", 0.0) if "burn" in specials else 0.0,
+        s.get("burn_duration", 0.0) if "burn" in specials else 0.0,
+        s.get("max_targets", 3), s.get("targets_air", True), s.get("targets_ground", True),
+        s.get("air_damage_mult", 1.0) if "air_bonus" in specials else 1.0,
+        s.get("holy_damage_mult", 1.0) if "holy" in specials else 1.0,
+        s.get("gold_per_wave", 0) if "generate_gold" in specials else 0,
+        spec.get("cost", cost), spec.get("placed", False), spec.get("wave", 1), spec.get("at", 0.0),
+        spec.get("until", np.inf), spec.get("refund", 0),
+    ]
+
+
+def random_builds(data, level, n, towers, rng):
+    """n random buy lists: random combat towers on free anchors near the path."""
+    points = data.levels[level]["path"]
+    free = free_anchors(path_cells(points))
+    ax, ay = np.nonzero(free)
+    cx, cy = anchor_center(ax, ay)
+    line = PathLine(points)
+    px, py = line.at(np.arange(0.0, line.length, 16.0))
+    dist = np.sqrt(((cx[:, None] - px[None]) ** 2 + (cy[:, None] - py[None]) ** 2).min(axis=1))
+    near = np.flatnonzero(dist < 140.0)
+    builds = []
+    for _ in range(n):
+        picks, taken = [], set()
+        for i in rng.permutation(near):
+            a = (int(ax[i]), int(ay[i]))
+            cells = {(a[0] + dx, a[1] + dy) for dx in (0, 1) for dy in (0, 1)}
+            if cells & taken:
+                continue
+            taken |= cells
+            picks.append({"type": COMBAT_TOWERS[rng.integers(len(COMBAT_TOWERS))], "anchor": list(a)})
+            if len(picks) == towers:
+                break
+        builds.append(picks)
+    return builds
+
+
+class LevelSim:
+    """Batch of independent games on one level."""
+
+    def __init__(self, data, level, builds, hp_scale=1.0):
+        self.data = data
+        self.level = level
+        self.hp_scale = hp_scale
+        self.line = PathLine(data.levels[level]["path"])
+        self.waves = data.levels[level]["waves"]
+        self.B = len(builds)
+        self.T = max(1, max(len(b) for b in builds))
+        tab = np.zeros((self.B, self.T, len(STATS)))
+        tab[:, :, STATS.index("kind")] = -1  # padding: never attacks, never bought
+        tab[:, :, STATS.index("wave")] = np.inf
+        tab[:, :, STATS.index("until")] = np.inf
+        for b, build in enumerate(builds):
+            for t, spec in enumerate(build):
+                tab[b, t] = tower_row(data, spec)
+        self.tw = {name: tab[:, :, i] for i, name in enumerate(STATS)}
+        self.tw["kind"] = self.tw["kind"].astype(int)
+        self.tw["max_targets"] = self.tw["max_targets"].astype(int)
+        self.tw["air"] = self.tw["air"].astype(bool)
+        self.tw["ground"] = self.tw["ground"].astype(bool)
+        self.tw["period"] = np.minimum(self.tw["period"], -NEVER)  # no inf - inf in the shot series
+        self._coverage()
+
+    def _coverage(self):
+        """Flat list of coverage runs: the stretches of path progress where an enemy
+        overlaps a tower's range. run_tower is the tower (b * T + t), run_rank the run's
+        place among that tower's runs in path order; flight is the projectile time to
+        the middle of the run. Sorted by tower, so each sim's runs are contiguous."""
+        tw = self.tw
+        nbins = int(self.line.length // BIN) + 1
+        bx, by = self.line.at((np.arange(nbins) + 0.5) * BIN)
+        # Builds share anchors and tower types: trace each distinct tower once
+        key = np.stack([tw["x"].ravel(), tw["y"].ravel(), tw["range"].ravel(), tw["proj_speed"].ravel()], axis=1)
+        key, same = np.unique(key, axis=0, return_inverse=True)
+        tx, ty, speed = key[:, 0], key[:, 1], key[:, 3]
+        reach2 = (key[:, 2] + ENEMY_RADIUS) ** 2
+        rows, starts, ends, flight = [], [], [], []
+        for i in range(0, len(key), 512):
+            c = slice(i, i + 512)
+            d2 = (tx[c, None] - bx) ** 2 + (ty[c, None] - by) ** 2
+            cover = np.zeros((len(d2), nbins + 2), dtype=np.int8)
+            cover[:, 1:-1] = d2 < reach2[c, None]
+            edge = np.diff(cover, axis=1)
+            r, a = np.nonzero(edge == 1)   # first covered bin of each run
+            _, b = np.nonzero(edge == -1)  # first bin after it; same row order
+            dist = np.zeros((len(d2), nbins + 1))
+            np.cumsum(np.sqrt(d2), axis=1, out=dist[:, 1:])
+            mean = (dist[r, b] - dist[r, a]) / (b - a)
+            r = r + i
+            rows.append(r)
+            starts.append(a * BIN)
+            ends.append(b * BIN)
+            flight.append(np.where(speed[r] > 0, mean / np.maximum(speed[r], 1e-6), 0.0))
+        rows, starts, ends, flight = map(np.concatenate, (rows, starts, ends, flight))
+        # Back to one list entry per run of every tower
+        runs = np.bincount(rows, minlength=len(key))[same.ravel()]
+        self.run_tower = np.repeat(np.arange(len(runs)), runs)
+        self.run_rank = np.arange(len(self.run_tower)) - np.searchsorted(self.run_tower, self.run_tower)
+        pick = np.searchsorted(rows, same.ravel()[self.run_tower]) + self.run_rank
+        self.cov_in, self.cov_out, self.flight = starts[pick], ends[pick], flight[pick]
+
+    # ── economy ────────────────────────────────────────────────────────────
+    def _buy(self, wave, money, owned, retired):
+        """Buy the next towers of each build list while affordable (in order), then retire expired ones."""
+        cost, from_wave = self.tw["cost"], self.tw["wave"]
+        blocked = np.zeros(self.B, dtype=bool)  # a build list stops at its first unaffordable entry
+        for t in range(self.T):
+            want = (~owned[:, t] & ~retired[:, t] & ~blocked & (from_wave[:, t] <= wave)
+                    & (self.tw["kind"][:, t] >= 0))
+            ok = want & ((money >= cost[:, t]) | (self.tw["placed"][:, t] > 0))
+            owned[:, t] |= ok
+            money -= np.where(ok, cost[:, t], 0)
+            blocked |= want & ~ok
+        gone = owned & (self.tw["until"] <= wave)
+        money += (self.tw["refund"] * gone).sum(axis=1)
+        owned &= ~gone
+        retired |= gone
+
+    def run(self):
+        B = self.B
+        money = np.full(B, 100 + 25 * (self.level - 1), dtype=float)
+        lives = np.full(B, START_LIVES)
+        owned = np.zeros((B, self.T), dtype=bool)
+        retired = np.zeros((B, self.T), dtype=bool)
+        leaks, durations = [], []
+        for w in range(len(self.waves)):
+            self._buy(w + 1, money, owned, retired)
+            money += (self.tw["gold"] * owned).sum(axis=1)
+            leaked, kill_gold, duration = self._run_wave(self.waves[w], owned, w + 1)
+            lives -= np.where(lives > 0, leaked, 0)
+            money += kill_gold + 25 + 5 * (w + 1)
+            leaks.append(leaked)
+            durations.append(duration)
+        return {
+            "lives": np.maximum(lives, 0),
+            "money": money,
+            "leaks": np.stack(leaks, axis=1),
+            "durations": np.stack(durations, axis=1),
+            "towers": owned.sum(axis=1),
+        }
+
+    # ── one wave ───────────────────────────────────────────────────────────
+    def _run_wave(self, groups, owned, wave):
+        """Resolve each enemy in exit order against what every tower has left.
+
+        Works on the coverage runs of the towers that can attack this wave,
+        as flat (R,) arrays; sim is the sim each run belongs to.
+        """
+        data, tw, B, T = self.data, self.tw, self.B, self.T
+        spawn, types, spawn_end = timeline(groups)  # spawning ends one delay after the last spawn
+        spawn = np.array(spawn)
+        N = len(types)
+        stats = [data.enemies.get(t, data.enemies["imp"]) for t in types]
+        speed = np.array([s["speed"] for s in stats], dtype=float)
+        health = np.array([s["health"] for s in stats], dtype=float) * self.hp_scale
+        reward = np.array([s["reward"] for s in stats], dtype=float)
+        flying = np.array([s.get("flying", False) for s in stats])
+        holy = np.array([t in data.holy_types for t in types])
+        length = self.line.length
+
+        kind = tw["kind"]
+        attackers = (owned & ((kind == PROJECTILE) | (kind == BEAM) | (kind == AOE))).ravel()
+        live = np.flatnonzero(attackers[self.run_tower])
+        tower, rank = self.run_tower[live], self.run_rank[live]
+        cov_in, cov_out, flight = self.cov_in[live], self.cov_out[live], self.flight[live]
+        R = len(live)
+        sim = tower // T
+        run = {name: tw[name].ravel()[tower] for name in STATS}
+        beam = run["kind"] == BEAM
+        multi = beam | (run["kind"] == AOE)
+        period = run["period"]
+        ready = np.where(run["wave"] == wave, run["at"], NEVER)  # placed mid-wave: attacks from then
+        towers, tower_id = np.unique(tower, return_inverse=True)
+        head = np.arange(R) - rank  # each tower's first run
+        # Single-target runs and, per other run of the same tower, where that run is
+        size = np.bincount(tower_id)[tower_id]
+        pairs = [(here, here - m + other)
+                 for m in range(int(rank.max(initial=0)) + 1) for other in range(int(size.max(initial=1)))
+                 if other != m and len(here := np.flatnonzero(~multi & (rank == m) & (size > other)))]
+        # Per coverage run: first and last attack on the previous enemy, until when it
+        # had that enemy, and when each beam's max_targets slots free up (K, R)
+        lanes = max(1, int(run["max_targets"][beam].max(initial=1)))
+        state = {"from": np.full(R, NEVER), "last": np.full(R, NEVER), "until": np.full(R, NEVER),
+                 "lanes": np.where(np.arange(lanes)[:, None] < np.where(beam, run["max_targets"], lanes),
+                                   NEVER, -NEVER)}
+        splash_taken = np.zeros((B, N))
+
+        leaked = np.zeros(B, dtype=int)
+        gold = np.zeros(B)
+        duration = np.full(B, spawn_end)
+        order = np.argsort(spawn + length / speed, kind="stable")
+        for k, i in enumerate(order):
+            s, v = spawn[i], speed[i]
+            valid = run["air"] if flying[i] else run["ground"]
+            dmg = run["damage"]
+            if flying[i]:
+                dmg = np.floor(dmg * run["air_mult"])
+            if holy[i]:
+                dmg = np.floor(dmg * run["holy_mult"])
+
+            # Slowed from each frost run's first hit until slow_duration after leaving it.
+            # Once the next enemy catches up it is the one furthest along, so
+            # single-target towers drop this one for the rest of the runs it is in
+            warp, overtaken = None, np.full(R, -NEVER)
+            frost = valid & (run["slow_duration"] > 0)
+            if frost.any():
+                st, n = self._shots(*self._windows(s, v, None, sim, cov_in, cov_out, ready),
+                                    frost, multi, period, pairs, state)
+                fired = np.flatnonzero(n > 0)
+                if len(fired):
+                    amount = np.ones(B)
+                    np.minimum.at(amount, sim[fired], run["slow_amount"][fired])
+                    hit = st[fired] + flight[fired]
+                    p_from = v * (hit - s)
+                    p_to = cov_out[fired] + v * run["slow_duration"][fired] * amount[sim[fired]]
+                    p_from, p_to = _merge(*_by_sim(sim[fired], B, p_from, p_to))
+                    warp = (p_from.T, p_to.T, amount)
+                    if k + 1 < N:
+                        j = order[k + 1]
+                        t0 = np.full(B, -NEVER)
+                        np.minimum.at(t0, sim[fired], hit)
+                        gap = np.maximum(spawn[j] + v * (t0 - s) / speed[j] - t0, 0.0)
+                        closing = speed[j] - amount * v
+                        catch = np.where((t0 < -NEVER) & (closing > 0),
+                                         t0 + speed[j] * gap / np.maximum(closing, 1e-6), -NEVER)
+                        overtaken = catch[sim]
+
+            tin, tout = self._windows(s, v, warp, sim, cov_in, cov_out, ready)
+            tout = np.where(~multi & (tin < overtaken), np.minimum(tout, overtaken), tout)
+            end = _time_at(np.full(B, length), s, v, warp, np.arange(B))
+            st, n = self._shots(tin, tout, valid, multi, period, pairs, state)
+            land = st + flight
+            # Only the attacks that happen: sim, first landing, period, count, damage
+            hit = np.flatnonzero(n)
+            series = [sim[hit], land[hit], period[hit], n[hit], dmg[hit]]
+            dots = []  # [sim, from, to, ticks before from, rate] per disjoint DoT span
+            for key, at in (("poison", land), ("burn", st)):
+                src = np.flatnonzero((n > 0) & (run[f"{key}_duration"] > 0))
+                if len(src):
+                    rate = np.zeros(B)
+                    np.maximum.at(rate, sim[src], np.floor(run[f"{key}_damage"][src] * DOT_TICK))
+                    lo, hi = _merge(*_by_sim(sim[src], B, at[src],
+                                             at[src] + (n[src] - 1) * period[src] + run[f"{key}_duration"][src]))
+                    db, dc = np.nonzero(hi > lo)
+                    dots.append([db, lo[db, dc], hi[db, dc], np.floor((lo[db, dc] - s) / DOT_TICK), rate[db]])
+
+            def damage(t):
+                """Damage landed on the enemy by time t (B,): attack series plus DoT ticks."""
+                b, first, every, count, each = series
+                hits = np.floor((t[b] - first) / every) + 1
+                total = np.bincount(b, np.maximum(np.minimum(hits, count), 0) * each, minlength=B)
+                for b, lo, hi, before, rate in dots:
+                    ticks = np.floor((np.minimum(np.maximum(t[b], lo), hi) - s) / DOT_TICK) - before
+                    total += np.bincount(b, ticks * rate, minlength=B)
+                return total
+
+            hp = health[i] - splash_taken[:, i]
+            killed = damage(end) >= hp
+            stop = end.copy()
+            if killed.any():
+                # Bisect the step function, on the sims that kill it only
+                series = [x[killed[series[0]]] for x in series]
+                dots = [[x[killed[d[0]]] for x in d] for d in dots]
+                lo = np.full(B, s)
+                for _ in range(BISECT):
+                    mid = (lo + stop) / 2
+                    ok = killed & (damage(mid) >= hp)
+                    stop = np.where(ok, mid, stop)
+                    lo = np.where(ok, lo, mid)
+            gold += np.where(killed, reward[i], 0.0)
+            leaked += ~killed
+            duration = np.maximum(duration, stop)
+
+            # Towers stop attacking when the enemy dies; later enemies queue behind that
+            stop_r = stop[sim]
+            fired = np.maximum(np.minimum(np.floor((stop_r - st) / period) + 1, n), 0)
+            shot = fired > 0
+            released = np.minimum(tout, stop_r)
+            state["from"] = np.where(shot, st, state["from"])
+            state["last"] = np.where(shot, st + (fired - 1) * period, state["last"])
+            state["until"] = np.where(shot, released, state["until"])
+            beamed = np.flatnonzero(beam & shot)
+            if len(beamed):
+                slot = state["lanes"][:, beamed].argmin(axis=0)
+                state["lanes"][slot, beamed] = released[beamed]
+
+            # Splash lands around the target, in the first run of each tower that hit it
+            splash = np.flatnonzero(valid & (run["splash"] > 0) & shot)
+            if k + 1 < N and len(splash):
+                landed = np.maximum(np.minimum(np.floor((stop_r[splash] - land[splash]) / period[splash]) + 1,
+                                              fired[splash]), 0)
+                some = splash[landed > 0]
+                landed = landed[landed > 0]
+                if len(some):
+                    t_id = tower_id[some]
+                    first = np.full(len(towers), -NEVER)
+                    last = np.full(len(towers), NEVER)
+                    where = np.full(len(towers), R)
+                    count = np.bincount(t_id, landed, minlength=len(towers))
+                    np.minimum.at(first, t_id, land[some])
+                    np.maximum.at(last, t_id, land[some] + (landed - 1) * period[some])
+                    np.minimum.at(where, t_id, some)
+                    by = np.flatnonzero(count > 0)
+                    r = where[by]
+                    when = (first[by] + last[by]) / 2
+                    here = (cov_in[r] + cov_out[r]) / 2
+                    behind = order[k + 1:k + 1 + SPLASH_LOOKAHEAD]
+                    there = speed[behind] * (when[:, None] - spawn[behind])
+                    near = (np.abs(there - here[:, None]) <= run["splash"][r, None]) & (there >= 0) & (there < length)
+                    per_hit = np.floor(dmg[r] * SPLASH_FRACTION) * count[by]
+                    np.add.at(splash_taken, (sim[r, None], behind), per_hit[:, None] * near)
+        return leaked, gold, duration
+
+    @staticmethod
+    def _windows(s, v, warp, sim, cov_in, cov_out, ready):
+        """Times the enemy enters and leaves each coverage run, entering no earlier than ready."""
+        tin, tout = _time_at(np.stack([cov_in, cov_out]), s, v, warp, sim)
+        return np.maximum(tin, ready), tout
+
+    @staticmethod
+    def _shots(tin, tout, mask, multi, period, pairs, state):
+        """(first attack time, attack count) per coverage run for one enemy.
+
+        Single-target towers wait for their previous target in the same run
+        and skip the enemy while busy with one further along in another run.
+        Multi-target towers keep the rhythm they had while the previous enemy
+        was in range, so overlapping enemies share attacks; beams also wait
+        for one of their max_targets slots.
+        """
+        since, last, until = state["from"], state["last"], state["until"]
+        tin = np.maximum(tin, state["lanes"].min(axis=0))
+        steady = multi & (tin <= until)
+        first = np.where(steady, since + period * np.maximum(0, np.ceil((tin - since) / period)),
+                         np.maximum(tin, last + period))
+        tout = tout.copy()
+        for runs, other in pairs:
+            f, o_from, o_free = first[runs], since[other], last[other] + period[runs]
+            first[runs] = f = np.where((f >= o_from) & (f < o_free), o_free, f)
+            tout[runs] = np.where(f < o_from, np.minimum(tout[runs], o_from), tout[runs])
+        count = np.where(mask & (first <= tout), np.floor((tout - first) / period) + 1, 0.0)
+        return first, count
+
+
+def _by_sim(sim, B, *values):
+    """Per-run values (sim sorted) → (B, K) rows, one per sim; unused slots get -NEVER."""
+    col = np.arange(len(sim)) - np.searchsorted(sim, sim)
+    out = []
+    for x in values:
+        rows = np.full((B, int(col.max(initial=0)) + 1), -NEVER)
+        rows[sim, col] = x
+        out.append(rows)
+    return out
+
+
+def _merge(lo, hi):
+    """Spans [lo, hi) per row (B, K) → disjoint spans with the same union, as few columns as
+    the fullest row needs (unused ones zero-length). Empty spans must start at -NEVER."""
+    order = np.argsort(lo, axis=1)
+    lo, hi = np.take_along_axis(lo, order, axis=1), np.take_along_axis(hi, order, axis=1)
+    reach = np.maximum.accumulate(hi, axis=1)
+    lo = np.maximum(lo, np.concatenate([np.full((len(lo), 1), NEVER), reach[:, :-1]], axis=1))
+    used = max(1, int((lo < -NEVER).sum(axis=1).max()))
+    return lo[:, :used], np.maximum(hi, lo)[:, :used]
+
+
+def _time_at(progress, s, v, warp, sim):
+    """Time an enemy spawned at s with speed v reaches progress (..., R), the last axis
+    matching sim. warp = (from, to, amount): per sim, disjoint spans (K, B) of progress
+    walked at speed x amount."""
+    if warp is None:
+        return s + progress / v
+    p_from, p_to, amount = warp
+    shape = (len(p_from),) + (1,) * (progress.ndim - 1) + (len(sim),)
+    p_from, p_to = p_from[:, sim].reshape(shape), p_to[:, sim].reshape(shape)
+    slowed = (np.minimum(np.maximum(progress, p_from), p_to) - p_from).sum(axis=0)
+    return s + (progress + (1 / amount[sim] - 1) * slowed) / v
+
+
+def _pack(bits):
+    """(rows, n) bool → (rows, ceil(n/64)) uint64 bitsets."""
+    packed = np.packbits(bits, axis=1)
+    pad = -packed.shape[1] % 8
+    if pad:
+        packed = np.pad(packed, ((0, 0), (0, pad)))
+    return packed.view(np.uint64)
+
+
+class SteppedSim(LevelSim):
+    """Reference model: the same batch stepped at a fixed dt, frame by frame like the game.
+
+    Kept to check LevelSim against (tests/test_wave_sim.py) and to look
+    into a build the analytic model gets wrong; far too slow for sweeps.
+    Projectiles lock on when fired and are dropped if the target dies first.
+    """
+
+    def __init__(self, data, level, builds, hp_scale=1.0, dt=0.1):
+        self.dt = dt
+        super().__init__(data, level, builds, hp_scale=hp_scale)
+
+    def _coverage(self):
+        """Path coverage per tower: cover[b*T + t, bin] is True when an enemy whose
+        progress falls in that bin overlaps the tower's range circle."""
+        self.nbins = int(self.line.length // BIN) + 1
+        self.bin_xy = self.line.at((np.arange(self.nbins) + 0.5) * BIN)
+        bx, by = self.bin_xy
+        tx, ty = self.tw["x"].reshape(-1, 1), self.tw["y"].reshape(-1, 1)
+        reach2 = ((self.tw["range"] + ENEMY_RADIUS) ** 2).reshape(-1, 1)
+        self.cover = np.zeros((self.B * self.T, self.nbins), dtype=bool)
+        for i in range(0, len(tx), 512):
+            c = slice(i, i + 512)
+            self.cover[c] = (tx[c] - bx) ** 2 + (ty[c] - by) ** 2 < reach2[c]
+        # Same coverage at CHUNK resolution, bit-packed into uint64 words
+        self.nchunks = -(-self.nbins // CHUNK)
+        pad = np.zeros((len(tx), self.nchunks * CHUNK), dtype=bool)
+        pad[:, :self.nbins] = self.cover
+        self.cover_bits = _pack(pad.reshape(len(tx), self.nchunks, CHUNK).any(axis=2))
+
+    # ── one wave, stepped ──────────────────────────────────────────────────
+    def _run_wave(self, groups, owned, wave):
+        data, tw, dt, B, T = self.data, self.tw, self.dt, self.B, self.T
+        spawn, types, spawn_end = timeline(groups)  # spawning ends one delay after the last spawn
+        spawn = np.array(spawn)
+        N = len(types)
+        stats = [data.enemies.get(t, data.enemies["imp"]) for t in types]
+        speed = np.array([s["speed"] for s in stats], dtype=float)
+        reward = np.array([s["reward"] for s in stats], dtype=float)
+        flying = np.array([s.get("flying", False) for s in stats])
+        holy = np.array([t in data.holy_types for t in types])
+
+        hp = np.tile(np.array([s["health"] for s in stats], dtype=float) * self.hp_scale, (B, 1))
+        prog = np.zeros((B, N))
+        alive = np.zeros((B, N), dtype=bool)
+        slow = np.ones((B, N))
+        slow_t = np.zeros((B, N))
+        poison = np.zeros((B, N))
+        poison_t = np.zeros((B, N))
+        burn = np.zeros((B, N))
+        burn_t = np.zeros((B, N))
+        dot_acc = np.zeros((B, N))
+        effects = (slow, slow_t, poison, poison_t)
+
+        kind = tw["kind"]
+        attackers = owned & ((kind == PROJECTILE) | (kind == BEAM) | (kind == AOE))
+        ready = np.where(tw["wave"] == wave, tw["at"], 0.0)
+        cd = np.zeros((B, T))
+        shots = np.zeros((B, T), dtype=int)
+        pend_t = np.full((B, T, SLOTS), np.inf)
+        pend_n = np.zeros((B, T, SLOTS), dtype=int)
+        pend_dmg = np.zeros((B, T, SLOTS))
+        bin_x, bin_y = self.bin_xy
+
+        leaked = np.zeros(B, dtype=int)
+        gold = np.zeros(B)
+        duration = np.full(B, MAX_WAVE_TIME)
+        done = np.zeros(B, dtype=bool)
+        t, k, lo = 0.0, 0, 0
+        while t < MAX_WAVE_TIME:
+            t += dt
+            cd -= dt
+            k_new = int(np.searchsorted(spawn, t, side="right"))
+            alive[:, k:k_new] = True
+            k = k_new
+            while lo < k and not alive[:, lo].any():
+                lo += 1
+            if k == N and t >= spawn_end:
+                finished = ~alive[:, lo:].any(axis=1) & ~done
+                duration[finished] = t
+                done |= finished
+                if done.all():
+                    break
+            if lo == k:
+                # Nothing on the map in any sim: jump to the step before the next spawn
+                nxt = spawn[k] if k < N else spawn_end
+                skip = max(0, int(np.ceil((nxt - t) / dt)) - 1) * dt
+                t += skip
+                cd -= skip
+                continue
+            w = slice(lo, k)
+            a = alive[:, w]
+
+            # Enemy update (enemy.gd _process): slow timer, DoT ticks, movement
+            st = slow_t[:, w]
+            st -= dt
+            slow[:, w] = np.where(st <= 0, 1.0, slow[:, w])
+            acc = dot_acc[:, w]
+            acc += np.where(a, dt, 0.0)
+            tick = a & (acc >= DOT_TICK)
+            if tick.any():
+                acc -= np.where(tick, DOT_TICK, 0.0)
+                pt, bt = poison_t[:, w], burn_t[:, w]
+                pz, bz = tick & (pt > 0), tick & (bt > 0)
+                if pz.any() or bz.any():
+                    pt -= np.where(pz, DOT_TICK, 0.0)
+                    bt -= np.where(bz, DOT_TICK, 0.0)
+                    dot = np.where(pz, poison[:, w] * DOT_TICK, 0.0) + np.where(bz, burn[:, w] * DOT_TICK, 0.0)
+                    hp[:, w] -= np.floor(dot)
+            p = prog[:, w]
+            p += np.where(a, speed[w] * slow[:, w] * dt, 0.0)
+            out = a & (p >= self.line.length)
+            leaked += out.sum(axis=1)
+            a &= ~out
+            bins = np.minimum((p * (1 / BIN)).astype(np.intp), self.nbins - 1)
+            hit = np.zeros_like(p)
+
+            # Towers (tower.gd _process) — only towers off cooldown with an enemy in a
+            # nearby chunk get the exact per-enemy range test
+            bi, ti = np.nonzero(attackers & (cd <= 0) & (ready <= t))
+            if len(bi):
+                occ = np.zeros((B, self.nchunks), dtype=bool)
+                ob, oj = np.nonzero(a)
+                occ[ob, bins[ob, oj] // CHUNK] = True
+                near = (self.cover_bits[bi * T + ti] & _pack(occ)[bi]).any(axis=1)
+                bi, ti = bi[near], ti[near]
+            if len(bi):
+                eb = bins[bi]
+                v = self.cover[(bi * T + ti)[:, None], eb] & a[bi]
+                v &= np.where(flying[w][None, :], tw["air"][bi, ti][:, None], tw["ground"][bi, ti][:, None])
+                has = v.any(axis=1)
+                bi, ti, v, eb = bi[has], ti[has], v[has], eb[has]
+                cd[bi, ti] = np.maximum(cd[bi, ti], -dt) + tw["period"][bi, ti]
+                kd = kind[bi, ti]
+
+                m = kd == PROJECTILE
+                if m.any():
+                    pb, pt_, pv = bi[m], ti[m], v[m]
+                    target = np.where(pv, p[pb], -1.0).argmax(axis=1)
+                    dmg = tw["damage"][pb, pt_]
+                    dmg = np.where(flying[w][target], np.floor(dmg * tw["air_mult"][pb, pt_]), dmg)
+                    dmg = np.where(holy[w][target], np.floor(dmg * tw["holy_mult"][pb, pt_]), dmg)
+                    tb = eb[m][np.arange(len(pb)), target]
+                    dist = np.hypot(tw["x"][pb, pt_] - bin_x[tb], tw["y"][pb, pt_] - bin_y[tb])
+                    ps = tw["proj_speed"][pb, pt_]
+                    slot = shots[pb, pt_] % SLOTS
+                    pend_t[pb, pt_, slot] = t + np.where(ps > 0, dist / np.maximum(ps, 1e-6), 0.0)
+                    pend_n[pb, pt_, slot] = target + lo
+                    pend_dmg[pb, pt_, slot] = dmg
+                    shots[pb, pt_] += 1
+
+                m = kd == BEAM
+                if m.any():
+                    zb, zt, zv, ze = bi[m], ti[m], v[m], eb[m]
+                    dz = np.where(zv, (tw["x"][zb, zt][:, None] - bin_x[ze]) ** 2
+                                  + (tw["y"][zb, zt][:, None] - bin_y[ze]) ** 2, np.inf)
+                    order = np.argsort(dz, axis=1)
+                    pick = np.arange(order.shape[1])[None, :] < tw["max_targets"][zb, zt][:, None]
+                    pick &= np.isfinite(np.take_along_axis(dz, order, axis=1))
+                    r, j = np.nonzero(pick)
+                    np.add.at(hit, (zb[r], order[r, j]), tw["damage"][zb[r], zt[r]])
+
+                m = kd == AOE
+                if m.any():
+                    r, j = np.nonzero(v[m])
+                    ab, at = bi[m][r], ti[m][r]
+                    np.add.at(hit, (ab, j), tw["damage"][ab, at])
+                    bd = tw["burn_duration"][ab, at] > 0
+                    burn[ab[bd], j[bd] + lo] = tw["burn_damage"][ab[bd], at[bd]]
+                    burn_t[ab[bd], j[bd] + lo] = tw["burn_duration"][ab[bd], at[bd]]
+
+            # Projectiles landing this step (projectile.gd _apply_hit)
+            db, dt_, ds = np.nonzero(pend_t <= t)
+            if len(db):
+                pend_t[db, dt_, ds] = np.inf
+                n = pend_n[db, dt_, ds] - lo
+                live = n >= 0
+                live[live] = a[db[live], n[live]]
+                db, dt_, n, dmg = db[live], dt_[live], n[live], pend_dmg[db, dt_, ds][live]
+                np.add.at(hit, (db, n), dmg)
+                self._on_hit(db, dt_, n + lo, effects)
+                sr = tw["splash"][db, dt_]
+                s = sr > 0
+                if s.any():
+                    sb, st_, sn, sd, sr = db[s], dt_[s], n[s], dmg[s], sr[s]
+                    ex, ey = bin_x[bins[sb]], bin_y[bins[sb]]
+                    row = np.arange(len(sn))
+                    dx = ex - ex[row, sn][:, None]
+                    dy = ey - ey[row, sn][:, None]
+                    near = (dx * dx + dy * dy <= (sr * sr)[:, None]) & a[sb]
+                    near[row, sn] = False
+                    h, j = np.nonzero(near)
+                    np.add.at(hit, (sb[h], j), np.floor(sd[h] * SPLASH_FRACTION))
+                    self._on_hit(sb[h], st_[h], j + lo, effects)
+
+            hp[:, w] -= hit
+            dead = a & (hp[:, w] <= 0)
+            gold += (dead * reward[w]).sum(axis=1)
+            a &= ~dead
+        return leaked, gold, duration
+
+    def _on_hit(self, bi, ti, cols, effects):
+        """projectile.gd _apply_effects: slow and poison overwrite the current effect."""
+        tw = self.tw
+        slow, slow_t, poison, poison_t = effects
+        sd = tw["slow_duration"][bi, ti]
+        s = sd > 0
+        slow[bi[s], cols[s]] = tw["slow_amount"][bi[s], ti[s]]
+        slow_t[bi[s], cols[s]] = sd[s]
+        pd = tw["poison_duration"][bi, ti]
+        s = pd > 0
+        poison[bi[s], cols[s]] = tw["poison_damage"][bi[s], ti[s]]
+        poison_t[bi[s], cols[s]] = pd[s]
+
+
+def _run_chunk(data, level, builds, hp_scale, dt):
+    if dt:
+        return SteppedSim(data, level, builds, hp_scale=hp_scale, dt=dt).run()
+    return LevelSim(data, level, builds, hp_scale=hp_scale).run()
+
+
+def simulate(data, level, builds, hp_scale=1.0, jobs=1, dt=None):
+    """Run builds on a level, split over `jobs` processes. Returns LevelSim.run() arrays.
+
+    With dt the stepped reference model runs instead of the analytic one.
+    """
+    if jobs <= 1 or len(builds) < 2 * jobs:
+        return _run_chunk(data, level, builds, hp_scale, dt)
+    chunks = [c for c in np.array_split(np.arange(len(builds)), jobs) if len(c)]
+    with Pool(len(chunks)) as pool:
+        parts = pool.starmap(_run_chunk, [(data, level, [builds[i] for i in c], hp_scale, dt) for c in chunks])
+    return {key: np.concatenate([part[key] for part in parts]) for key in parts[0]}
+
+
+def summarize(level, name, res, elapsed):
+    lives, leaks = res["lives"], res["leaks"]
+    win = (lives > 0).mean()
+    print(f"\nL{level} {name}: {len(lives)} sims in {elapsed:.2f}s ({len(lives) / elapsed:.0f} sims/s)", flush=True)
+    print(f"  win rate {win:5.1%}   lives p10/p50/p90 {np.percentile(lives, 10):.0f}/"
+          f"{np.percentile(lives, 50):.0f}/{np.percentile(lives, 90):.0f}   "
+          f"towers bought {res['towers'].mean():.1f}   end gold {res['money'].mean():.0f}", flush=True)
+    print("  wave    " + " ".join(f"{w + 1:>5d}" for w in range(leaks.shape[1])), flush=True)
+    print("  leaks   " + " ".join(f"{v:5.1f}" for v in leaks.mean(axis=0)), flush=True)
+    print("  time s  " + " ".join(f"{v:5.0f}" for v in res["durations"].mean(axis=0)), flush=True)
+    return win
+
+
+def main():
+    ap = argparse.ArgumentParser(description="Simulate levels headless with the game's data")
+    ap.add_argument("--level", default="all", help="level number or 'all'")
+    ap.add_argument("--sims", type=int, default=1000, help="random builds per level")
+    ap.add_argument("--towers", type=int, default=8, help="towers per random build")
+    ap.add_argument("--seed", type=int, default=0)
+    ap.add_argument("--build", help="JSON list of builds instead of random ones")
+    ap.add_argument("--hp-scale", type=float, default=1.0)
+    ap.add_argument("--dt", type=float, help="run the stepped reference model at this timestep (slow)")
+    ap.add_argument("--jobs", type=int, default=1, help="processes to split the sims over")
+    ap.add_argument("--min-win-rate", type=float, default=0.0, help="exit 1 if any level wins less")
+    ap.add_argument("--json", help="write per-level results here")
+    args = ap.parse_args()
+
+    data = GameData()
+    levels = sorted(data.levels) if args.level == "all" else [int(args.level)]
+    rng = np.random.default_rng(args.seed)
+    fixed = json.load(open(args.build)) if args.build else None
+    report, ok = {}, True
+    for level in levels:
+        builds = fixed or random_builds(data, level, args.sims, args.towers, rng)
+        start = time.perf_counter()
+        res = simulate(data, level, builds, args.hp_scale, args.jobs, args.dt)
+        elapsed = time.perf_counter() - start
+        win = summarize(level, data.levels[level]["name"], res, elapsed)
+        if win < args.min_win_rate:
+            print(f"  ✗ win rate below {args.min_win_rate:.0%}", flush=True)
+            ok = False
+        report[level] = {
+            "win_rate": float(win),
+            "lives_mean": float(res["lives"].mean()),
+            "leaks_per_wave": res["leaks"].mean(axis=0).round(3).tolist(),
+            "sims": len(builds),
+            "seconds": round(elapsed, 3),
+        }
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump(report, f, indent=1)
+    return 0 if ok else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,84 @@
+"""replay.py: mid-wave timing of replay actions and the unverifiable status."""
+
+import json
+import sys
+from pathlib import Path
+
+import numpy as np
+import pytest
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "scripts"))
+
+import replay  # noqa: E402
+from replay import END, HEADER, MAGIC, PLACE, SELL, UPGRADE, VERSION, WAVE  # noqa: E402
+from wave_sim import GameData, random_builds, simulate  # noqa: E402
+
+TICKS = 60
+
+
+def varint(v):
+    out = bytearray()
+    while v >= 0x80:
+        out.append((v & 0x7F) | 0x80)
+        v >>= 7
+    out.append(v)
+    return bytes(out)
+
+
+def write_replay(path, events, level=1):
+    """Encode (tick, kind, payload) events like ReplayRecorder does."""
+    buf, last = bytearray(HEADER.pack(MAGIC, VERSION, level, TICKS, 0)), 0
+    for tick, kind, payload in sorted(events, key=lambda e: e[0]):
+        buf += varint(((tick - last) << 3) | kind)
+        last = tick
+        for v in payload:
+            buf += varint(v)
+    path.write_bytes(bytes(buf))
+    return path
+
+
+@pytest.fixture(scope="module")
+def data():
+    return GameData()
+
+
+def test_actions_keep_their_tick(data, tmp_path):
+    arrow = list(data.towers).index("arrow_tower")
+    events = [(10, PLACE, [arrow, 12, 8]), (60, WAVE, [1]),
+              (60 + 20 * TICKS, PLACE, [arrow, 20, 8]), (60 + 25 * TICKS, UPGRADE, [12, 8, 0, 1]),
+              (100 * TICKS, WAVE, [2]), (110 * TICKS, UPGRADE, [20, 8, 0, 1]), (120 * TICKS, SELL, [12, 8]),
+              (200 * TICKS, END, [0, 0, 10, 100, 300, 2])]
+    rows = replay.to_build(replay.read_replay(write_replay(tmp_path / "r.hmr", events)), data)
+    before, mid, upgraded = rows
+    # Placed before wave 1: fights from its start; its wave-1 upgrade counts from then too
+    assert (before["wave"], "at" in before, before["upgrades"]) == (1, False, {"path_a": 1})
+    assert (before["until"], before["refund"]) == (3, before["cost"] // 2)
+    # Placed 20s into wave 1; upgraded 10s into wave 2, the old entry fighting on to the wave's end
+    assert (mid["wave"], mid["at"], mid["until"]) == (1, 20.0, 3)
+    assert (upgraded["wave"], upgraded["at"], upgraded["until"]) == (2, 10.0, np.inf)
+    assert all(row["placed"] for row in rows)
+
+
+def test_late_towers_fight_less(data):
+    build = random_builds(data, 1, 1, 8, np.random.default_rng(4))[0]
+    early = [dict(row, wave=1, placed=True) for row in build]
+    late = [dict(row, at=40.0) for row in early]
+    res = simulate(data, 1, [early, late])
+    assert res["leaks"][1, 0] > res["leaks"][0, 0]
+    assert (res["leaks"][1, 1:] == res["leaks"][0, 1:]).all()
+
+
+def test_timing_dependent_claim_is_unverifiable(data, tmp_path):
+    build = random_builds(data, 1, 1, 8, np.random.default_rng(4))[0]
+    types = list(data.towers)
+    events = [(60, WAVE, [1])]
+    events += [(60 + 40 * TICKS + j, PLACE, [types.index(s["type"]), *s["anchor"]]) for j, s in enumerate(build)]
+    events += [(60 + (40 + 60 * (w - 1)) * TICKS, WAVE, [w]) for w in range(2, 11)]
+    # Claim exactly what the sim gives with every tower fighting from the wave start
+    rows = replay.wave_start_build(replay.to_build({"events": events, "tick_rate": TICKS}, data))
+    lives, waves = replay.sim_outcome(simulate(data, 1, [rows])["leaks"][0])
+    events.append((700 * TICKS, END, [int(lives > 0), lives, 0, 0, 0, waves]))
+    write_replay(tmp_path / "late.hmr", events)
+    out = tmp_path / "out.json"
+    assert replay.verify([str(tmp_path)], 0, str(out)) == 0
+    assert json.loads(out.read_text())[0]["status"] == "unverifiable"
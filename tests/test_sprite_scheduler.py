@@ -0,0 +1,197 @@
+"""sprite_scheduler against fake_pixellab.py: dependencies, rate limits, retries."""
+
+import os
+import sys
+import time
+import types
+from pathlib import Path
+
+import pytest
+
+SCRIPTS = Path(__file__).resolve().parent.parent / "scripts"
+sys.path.insert(0, str(SCRIPTS))
+
+import sprite_scheduler  # noqa: E402
+from gen_worker import WorkerPool  # noqa: E402
+from sprite_scheduler import GenerationError, Scheduler, mcp  # noqa: E402
+
+FAKE = f"{sys.executable} {SCRIPTS / 'fake_pixellab.py'}"
+
+
+@pytest.fixture
+def fake(monkeypatch):
+    """Route mcp() to the fake backend with no latency and no errors."""
+    monkeypatch.setattr(sprite_scheduler, "MCPORTER", FAKE)
+    monkeypatch.setenv("FAKE_LATENCY", "0")
+    monkeypatch.setenv("FAKE_ERROR_RATE", "0")
+    monkeypatch.delenv("FAKE_ERROR_CODE", raising=False)
+    return monkeypatch
+
+
+@pytest.fixture
+def sleeps(monkeypatch):
+    """Record the scheduler's retry backoff delays instead of sleeping through them."""
+    delays = []
+    monkeypatch.setattr(sprite_scheduler, "time", types.SimpleNamespace(monotonic=time.monotonic,
+                                                                       sleep=delays.append))
+    return delays
+
+
+def call(tmp_path, name):
+    out = tmp_path / f"{name}.png"
+    return f'pixellab.generate_image_bitforge(description: "{name}", width: 32, height: 32, ' \
+           f'save_to_file: "{out}", show_image: false)'
+
+
+def failing(fake, code="backend"):
+    fake.setenv("FAKE_ERROR_RATE", "1")
+    fake.setenv("FAKE_ERROR_CODE", code)
+
+
+def test_chain_runs_in_dependency_order(fake, tmp_path):
+    sched = Scheduler(workers=4, rate=1000, burst=10)
+    sched.add("static", lambda: mcp(call(tmp_path, "static"))[0])
+    sched.add("walk", lambda static: mcp(call(tmp_path, "walk_" + Path(static).stem))[0], deps=["static"])
+    jobs = sched.run()
+    assert [jobs[n].status for n in ("static", "walk")] == ["ok", "ok"]
+    assert os.path.exists(jobs["walk"].result) and "walk_static" in jobs["walk"].result
+
+
+def test_diamond_waits_for_every_dep(fake, tmp_path):
+    order = []
+
+    def step(name):
+        def fn(*deps):
+            order.append(name)
+            return name
+        return fn
+
+    sched = Scheduler(workers=4, rate=1000, burst=10)
+    sched.add("a", step("a"))
+    sched.add("b", step("b"), deps=["a"])
+    sched.add("c", step("c"), deps=["a"])
+    sched.add("d", lambda b, c: b + c, deps=["b", "c"])
+    jobs = sched.run()
+    assert jobs["d"].status == "ok" and jobs["d"].result == "bc"
+    assert order[0] == "a" and sorted(order[1:]) == ["b", "c"]
+
+
+def test_failure_skips_everything_behind_it(fake, sleeps, tmp_path):
+    failing(fake)
+    sched = Scheduler(workers=2, rate=1000, burst=10, retries=1, backoff=0.01)
+    sched.add("static", lambda: mcp(call(tmp_path, "static")))
+    sched.add("walk", lambda s: s, deps=["static"])
+    sched.add("sheet", lambda w: w, deps=["walk"])
+    sched.add("other", lambda: "independent")
+    jobs = sched.run()
+    assert jobs["static"].status == "failed"
+    assert "simulated failure" in jobs["static"].error
+    assert jobs["walk"].status == jobs["sheet"].status == "skipped"
+    assert jobs["sheet"].error == "dependency failed"
+    assert jobs["other"].status == "ok"
+    assert not sched.summary()
+
+
+def test_job_bug_fails_the_job_and_skips_dependents(fake):
+    sched = Scheduler(workers=2, rate=1000)
+    sched.add("broken", lambda: 1 / 0)
+    sched.add("after", lambda x: x, deps=["broken"])
+    jobs = sched.run()
+    assert jobs["broken"].status == "failed" and jobs["broken"].error.startswith("ZeroDivisionError")
+    assert jobs["after"].status == "skipped"
+
+
+def test_fallback_still_feeds_dependents(fake, sleeps, tmp_path):
+    failing(fake)
+    sched = Scheduler(workers=1, rate=1000, burst=10, retries=0)
+    sched.add("static", lambda: mcp(call(tmp_path, "static")), fallback=lambda: "placeholder")
+    sched.add("walk", lambda s: s + "_walk", deps=["static"])
+    jobs = sched.run()
+    assert jobs["static"].status == "fallback"
+    assert jobs["walk"].status == "ok" and jobs["walk"].result == "placeholder_walk"
+
+
+def test_rate_limit_slows_the_bucket(fake, sleeps, tmp_path):
+    failing(fake, "rate_limited")
+    sched = Scheduler(workers=1, rate=1000, burst=10, retries=2, backoff=0.01)
+    sched.add("static", lambda: mcp(call(tmp_path, "static")))
+    jobs = sched.run()
+    assert jobs["static"].status == "failed" and jobs["static"].attempts == 3
+    assert sched.bucket.rate == pytest.approx(1000 / 2 ** 3)
+
+
+def test_rate_limit_code_from_worker_pool(fake, sleeps, tmp_path):
+    failing(fake, "rate_limited")
+    with WorkerPool(1, cmd=f"{FAKE} --worker", cwd=str(tmp_path)) as pool:
+        sched = Scheduler(workers=1, rate=1000, burst=10, retries=1, backoff=0.01)
+        sched.add("static", lambda: mcp(call(tmp_path, "static"), pool=pool))
+        jobs = sched.run()
+    assert jobs["static"].status == "failed" and jobs["static"].error.startswith("rate_limited")
+    assert sched.bucket.rate == pytest.approx(1000 / 2 ** 2)
+
+
+@pytest.mark.parametrize("code", ["backend", "bad_request"])
+def test_other_errors_keep_the_rate(fake, sleeps, tmp_path, code):
+    failing(fake, code)
+    sched = Scheduler(workers=1, rate=1000, burst=10, retries=2, backoff=0.01)
+    sched.add("static", lambda: mcp(call(tmp_path, "static")))
+    sched.run()
+    assert sched.bucket.rate == 1000
+
+
+def test_non_retryable_error_is_not_retried(fake, sleeps, tmp_path):
+    failing(fake, "bad_request")
+    with WorkerPool(1, cmd=f"{FAKE} --worker", cwd=str(tmp_path)) as pool:
+        sched = Scheduler(workers=1, rate=1000, burst=10, retries=3, backoff=0.01)
+        sched.add("static", lambda: mcp(call(tmp_path, "static"), pool=pool))
+        jobs = sched.run()
+    assert jobs["static"].status == "failed" and jobs["static"].attempts == 1
+    assert sleeps == []
+
+
+def test_backoff_doubles_up_to_the_cap(fake, sleeps):
+    def flaky():
+        raise GenerationError("timeout after 1s")
+
+    sched = Scheduler(workers=1, rate=1000, retries=5, backoff=1.0, max_backoff=4.0)
+    sched.add("flaky", flaky)
+    jobs = sched.run()
+    assert jobs["flaky"].attempts == 6
+    caps = [1.0, 2.0, 4.0, 4.0, 4.0]
+    assert len(sleeps) == len(caps)
+    for delay, cap in zip(sleeps, caps):
+        assert cap * 0.5 <= delay <= cap
+
+
+def test_retry_recovers_and_speeds_back_up(fake, sleeps):
+    calls = []
+
+    def flaky():
+        calls.append(1)
+        if len(calls) < 3:
+            raise GenerationError("429 Too Many Requests", rate_limited=True)
+        return "ok"
+
+    sched = Scheduler(workers=1, rate=10, retries=3, backoff=0.01)
+    sched.add("flaky", flaky)
+    jobs = sched.run()
+    assert jobs["flaky"].status == "ok" and jobs["flaky"].attempts == 3
+    assert sched.bucket.rate == pytest.approx(10 / 4 + 1)
+
+
+def test_add_rejects_unknown_deps():
+    sched = Scheduler()
+    with pytest.raises(KeyError, match="unknown dependency 'missing'"):
+        sched.add("walk", lambda s: s, deps=["missing"])
+    with pytest.raises(KeyError, match="unknown dependency 'self'"):
+        sched.add("self", lambda s: s, deps=["self"])
+
+
+def test_add_rejects_duplicate_names():
+    # Re-adding "a" with a dep on "b" would close the cycle a → b → a
+    sched = Scheduler()
+    sched.add("a", lambda: 1)
+    sched.add("b", lambda a: a, deps=["a"])
+    with pytest.raises(ValueError, match="already added"):
+        sched.add("a", lambda b: b, deps=["b"])
+    assert sched.jobs["a"].deps == ()
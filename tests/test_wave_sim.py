@@ -0,0 +1,31 @@
+"""wave_sim's analytic LevelSim against the stepped reference model."""
+
+import sys
+from pathlib import Path
+
+import numpy as np
+import pytest
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "scripts"))
+
+from wave_sim import GameData, random_builds, simulate  # noqa: E402
+
+BUILDS = 60
+DT = 0.1
+
+
+@pytest.fixture(scope="module")
+def data():
+    return GameData()
+
+
+@pytest.mark.parametrize("level", [1, 3])
+def test_analytic_matches_stepped(data, level):
+    builds = random_builds(data, level, BUILDS, 8, np.random.default_rng(level))
+    fast = simulate(data, level, builds)
+    ref = simulate(data, level, builds, dt=DT)
+    won, ref_won = fast["lives"] > 0, ref["lives"] > 0
+    assert (won == ref_won).mean() >= 0.85
+    assert np.abs(fast["lives"] - ref["lives"]).mean() <= 1.5
+    assert abs(won.mean() - ref_won.mean()) <= 0.15
+